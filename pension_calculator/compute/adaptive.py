@@ -0,0 +1,222 @@
+"""
+adaptive.py
+
+Sample a surface of two parameters on an adaptive mesh, instead of the uniform grids of `compute/utils.py`.
+
+Sampling starts from a coarse uniform grid of cells. Each cell is checked by evaluating its centre and edge midpoints:
+if they differ from the bilinear interpolation of its corners by more than a tolerance, or the surface changes sign
+within the cell (e.g. the break-even of a net saving), the cell is split into four. The points of each level of
+refinement are evaluated in one vectorised call. The result is a quadtree of leaf cells, interpolated bilinearly
+within each leaf. Points are located in the quadtree by descending it one level at a time for all points at once.
+
+The interpolated surface is continuous within each leaf and across edges shared by leaves of the same size, but not
+at hanging nodes: where a leaf borders two finer leaves, the finer ones use the value evaluated at the midpoint of the
+shared edge, while the coarser one interpolates it from its corners. The jump there is at most the error the coarser
+leaf was accepted with, i.e. within `tolerance` plus `rtol` of the surface.
+"""
+
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+# The corners of the unit square, then its centre and edge midpoints, as fractions of a cell.
+CORNERS = np.array([[0, 0], [1, 0], [0, 1], [1, 1]])
+CHECKS = np.array([[0.5, 0.5], [0.5, 0], [0.5, 1], [0, 0.5], [1, 0.5]])
+
+
+def _bilinear(corners: np.ndarray, fx: np.ndarray, fy: np.ndarray) -> np.ndarray:
+    """Interpolate between the (cells, 4) corner values at fractional positions in each cell."""
+    v00, v10, v01, v11 = corners.T
+    return (
+        v00 * (1 - fx) * (1 - fy)
+        + v10 * fx * (1 - fy)
+        + v01 * (1 - fx) * fy
+        + v11 * fx * fy
+    )
+
+
+class AdaptiveMesh:
+    """The leaf cells of an adaptively refined surface, and the values at their corners.
+
+    The quadtree is stored as arrays over every cell ever created, the cells of the initial grid first, so that points
+    are located by a vectorised descent from the initial grid.
+
+    Args:
+        nodes: The bounds of every cell as (x0, x1, y0, y1), with shape (nodes, 4).
+        children: The first of the four consecutive children of each cell, or -1 for a leaf. Children are ordered
+            (x0, y0), (x1, y0), (x0, y1), (x1, y1) by quadrant.
+        leaves: The position in `cells` of each leaf, or -1 for a split cell.
+        corners: The values at the corners of each leaf.
+        points: Every point evaluated, as (x, y, value) columns.
+        initial: The number of cells of the initial grid in x and y.
+
+    Attributes:
+        cells: The bounds of each leaf cell as (x0, x1, y0, y1), with shape (cells, 4).
+        corners: The values at the corners (x0, y0), (x1, y0), (x0, y1), (x1, y1) of each cell.
+        points: Every point evaluated, as (x, y, value) columns.
+    """
+
+    def __init__(
+        self,
+        nodes: np.ndarray,
+        children: np.ndarray,
+        leaves: np.ndarray,
+        corners: np.ndarray,
+        points: np.ndarray,
+        initial: Tuple[int, int],
+    ):
+        self.nodes = nodes
+        self.children = children
+        self.leaves = leaves
+        # Leaves are numbered in the order of the cells, level by level.
+        self.cells = nodes[leaves >= 0]
+        self.corners = corners
+        self.points = points
+        self.initial = initial
+
+    @property
+    def n_evaluations(self) -> int:
+        return len(self.points)
+
+    def locate(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Return the leaf containing each point, or -1 outside the mesh."""
+        nx, ny = self.initial
+        x_min, y_min = self.nodes[0, 0], self.nodes[0, 2]
+        x_max, y_max = self.nodes[nx * ny - 1, 1], self.nodes[nx * ny - 1, 3]
+        inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+
+        ix = np.clip(((x - x_min) / (x_max - x_min) * nx).astype(int), 0, nx - 1)
+        iy = np.clip(((y - y_min) / (y_max - y_min) * ny).astype(int), 0, ny - 1)
+        node = np.where(inside, ix * ny + iy, 0)
+        while True:
+            child = self.children[node]
+            split = np.flatnonzero(child >= 0)
+            if not len(split):
+                break
+            bounds = self.nodes[node[split]]
+            upper_x = x[split] >= (bounds[:, 0] + bounds[:, 1]) / 2
+            upper_y = y[split] >= (bounds[:, 2] + bounds[:, 3]) / 2
+            node[split] = child[split] + upper_x + 2 * upper_y
+        return np.where(inside, self.leaves[node], -1)
+
+    def __call__(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Interpolate the surface at points inside the mesh, NaN outside it."""
+        x, y = np.broadcast_arrays(np.asarray(x, float), np.asarray(y, float))
+        leaf = self.locate(x.ravel(), y.ravel())
+        inside = leaf >= 0
+        x0, x1, y0, y1 = self.cells[leaf[inside]].T
+        result = np.full(leaf.shape, np.nan)
+        result[inside] = _bilinear(
+            self.corners[leaf[inside]],
+            (x.ravel()[inside] - x0) / (x1 - x0),
+            (y.ravel()[inside] - y0) / (y1 - y0),
+        )
+        return result.reshape(x.shape)
+
+
+def refine(
+    evaluate: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    x_bounds: Tuple[float, float],
+    y_bounds: Tuple[float, float],
+    initial: Tuple[int, int] = (4, 4),
+    tolerance: float = 1000.0,
+    rtol: float = 0.01,
+    max_depth: int = 5,
+    refine_sign_change: bool = True,
+) -> AdaptiveMesh:
+    """
+    Sample a surface adaptively.
+
+    Parameters
+    ----------
+    evaluate A vectorised function of arrays of x and y, e.g. from `comparison.net_saving_function`
+    x_bounds The range of x
+    y_bounds The range of y
+    initial The number of cells of the initial uniform grid in x and y
+    tolerance The acceptable interpolation error within a cell, in the units of the surface (e.g. £)
+    rtol The acceptable interpolation error relative to the surface, in addition to `tolerance`
+    max_depth The most times a cell of the initial grid may be split
+    refine_sign_change Split cells in which the surface changes sign, to resolve the zero contour
+
+    Returns
+    -------
+    The refined mesh. With `max_depth` refinements the finest cells match a uniform grid `2 ** max_depth` times finer
+    than `initial`.
+
+    """
+    cache: Dict[Tuple[float, float], float] = {}
+
+    def values_at(xy: np.ndarray) -> np.ndarray:
+        keys = [tuple(p) for p in np.round(xy, 12).tolist()]
+        new = list(dict.fromkeys(k for k in keys if k not in cache))
+        if new:
+            new_xy = np.array(new)
+            for key, value in zip(new, evaluate(new_xy[:, 0], new_xy[:, 1])):
+                cache[key] = value
+        return np.array([cache[k] for k in keys])
+
+    xs = np.linspace(*x_bounds, initial[0] + 1)
+    ys = np.linspace(*y_bounds, initial[1] + 1)
+    x0, y0 = np.meshgrid(xs[:-1], ys[:-1], indexing="ij")
+    x1, y1 = np.meshgrid(xs[1:], ys[1:], indexing="ij")
+    cells = np.stack([x0.ravel(), x1.ravel(), y0.ravel(), y1.ravel()], axis=1)
+
+    nodes, children, leaves, leaf_corners = [], [], [], []
+    n_nodes, n_leaves = len(cells), 0
+    for depth in range(max_depth + 1):
+        origin, size = cells[:, [0, 2]], cells[:, [1, 3]] - cells[:, [0, 2]]
+        corner_xy = origin[:, None, :] + CORNERS[None, :, :] * size[:, None, :]
+        check_xy = origin[:, None, :] + CHECKS[None, :, :] * size[:, None, :]
+        values = values_at(
+            np.concatenate([corner_xy, check_xy], axis=1).reshape(-1, 2)
+        ).reshape(len(cells), len(CORNERS) + len(CHECKS))
+        corners, checks = values[:, : len(CORNERS)], values[:, len(CORNERS) :]
+
+        predicted = _bilinear(
+            corners[:, None, :].repeat(len(CHECKS), axis=1).reshape(-1, 4),
+            np.tile(CHECKS[:, 0], len(cells)),
+            np.tile(CHECKS[:, 1], len(cells)),
+        ).reshape(len(cells), len(CHECKS))
+        error = np.abs(checks - predicted) - rtol * np.abs(checks)
+        split = np.nanmax(error, axis=1, initial=0) > tolerance
+        if refine_sign_change:
+            split |= np.any(values > 0, axis=1) & np.any(values < 0, axis=1)
+        if depth == max_depth:
+            split[:] = False
+
+        n_split = np.count_nonzero(split)
+        first_child = np.full(len(cells), -1)
+        first_child[split] = n_nodes + 4 * np.arange(n_split)
+        leaf = np.full(len(cells), -1)
+        leaf[~split] = n_leaves + np.arange(len(cells) - n_split)
+        nodes.append(cells)
+        children.append(first_child)
+        leaves.append(leaf)
+        leaf_corners.append(corners[~split])
+        n_nodes += 4 * n_split
+        n_leaves += len(cells) - n_split
+
+        parents = cells[split]
+        if not len(parents):
+            break
+        xm = (parents[:, 0] + parents[:, 1]) / 2
+        ym = (parents[:, 2] + parents[:, 3]) / 2
+        cells = np.stack(
+            [
+                np.stack([parents[:, 0], xm, parents[:, 2], ym], axis=1),
+                np.stack([xm, parents[:, 1], parents[:, 2], ym], axis=1),
+                np.stack([parents[:, 0], xm, ym, parents[:, 3]], axis=1),
+                np.stack([xm, parents[:, 1], ym, parents[:, 3]], axis=1),
+            ],
+            axis=1,
+        ).reshape(-1, 4)
+
+    points = np.array([(x, y, v) for (x, y), v in cache.items()])
+    return AdaptiveMesh(
+        nodes=np.concatenate(nodes),
+        children=np.concatenate(children),
+        leaves=np.concatenate(leaves),
+        corners=np.concatenate(leaf_corners),
+        points=points,
+        initial=initial,
+    )
@@ -0,0 +1,49 @@
+"""
+atomic.py
+
+Write files atomically, so that readers see either the old file or the complete new one and never a partial write,
+e.g. a worker reading a checkpoint while another replaces it, or a scraper reading a metrics file.
+
+Each file is written to a temporary file in the same directory and then renamed over the target, which is atomic on
+POSIX file systems and on Windows. The temporary file is removed if the write fails.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+import numpy as np
+
+# Files are readable by other users, e.g. a node exporter reading metrics, as `tempfile.mkstemp` creates them 0600.
+MODE = 0o644
+
+
+@contextmanager
+def _replace(path: Path, mode: str) -> Iterator[IO]:
+    """Open a temporary file beside `path`, and rename it over `path` once it is written."""
+    fd, tmp = tempfile.mkstemp(dir=Path(path).parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.chmod(tmp, MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def save_array(path: Path, array: np.ndarray) -> None:
+    """Save an array in `.npy` format atomically."""
+    with _replace(path, "wb") as f:
+        np.save(f, array)
+
+
+def write_text(path: Path, text: str) -> None:
+    """Write a text file atomically."""
+    with _replace(path, "w") as f:
+        f.write(text)
@@ -0,0 +1,120 @@
+"""
+canonical.py
+
+Canonicalise scenarios so that duplicates and near-duplicates are evaluated once.
+
+Two scenarios are equivalent when every quantity the payment schedules depend on agrees to within a tolerance. The
+house's purchase cost, premium, and the mortgage's price and deposit only matter through the loan amount, and the
+house's area, heating demand, and the energy tariff only through the first year's heating cost, so houses that differ
+in those fields alone share a canonical key.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+
+# The resolution each canonical quantity is rounded to.
+TOLERANCES = {
+    "yob": 1,
+    "purchase_year": 1,
+    "loan": 1.0,
+    "interest_rate_pcnt": 1e-6,
+    "length_years": 1,
+    "mortgage_purchase_year": 1,
+    "initial_heating_cost": 0.01,
+    "cagr_pcnt": 1e-6,
+    "growth_rate_pcnt": 1e-6,
+    "pension_start_year": 1,
+    "pension_end_year": 1,
+}
+
+
+def canonical_quantities(batch: ScenarioBatch) -> Dict[str, np.ndarray]:
+    """Return the quantities the payment schedules of each scenario depend on."""
+    return {
+        "yob": batch.yob,
+        "purchase_year": batch.purchase_year,
+        "loan": batch.mortgage_price() * (1 - batch.deposit_pcnt),
+        "interest_rate_pcnt": batch.interest_rate_pcnt,
+        "length_years": batch.length_years,
+        "mortgage_purchase_year": batch.mortgage_purchase_year,
+        "initial_heating_cost": batch.annual_heating_kwh_m2a
+        * batch.area_m2
+        * batch.tariff,
+        "cagr_pcnt": batch.cagr_pcnt,
+        "growth_rate_pcnt": batch.growth_rate_pcnt,
+        "pension_start_year": batch.pension_start_year,
+        "pension_end_year": batch.pension_end_year,
+    }
+
+
+def canonical_keys(
+    batch: ScenarioBatch, tolerances: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """Return an integer key per scenario and canonical quantity, with shape (scenarios, quantities)."""
+    tolerances = {**TOLERANCES, **(tolerances or {})}
+    quantities = canonical_quantities(batch)
+    return np.stack(
+        [np.rint(quantities[name] / tolerances[name]) for name in TOLERANCES],
+        axis=1,
+    ).astype(np.int64)
+
+
+def canonical_hashes(
+    batch: ScenarioBatch, tolerances: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """Return a 64-bit hash of each scenario's canonical key."""
+    keys = pd.DataFrame(canonical_keys(batch, tolerances))
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+class Deduplicated(NamedTuple):
+    """The unique scenarios of a batch.
+
+    Attributes:
+        unique: The first scenario of each equivalence class.
+        inverse: The position in `unique` of each scenario of the original batch.
+    """
+
+    unique: ScenarioBatch
+    inverse: np.ndarray
+
+    @property
+    def duplicates(self) -> int:
+        """The number of scenarios that need not be evaluated."""
+        return len(self.inverse) - len(self.unique)
+
+
+def deduplicate(
+    batch: ScenarioBatch, tolerances: Optional[Dict[str, float]] = None
+) -> Deduplicated:
+    """Find the unique scenarios of a batch, up to the canonical tolerances."""
+    inverse, _ = pd.factorize(canonical_hashes(batch, tolerances))
+    _, first = np.unique(inverse, return_index=True)
+    return Deduplicated(unique=batch[first], inverse=inverse)
+
+
+def evaluate_unique(
+    batch: ScenarioBatch,
+    evaluate: Callable[[ScenarioBatch], np.ndarray],
+    tolerances: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """
+    Evaluate only the unique scenarios of a batch, and scatter the results back to the original order.
+
+    Parameters
+    ----------
+    batch The scenarios to evaluate
+    evaluate A function returning an array with one row per scenario of the batch it is passed
+    tolerances Overrides of the canonical `TOLERANCES`
+
+    Returns
+    -------
+    The results, one row per scenario of `batch`.
+
+    """
+    unique, inverse = deduplicate(batch, tolerances)
+    return evaluate(unique)[inverse]
@@ -0,0 +1,89 @@
+"""
+chunking.py
+
+Choose sweep chunk sizes that keep the dense per-year schedule arrays under a memory budget, and measure the peak
+allocation actually reached with tracemalloc.
+"""
+import tracemalloc
+from typing import Optional, Sequence
+
+import numpy as np
+
+from pension_calculator import CONFIG
+from pension_calculator.plot.scenario import ScenarioParams
+
+# The peak traced allocation of a chunk, as a multiple of its schedules. The kernels hold each stream, their stacked
+# copy, and the growth factors and masks at once (about 2.7 times in float64, 2.9 in float32), and a chunk with some
+# infeasible scenarios also holds the array their feasible schedules are copied into (up to 4 times).
+WORKING_COPIES = 4
+
+
+def year_span(scenarios: Sequence[ScenarioParams]) -> int:
+    """Return the number of years between the earliest purchase year and the latest year of death, inclusive."""
+    first_year = min(p.house.purchase_year for p in scenarios)
+    last_year = max(p.person.yod for p in scenarios)
+    return last_year - first_year + 1
+
+
+def estimate_bytes_per_scenario(
+    n_years: int, n_streams: int, dtype: np.dtype = np.float64
+) -> int:
+    """Estimate the memory needed to hold one scenario's schedules in a chunk.
+
+    Args:
+        n_years: The number of years in the schedule.
+        n_streams: The number of payment streams (heating, mortgage, ...).
+        dtype: The dtype the schedules are stored in.
+
+    Returns:
+        The estimated number of bytes per scenario.
+    """
+    return n_years * n_streams * np.dtype(dtype).itemsize * WORKING_COPIES
+
+
+def choose_chunk_size(
+    bytes_per_scenario: int,
+    memory_budget_bytes: Optional[int] = None,
+    chunks_in_flight: int = 1,
+) -> int:
+    """Choose the largest chunk size whose in-flight chunks fit in the memory budget.
+
+    Args:
+        bytes_per_scenario: The estimated memory per scenario, see `estimate_bytes_per_scenario`.
+        memory_budget_bytes: The memory budget (default set from CONFIG file).
+        chunks_in_flight: The number of chunks held in memory at once.
+
+    Returns:
+        The number of scenarios per chunk, at least one.
+    """
+    if memory_budget_bytes is None:
+        memory_budget_bytes = CONFIG.get("sweep").get("memory_budget_mb") * 2 ** 20
+
+    return max(1, memory_budget_bytes // (bytes_per_scenario * chunks_in_flight))
+
+
+class TracedPeak:
+    """Context manager that measures the peak traced Python allocation in its body.
+
+    Tracing is started if it is not already running, and stopped again on exit.
+
+    Attributes:
+        peak_bytes: The peak traced allocation, available after exit.
+    """
+
+    def __init__(self):
+        self.peak_bytes = 0
+        self._started = False
+
+    def __enter__(self) -> "TracedPeak":
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.peak_bytes = tracemalloc.get_traced_memory()[1] - self._baseline
+        if self._started:
+            tracemalloc.stop()
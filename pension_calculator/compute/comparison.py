@@ -0,0 +1,105 @@
+"""
+comparison.py
+
+Compare the lifetime cost of a passive house against an average house.
+
+The lifetime cost of a scenario is the sum of its heating, mortgage, and pension payments, as in the web app. The net
+saving of a passive house is the lifetime cost of the average house less that of the passive house, so it is positive
+when the passive house's premium is paid back by its lower heating cost. The house pension of a passive house is the
+pension pot it saves: the peak value of the average house's pension, which pays for its retirement heating, less that
+of the passive house.
+"""
+
+from typing import Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.plot.scenario import ScenarioParams
+
+COST_STREAMS = ("heating", "mortgage", "pension")
+
+OUTPUTS = ("net_saving", "house_pension")
+
+# The inputs that make a house passive. Every other input describes the person, finance, or energy market, and is
+# shared by the houses being compared.
+PASSIVE_ONLY = ("passive_house_premium_pcnt", "annual_heating_kwh_m2a")
+
+
+def lifetime_cost(totals: pd.DataFrame) -> np.ndarray:
+    """Return the lifetime cost of each scenario from its totals, NaN for infeasible scenarios."""
+    return totals[list(COST_STREAMS)].sum(axis=1, skipna=False).to_numpy()
+
+
+def compare(
+    passive: ScenarioBatch, average: ScenarioBatch, **sweep_kwargs
+) -> pd.DataFrame:
+    """
+    Compare each passive scenario with the average scenario in the same position.
+
+    Parameters
+    ----------
+    passive The passive house scenarios
+    average The average house scenarios
+    sweep_kwargs Passed to `run_sweep` e.g. `workers`
+
+    Returns
+    -------
+    A dataframe of the net saving and house pension of each passive scenario, NaN if either scenario is infeasible.
+
+    """
+    passive_totals, average_totals = (
+        run_sweep(batch, **sweep_kwargs) for batch in (passive, average)
+    )
+    return pd.DataFrame(
+        {
+            "net_saving": lifetime_cost(average_totals) - lifetime_cost(passive_totals),
+            "house_pension": average_totals["pension_value"].to_numpy()
+            - passive_totals["pension_value"].to_numpy(),
+        }
+    )
+
+
+def average_counterpart(
+    passive: ScenarioBatch, average: ScenarioParams
+) -> ScenarioBatch:
+    """Return an average house in the circumstances of each passive scenario, i.e. with only `PASSIVE_ONLY` changed."""
+    columns = ScenarioBatch.from_scenarios([average]).columns()
+    return passive.replace(**{name: columns[name][0] for name in PASSIVE_ONLY})
+
+
+def net_saving(passive: ScenarioBatch, average: ScenarioBatch) -> np.ndarray:
+    """Return the net saving of each passive scenario over the average scenario in the same position."""
+    return compare(passive, average)["net_saving"].to_numpy()
+
+
+def net_saving_function(
+    passive: ScenarioParams, average: ScenarioParams, axes: Sequence[str]
+) -> Callable[..., np.ndarray]:
+    """
+    Return the net saving of a passive house as a vectorised function of some parameters, the rest fixed.
+
+    Parameters
+    ----------
+    passive The passive house scenario e.g. `plot/scenario.py`'s `passive`
+    average The average house scenario e.g. `plot/scenario.py`'s `average`
+    axes The parameters that are arguments of the function, e.g. ("tariff", "cagr_pcnt")
+
+    Returns
+    -------
+    A function of one array per axis, in order, returning the net saving at each point.
+
+    """
+    spaces = [
+        ScenarioSpace.from_scenario(p, {name: [0] for name in axes})
+        for p in (passive, average)
+    ]
+
+    def evaluate(*values: np.ndarray) -> np.ndarray:
+        points = dict(zip(axes, values))
+        return net_saving(*(space.at(points) for space in spaces))
+
+    return evaluate
@@ -5,19 +5,26 @@ Compute difference and variation of heating energy cost to tariff and tariff gro
 """
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from pension_calculator import CONFIG, CURRENT_YEAR
+from pension_calculator.compute.chunking import (
+    choose_chunk_size,
+    estimate_bytes_per_scenario,
+)
 from pension_calculator.compute.utils import (
     compute_energy_growth_rates,
     compute_energy_prices,
     make_column_index,
 )
-from pension_calculator.models import Energy, Person
+from pension_calculator.models import Person
 
 
 def compute_heating_cost_sensitivities(
-    person: Person, house_area_m2: Optional[float] = None
+    person: Person,
+    house_area_m2: Optional[float] = None,
+    memory_budget_bytes: Optional[int] = None,
 ) -> pd.DataFrame:
     """
     Compute the heating energy cost of an "average" house relative to a passive house for a range of
@@ -26,10 +33,14 @@ def compute_heating_cost_sensitivities(
     The energy cost is computed from the energy intensity of the house and the area. Energy cost is inflated from the
     year the script is run until the year of death computed from the year of birth.
 
+    The growth of the tariff is computed for every growth rate and year at once, a chunk of growth rates at a time,
+    with chunks sized to keep the (growth rates, years) array under the memory budget as in a sweep.
+
     Parameters
     ----------
-    year_of_birth The year of birth to compute year of death from (default set from CONFIG file)
+    person The person whose year of death ends the payments
     house_area_m2 The size of the house in square metres (default set from CONFIG file)
+    memory_budget_bytes The memory available for the growth of the tariff (default set from CONFIG file)
 
     Returns
     -------
@@ -42,22 +53,27 @@ def compute_heating_cost_sensitivities(
     energy_prices = compute_energy_prices()
     growth_rates = compute_energy_growth_rates()
 
+    # The growth of the tariff summed over the years of payments, for each growth rate.
+    periods = np.arange(person.yod - CURRENT_YEAR + 1)
+    chunk_size = choose_chunk_size(
+        estimate_bytes_per_scenario(len(periods), n_streams=1),
+        memory_budget_bytes=memory_budget_bytes,
+    )
+    growth = np.concatenate(
+        [
+            np.exp(periods[None, :] * np.log1p(rates[:, None])).sum(axis=1)
+            for rates in np.split(
+                growth_rates, range(chunk_size, len(growth_rates), chunk_size)
+            )
+        ]
+    )
+
     df = pd.DataFrame(index=growth_rates, columns=make_column_index(energy_prices))
 
     for house_type, kwh_m2 in CONFIG.get("energy_use").items():
         for energy_price in energy_prices:
-            total_payments = []
-            for growth_rate in growth_rates:
-
-                energy = Energy(tariff=energy_price, cagr_pcnt=growth_rate)
-                annual_payments = energy.annual_payments(
-                    house_kwh_m2a=kwh_m2,
-                    house_area_m2=house_area_m2,
-                    first_year=CURRENT_YEAR,
-                    last_year=person.yod,
-                )
-                total_payments.append(annual_payments.sum())
-
-            df[house_type, energy_price] = total_payments
+            df[house_type, energy_price] = (
+                kwh_m2 * house_area_m2 * energy_price * growth
+            )
 
     return df
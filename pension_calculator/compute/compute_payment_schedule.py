@@ -8,6 +8,8 @@ Richard Lyon
 
 """
 
+from dataclasses import replace
+
 import pandas as pd
 
 from pension_calculator.models import Energy, House, Mortgage, Pension, Person
@@ -49,7 +51,7 @@ def compute_payment_schedule(
         year_of_death=p.person.yod,
     )
 
-    p.pension.target = retirement_heating_cost
+    pension = replace(p.pension, target=retirement_heating_cost)
 
     annual_heating_payments = p.energy.annual_payments(
         house_kwh_m2a=p.house.annual_heating_kwh_m2a,
@@ -58,8 +60,8 @@ def compute_payment_schedule(
         last_year=p.person.yod,
     )
     annual_mortgage_payments = p.mortgage.annual_payments()["total"]
-    annual_pension_payments = p.pension.annual_payments()["payment"]
-    annual_pension_value = p.pension.annual_payments()["value"]
+    annual_pension_payments = pension.annual_payments()["payment"]
+    annual_pension_value = pension.annual_payments()["value"]
 
     # print()
     # print(annual_mortgage_payments)
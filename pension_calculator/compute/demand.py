@@ -0,0 +1,119 @@
+"""
+demand.py
+
+Scale the annual heating cost of each year by the hourly heating demand and a time-of-use tariff.
+
+A house's `annual_heating_kwh_m2a` is taken as its demand in an average year of the weather data. In each calendar
+year the demand is spread over the hours of one year of the weather data, cycling through them, and priced at the
+time-of-use tariff. The heating cost of the year is then the cost at a flat tariff times
+
+    sum over hours of (degree hours * tariff multiplier) / mean annual degree hours of the weather data
+
+Temperatures can rise by `warming_per_year` from the reference year, which lowers the demand of later years.
+
+The factor of each year is computed once from its 8760-hour profile and shared by every scenario, so the kernels
+never hold an hourly array per scenario. Years are computed a chunk at a time to bound the hourly arrays. A sweep
+computes the factors of all its years up front, and sends workers a `YearFactors` table rather than the weather.
+"""
+
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from pension_calculator import CURRENT_YEAR
+from pension_calculator.models.demand import (
+    BASE_TEMPERATURE,
+    TimeOfUseTariff,
+    Weather,
+    degree_hours,
+)
+
+
+class YearFactors(NamedTuple):
+    """The heating cost multiple of each of a run of consecutive years, e.g. from `HourlyDemand.table`.
+
+    Instances are functions of calendar years like `HourlyDemand`, and are small to send to worker processes.
+
+    Attributes:
+        first_year: The first year of the table.
+        factors: The factor of each year from the first.
+    """
+
+    first_year: int
+    factors: np.ndarray
+
+    @property
+    def last_year(self) -> int:
+        """The last year of the table."""
+        return self.first_year + len(self.factors) - 1
+
+    def __call__(self, years) -> np.ndarray:
+        """Return the factor of each calendar year, of any shape."""
+        offset = np.asarray(years, dtype=int) - self.first_year
+        if offset.size and (offset.min() < 0 or offset.max() >= len(self.factors)):
+            raise KeyError(
+                f"Heating factors are only tabled from {self.first_year} to {self.last_year}"
+            )
+        return self.factors[offset]
+
+
+class HourlyDemand:
+    """The multiple of each year's flat-tariff heating cost from hourly demand and a time-of-use tariff.
+
+    Instances are functions of calendar years, for the `heating_factor` of `kernels.payment_schedules`.
+
+    Args:
+        weather: The hourly temperatures, cycled from the reference year.
+        tariff: The time-of-use tariff (default flat).
+        base_temperature: The temperature below which the house is heated.
+        warming_per_year: The rise in temperature each year after the reference year, in Celsius.
+        reference_year: The year of the first year of the weather data.
+        chunk_years: The number of years of hourly profiles computed at a time.
+    """
+
+    def __init__(
+        self,
+        weather: Weather,
+        tariff: Optional[TimeOfUseTariff] = None,
+        base_temperature: float = BASE_TEMPERATURE,
+        warming_per_year: float = 0.0,
+        reference_year: int = CURRENT_YEAR,
+        chunk_years: int = 10,
+    ):
+        self.weather = weather
+        self.tariff = TimeOfUseTariff.flat() if tariff is None else tariff
+        self.base_temperature = base_temperature
+        self.warming_per_year = warming_per_year
+        self.reference_year = reference_year
+        self.chunk_years = chunk_years
+        self.mean_degree_hours = (
+            degree_hours(weather.temperatures, base_temperature).sum(axis=1).mean()
+        )
+        self._factors: Dict[int, float] = {}
+
+    def _compute(self, years: np.ndarray) -> np.ndarray:
+        """Return the factor of each year from its hourly profile."""
+        offset = years - self.reference_year
+        temperatures = (
+            self.weather.temperatures[offset % self.weather.n_years]
+            + self.warming_per_year * offset[:, None]
+        )
+        demand = degree_hours(temperatures, self.base_temperature)
+        return demand @ self.tariff.multipliers / self.mean_degree_hours
+
+    def __call__(self, years) -> np.ndarray:
+        """Return the factor of each calendar year, of any shape."""
+        years = np.asarray(years, dtype=int)
+        unique, inverse = np.unique(years, return_inverse=True)
+        missing = np.array([y for y in unique if y not in self._factors], dtype=int)
+        for start in range(0, len(missing), self.chunk_years):
+            chunk = missing[start : start + self.chunk_years]
+            self._factors.update(zip(chunk.tolist(), self._compute(chunk)))
+        factors = np.array([self._factors[y] for y in unique.tolist()])
+        return factors[inverse].reshape(years.shape)
+
+    def table(self, first_year: int, last_year: int) -> YearFactors:
+        """Return the factors of the years from one to another, inclusive, as a table."""
+        return YearFactors(
+            first_year=first_year, factors=self(np.arange(first_year, last_year + 1))
+        )
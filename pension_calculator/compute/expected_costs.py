@@ -0,0 +1,99 @@
+"""
+expected_costs.py
+
+Survival-weighted expected heating costs, pension targets, and drawdowns of many scenarios, from a life table.
+
+Rather than running every cost to a fixed year of death, a payment due in a year is weighted by the probability that
+the person is alive to pay it: heating and pension payments by the probability of surviving from the purchase year,
+and the retirement heating the pension must fund by the probability of surviving from retirement. Weighting each year
+by survival gives the expectation over every age of death at once, without a schedule per age of death.
+
+Arrays have a column per age of the life table, for every scenario, so many years of birth are computed together.
+With a life table in which everybody dies at the configured life expectancy, the results match
+`pension_calculator.compute.kernels`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.kernels import PENSION_AGE
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.validation import validate_batch
+from pension_calculator.models.mortality import LifeTable
+from pension_calculator.models.pension import compound_sum
+
+EXPECTED = ("heating", "pension", "pension_target")
+
+
+def _heating_by_age(batch: ScenarioBatch, table: LifeTable) -> np.ndarray:
+    """Return the heating cost of each scenario at each age of the table, zero before purchase."""
+    years = batch.yob[:, None] + table.ages[None, :]
+    periods = years - batch.purchase_year[:, None]
+    initial_cost = batch.annual_heating_kwh_m2a * batch.area_m2 * batch.tariff
+    with np.errstate(over="ignore"):
+        heating = initial_cost[:, None] * np.exp(
+            periods * np.log1p(batch.cagr_pcnt)[:, None]
+        )
+    return np.where(periods >= 0, heating, 0.0)
+
+
+def expected_drawdowns(batch: ScenarioBatch, table: LifeTable) -> np.ndarray:
+    """
+    Compute the expected heating cost drawn from the pension at each age of retirement.
+
+    Parameters
+    ----------
+    batch The scenarios
+    table The life table
+
+    Returns
+    -------
+    An array of shape (scenarios, ages) of the heating cost at each age of `table.ages` weighted by the probability
+    of surviving to it from retirement, or from purchase if later. It is zero before then, and NaN for infeasible
+    scenarios.
+
+    """
+    purchase_age = batch.purchase_year - batch.yob
+    from_age = np.maximum(PENSION_AGE, purchase_age)
+    drawn = table.ages[None, :] >= from_age[:, None]
+    drawdowns = _heating_by_age(batch, table) * table.survival(from_age) * drawn
+    drawdowns[~validate_batch(batch).valid] = np.nan
+    return drawdowns
+
+
+def expected_totals(batch: ScenarioBatch, table: LifeTable) -> pd.DataFrame:
+    """
+    Compute the expected lifetime heating and pension payments, and pension target, of many scenarios.
+
+    Parameters
+    ----------
+    batch The scenarios
+    table The life table
+
+    Returns
+    -------
+    A dataframe with a column for each of `EXPECTED`. The pension target is the expected retirement heating cost,
+    the sum of `expected_drawdowns`, and the pension is paid towards it in each year the person survives from
+    purchase. Infeasible scenarios are NaN.
+
+    """
+    purchase_age = batch.purchase_year - batch.yob
+    ages = table.ages[None, :]
+    alive = table.survival(purchase_age) * (ages >= purchase_age[:, None])
+
+    heating = (_heating_by_age(batch, table) * alive).sum(axis=1)
+    target = expected_drawdowns(batch, table).sum(axis=1)
+
+    years = batch.yob[:, None] + ages
+    paying = (years >= batch.pension_start_year[:, None]) & (
+        years < batch.pension_end_year[:, None]
+    )
+    duration = batch.pension_end_year - batch.pension_start_year
+    annual_payment = target / compound_sum(batch.growth_rate_pcnt, duration)
+    pension = annual_payment * (alive * paying).sum(axis=1)
+
+    df = pd.DataFrame(
+        {"heating": heating, "pension": pension, "pension_target": target}
+    )
+    df.loc[~validate_batch(batch).valid] = np.nan
+    return df
@@ -0,0 +1,132 @@
+"""
+gradients.py
+
+Analytic derivatives of the lifetime totals of many scenarios, from the closed forms in `pension_calculator.models`.
+
+The totals follow `pension_calculator.compute.kernels`: heating from the purchase year to the year of death, level
+mortgage payments over the term, and pension payments, within the schedule, that reach the retirement heating cost.
+Derivatives with respect to the mortgage length treat it as continuous.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.kernels import LIFE_EXPECTANCY, PENSION_AGE, STREAMS
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.validation import validate_batch
+from pension_calculator.models.energy import (
+    heating_cost_total,
+    heating_cost_total_gradient,
+)
+from pension_calculator.models.mortgage import mortgage_total, mortgage_total_gradient
+from pension_calculator.models.pension import compound_sum, compound_sum_derivative
+
+PARAMETERS = (
+    "tariff",
+    "cagr_pcnt",
+    "interest_rate_pcnt",
+    "length_years",
+    "deposit_pcnt",
+    "passive_house_premium_pcnt",
+    "growth_rate_pcnt",
+)
+
+
+def total_gradients(batch: ScenarioBatch) -> pd.DataFrame:
+    """
+    Compute the lifetime totals of many scenarios, and their derivatives with respect to each of `PARAMETERS`.
+
+    Parameters
+    ----------
+    batch The scenarios
+
+    Returns
+    -------
+    A dataframe with columns (stream, "value") for the totals of each stream and (stream, parameter) for their
+    derivatives, as in `SweepChunk.totals`. Infeasible scenarios are NaN.
+
+    """
+    b = batch
+    purchase_year = b.purchase_year.astype(float)
+    yor = b.yob + PENSION_AGE
+    yod = b.yob + LIFE_EXPECTANCY
+    zero = np.zeros(len(b))
+
+    # Heating from the purchase year to the year of death, and the pension target from retirement to death.
+
+    annual_kwh = b.annual_heating_kwh_m2a * b.area_m2
+    n_years = yod - purchase_year + 1
+    retirement_from = np.clip(yor - purchase_year, 0, n_years)
+    energy = (b.tariff, b.cagr_pcnt, annual_kwh)
+    heating = heating_cost_total(*energy, 0, n_years)
+    d_heating = heating_cost_total_gradient(*energy, 0, n_years)
+    target = heating_cost_total(*energy, retirement_from, n_years)
+    d_target = heating_cost_total_gradient(*energy, retirement_from, n_years)
+
+    # Mortgage, with the loan amount's derivatives by the chain rule. Only a mortgage that finances the total cost of
+    # the house depends on the premium.
+
+    price = b.mortgage_price()
+    finances_house = np.isnan(b.mortgage_purchase_price)
+    loan = price * (1 - b.deposit_pcnt)
+    mortgage = mortgage_total(loan, b.interest_rate_pcnt, b.length_years)
+    d_mortgage = mortgage_total_gradient(loan, b.interest_rate_pcnt, b.length_years)
+
+    # Pension: the annual payment reaches the target over the whole saving period, but only the years within the
+    # schedule are paid, and the pension's value peaks in the last of them.
+
+    growth, duration = b.growth_rate_pcnt, b.pension_end_year - b.pension_start_year
+    paid_from = np.maximum(b.pension_start_year, purchase_year)
+    paid_to = np.minimum(b.pension_end_year, yod + 1)
+    paid_years = np.maximum(paid_to - paid_from, 0)
+    peak_periods = np.where(paid_years > 0, paid_to - b.pension_start_year, 0)
+
+    factor = compound_sum(growth, duration)
+    d_factor = compound_sum_derivative(growth, duration)
+    peak_factor = compound_sum(growth, peak_periods)
+    d_peak_factor = compound_sum_derivative(growth, peak_periods)
+
+    pension = target * paid_years / factor
+    pension_value = target * peak_factor / factor
+
+    streams = {
+        "heating": {
+            "value": heating,
+            "tariff": d_heating["tariff"],
+            "cagr_pcnt": d_heating["cagr_pcnt"],
+        },
+        "mortgage": {
+            "value": mortgage,
+            "interest_rate_pcnt": d_mortgage["interest_rate_pcnt"],
+            "length_years": d_mortgage["length_years"],
+            "deposit_pcnt": -d_mortgage["loan"] * price,
+            "passive_house_premium_pcnt": np.where(
+                finances_house,
+                d_mortgage["loan"] * b.purchase_cost * (1 - b.deposit_pcnt),
+                0,
+            ),
+        },
+        "pension": {
+            "value": pension,
+            "tariff": d_target["tariff"] * paid_years / factor,
+            "cagr_pcnt": d_target["cagr_pcnt"] * paid_years / factor,
+            "growth_rate_pcnt": -pension * d_factor / factor,
+        },
+        "pension_value": {
+            "value": pension_value,
+            "tariff": d_target["tariff"] * peak_factor / factor,
+            "cagr_pcnt": d_target["cagr_pcnt"] * peak_factor / factor,
+            "growth_rate_pcnt": target
+            * (d_peak_factor * factor - peak_factor * d_factor)
+            / factor**2,
+        },
+    }
+
+    columns = {
+        (stream, name): streams[stream].get(name, zero)
+        for stream in STREAMS
+        for name in ("value",) + PARAMETERS
+    }
+    df = pd.DataFrame(columns)
+    df.loc[~validate_batch(batch).valid] = np.nan
+    return df
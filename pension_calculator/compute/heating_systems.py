@@ -0,0 +1,141 @@
+"""
+heating_systems.py
+
+Compute the fuel payments of many scenarios with different heating systems, as one array stacked across scenarios,
+years, and fuels.
+
+Each fuel has its own tariff and growth, from the CONFIG file by default (`variable_unit_cost_<fuel>` and the `[CAGR]`
+section, or `[tariff_curves.<fuel>]`), in place of the single tariff and CAGR of each scenario. Heating runs from the
+purchase year to the year of death, as in `pension_calculator.compute.kernels`, and the pension of each scenario
+saves for its own heating system's fuel payments in retirement.
+"""
+
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.kernels import (
+    LIFE_EXPECTANCY,
+    YEAR_OFFSET_DTYPE,
+    Schedules,
+    pension_schedules,
+)
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.validation import validate_batch
+from pension_calculator.models.heating_system import (
+    FUELS,
+    HeatingSystem,
+    fuel_tariffs,
+    fuel_use,
+)
+from pension_calculator.models.tariff import TariffCurve
+
+
+def fuel_schedules(
+    batch: ScenarioBatch,
+    systems: Sequence[HeatingSystem],
+    system_index: np.ndarray,
+    ventilation_kwh_m2a=0.0,
+    tariffs: Optional[Mapping[str, float]] = None,
+    curves: Optional[Mapping[str, TariffCurve]] = None,
+) -> Schedules:
+    """
+    Compute the annual payments for each fuel of many scenarios.
+
+    Parameters
+    ----------
+    batch The scenarios, whose tariff and CAGR are replaced by those of each fuel
+    systems The heating systems
+    system_index The position in `systems` of the heating system of each scenario
+    ventilation_kwh_m2a The electricity used by mechanical ventilation in each house
+    tariffs The tariff of each fuel in the purchase year (default `fuel_tariffs`)
+    curves The growth of the tariff of each fuel (default `TariffCurve.from_config`)
+
+    Returns
+    -------
+    The schedules, with `FUELS` in place of streams, from the earliest purchase year to the latest year of death.
+    Infeasible scenarios are NaN.
+
+    """
+    tariffs = fuel_tariffs() if tariffs is None else tariffs
+    curves = {} if curves is None else curves
+    system_index = np.asarray(system_index)
+    fuel_index = np.array([FUELS.index(s.fuel) for s in systems])[system_index]
+    efficiency = np.array([s.efficiency for s in systems])[system_index]
+    use = fuel_use(
+        fuel_index,
+        efficiency,
+        batch.annual_heating_kwh_m2a,
+        batch.area_m2,
+        ventilation_kwh_m2a,
+    )
+
+    purchase_year = batch.purchase_year[:, None]
+    yod = batch.yob[:, None] + LIFE_EXPECTANCY
+    base_year = int(purchase_year.min())
+    year_offsets = np.arange(int(yod.max()) - base_year + 1).astype(YEAR_OFFSET_DTYPE)
+    years = base_year + year_offsets.astype(int)[None, :]
+    in_schedule = (years >= purchase_year) & (years <= yod)
+
+    growth = np.stack(
+        [
+            (curves.get(fuel) or TariffCurve.from_config(fuel)).growth_factors(
+                purchase_year, years
+            )
+            for fuel in FUELS
+        ],
+        axis=-1,
+    )
+    price = np.array([tariffs[fuel] for fuel in FUELS])
+    values = np.where(in_schedule[..., None], use[:, None, :] * price * growth, 0.0)
+    values[~validate_batch(batch).valid] = np.nan
+    return Schedules(base_year=base_year, year_offsets=year_offsets, values=values)
+
+
+def compare_heating_systems(
+    batch: ScenarioBatch,
+    systems: Sequence[HeatingSystem],
+    ventilation_kwh_m2a=0.0,
+    **fuel_kwargs,
+) -> pd.DataFrame:
+    """
+    Compute the lifetime fuel and pension payments of every scenario with every heating system, in one batched
+    evaluation. The pension target is the system's fuel payments in retirement.
+
+    Parameters
+    ----------
+    batch The scenarios
+    systems The heating systems to compare
+    ventilation_kwh_m2a The electricity used by mechanical ventilation in each house
+    fuel_kwargs Passed to `fuel_schedules` e.g. `tariffs`
+
+    Returns
+    -------
+    A dataframe indexed by scenario and system name, of the lifetime payments for each fuel and their total, and
+    the lifetime pension payments.
+
+    """
+    n = len(batch)
+    scenario = np.tile(np.arange(n), len(systems))
+    system_index = np.repeat(np.arange(len(systems)), n)
+    ventilation = np.broadcast_to(np.asarray(ventilation_kwh_m2a, dtype=float), (n,))
+    batch = batch[scenario]
+    schedules = fuel_schedules(
+        batch,
+        systems,
+        system_index,
+        ventilation_kwh_m2a=ventilation[scenario],
+        **fuel_kwargs,
+    )
+    totals = pd.DataFrame(
+        schedules.values.sum(axis=1),
+        columns=list(FUELS),
+        index=pd.MultiIndex.from_arrays(
+            [scenario, [systems[i].name for i in system_index]],
+            names=["scenario", "system"],
+        ),
+    )
+    totals["total"] = totals.sum(axis=1, skipna=False)
+    totals["pension"] = pension_schedules(batch, schedules).values[:, :, 0].sum(axis=1)
+    return totals.sort_index()
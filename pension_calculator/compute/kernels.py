@@ -0,0 +1,262 @@
+"""
+kernels.py
+
+Vectorised payment schedule kernels: compute the energy, mortgage, and pension schedules of many scenarios at once.
+
+Scenarios are passed as a `ScenarioBatch`, one array per parameter, and schedules are returned as a dense array of shape
+(scenarios, years, streams) on a common year axis. Years are stored as int16 offsets from a base year, and the
+kernels run in the requested floating point precision.
+
+The energy tariff grows at each scenario's CAGR, or along a `TariffCurve` shared by every scenario. Each year's heating
+cost can also be scaled by hourly demand and a time-of-use tariff, see `pension_calculator.compute.demand`.
+
+The kernels follow `compute_payment_schedule`, and like it refuse scenarios whose mortgage is not paid before
+retirement and death. A sweep checks every constraint first with `pension_calculator.compute.validation` and only
+passes the feasible scenarios.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.models.tariff import TariffCurve
+from pension_calculator.plot.scenario import ScenarioParams
+
+STREAMS = ("heating", "mortgage", "pension", "pension_value")
+
+PENSION_AGE = CONFIG.get("basic").get("pension_age")
+LIFE_EXPECTANCY = CONFIG.get("basic").get("life_expectancy")
+
+YEAR_OFFSET_DTYPE = np.int16
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+
+class Schedules(NamedTuple):
+    """Payment schedules of many scenarios.
+
+    Attributes:
+        base_year: The first year of the year axis.
+        year_offsets: The years of the schedules as offsets from `base_year`.
+        values: An array of shape (scenarios, years, streams). Years outside a stream's schedule are zero.
+    """
+
+    base_year: int
+    year_offsets: np.ndarray
+    values: np.ndarray
+
+    @property
+    def years(self) -> np.ndarray:
+        """The calendar years of the schedules."""
+        return self.base_year + self.year_offsets.astype(int)
+
+
+# Compound growth is computed via log1p/expm1, which keeps small rates accurate in single precision.
+
+
+def _growth_factor(rate: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """Return (1 + rate) ** periods."""
+    return np.exp(periods * np.log1p(rate))
+
+
+def _annuity_factor(rate: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """Return ((1 + rate) ** periods - 1) / rate, which tends to `periods` as the rate tends to zero."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.expm1(periods * np.log1p(rate)) / rate
+    return np.where(rate == 0, periods, factor)
+
+
+def payment_schedules(
+    batch: ScenarioBatch,
+    dtype: np.dtype = np.float64,
+    curve: Optional[TariffCurve] = None,
+    heating_factor: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Schedules:
+    """
+    Compute the energy, mortgage, and pension schedules of many scenarios.
+
+    Parameters
+    ----------
+    batch The scenario parameters
+    dtype The floating point precision to compute and store the schedules in
+    curve The growth of the tariff year by year, which replaces the CAGR of every scenario if given
+    heating_factor A function of the calendar years giving a multiple of each year's heating cost, e.g.
+        `demand.HourlyDemand`
+
+    Returns
+    -------
+    The schedules, from the earliest purchase year to the latest year of death.
+
+    """
+    final_year = batch.mortgage_final_year()
+    unpaid = final_year >= batch.yob + min(PENSION_AGE, LIFE_EXPECTANCY)
+    if unpaid.any():
+        i = int(np.argmax(unpaid))
+        raise ValueError(
+            f"Scenario {i} retires or dies before the mortgage is paid "
+            f"({batch.yob[i] + PENSION_AGE} vs. {final_year[i]}), see `validate_batch`"
+        )
+
+    dtype = np.dtype(dtype)
+    col = _columns(batch, dtype)
+
+    purchase_year = col["purchase_year"]
+    yod = col["yob"] + LIFE_EXPECTANCY
+
+    base_year = int(purchase_year.min())
+    year_offsets = np.arange(int(yod.max()) - base_year + 1).astype(YEAR_OFFSET_DTYPE)
+    years = base_year + year_offsets.astype(int)[None, :]
+    in_schedule = (years >= purchase_year) & (years <= yod)
+
+    # Heating: the first year's cost inflated at the energy CAGR, or along the tariff curve.
+
+    initial_cost = col["annual_heating_kwh_m2a"] * col["area_m2"] * col["tariff"]
+    if curve is None:
+        heating_periods = (years - purchase_year).astype(dtype)
+        growth = _growth_factor(col["cagr_pcnt"], heating_periods)
+    else:
+        growth = curve.growth_factors(purchase_year, years).astype(dtype)
+    if heating_factor is not None:
+        growth = growth * heating_factor(years).astype(dtype)
+    heating = np.where(in_schedule, initial_cost * growth, 0).astype(dtype)
+
+    # Mortgage: level monthly payments over the term, from the year the mortgage starts.
+
+    price = batch.mortgage_price()[:, None].astype(dtype)
+    loan = price * (1 - col["deposit_pcnt"])
+    monthly_rate = col["interest_rate_pcnt"] / 12
+    n_months = (col["length_years"] * 12).astype(dtype)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        monthly_payment = np.where(
+            monthly_rate == 0,
+            loan / n_months,
+            loan * monthly_rate / -np.expm1(-n_months * np.log1p(monthly_rate)),
+        )
+    mortgage_year = col["mortgage_purchase_year"]
+    in_mortgage = (
+        in_schedule
+        & (years >= mortgage_year)
+        & (years < mortgage_year + col["length_years"])
+    )
+    mortgage = np.where(in_mortgage, 12 * monthly_payment, 0).astype(dtype)
+
+    # Pension: level payments that reach the retirement heating cost.
+
+    pension, pension_value = _pension(col, heating, years, in_schedule, dtype)
+
+    return Schedules(
+        base_year=base_year,
+        year_offsets=year_offsets,
+        values=np.stack([heating, mortgage, pension, pension_value], axis=-1),
+    )
+
+
+def pension_schedules(batch: ScenarioBatch, heating: Schedules) -> Schedules:
+    """
+    Compute the pension schedules of many scenarios that save for a given heating cost in retirement, e.g. the fuel
+    payments of each scenario with another heating system from `heating_systems.fuel_schedules`.
+
+    Parameters
+    ----------
+    batch The scenario parameters
+    heating Schedules of the heating cost of each scenario, summed across their streams e.g. fuels
+
+    Returns
+    -------
+    The pension and pension value schedules, on the year axis and in the precision of `heating`.
+
+    """
+    dtype = heating.values.dtype
+    col = _columns(batch, dtype)
+    years = heating.years[None, :]
+    in_schedule = (years >= col["purchase_year"]) & (
+        years <= col["yob"] + LIFE_EXPECTANCY
+    )
+    pension, pension_value = _pension(
+        col, heating.values.sum(axis=-1), years, in_schedule, dtype
+    )
+    return Schedules(
+        base_year=heating.base_year,
+        year_offsets=heating.year_offsets,
+        values=np.stack([pension, pension_value], axis=-1),
+    )
+
+
+def _columns(batch: ScenarioBatch, dtype: np.dtype) -> Dict[str, np.ndarray]:
+    """Return the columns of a batch as column vectors, the floating point ones in the given precision."""
+    return {
+        name: values[:, None].astype(dtype if values.dtype.kind == "f" else int)
+        for name, values in batch.columns().items()
+    }
+
+
+def _pension(
+    col: Dict[str, np.ndarray],
+    heating: np.ndarray,
+    years: np.ndarray,
+    in_schedule: np.ndarray,
+    dtype: np.dtype,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the pension payments and value: level payments that reach the retirement heating cost."""
+    yor = col["yob"] + PENSION_AGE
+    target = np.where(years >= yor, heating, 0).sum(axis=1, keepdims=True)
+    growth_rate = col["growth_rate_pcnt"]
+    duration = (col["pension_end_year"] - col["pension_start_year"]).astype(dtype)
+    annual_payment = target / _annuity_factor(growth_rate, duration)
+    in_pension = (
+        in_schedule
+        & (years >= col["pension_start_year"])
+        & (years < col["pension_end_year"])
+    )
+    pension = np.where(in_pension, annual_payment, 0).astype(dtype)
+    pension_periods = (years - col["pension_start_year"] + 1).astype(dtype)
+    pension_value = np.where(
+        in_pension, annual_payment * _annuity_factor(growth_rate, pension_periods), 0
+    ).astype(dtype)
+    return pension, pension_value
+
+
+def schedule_totals(schedules: Schedules) -> np.ndarray:
+    """Return the lifetime payments of each stream, and the peak pension value, with shape (scenarios, streams).
+
+    Totals are accumulated in double precision whatever the precision of the schedules.
+    """
+    totals = schedules.values.sum(axis=1, dtype=np.float64)
+    pension_value = STREAMS.index("pension_value")
+    totals[:, pension_value] = schedules.values[:, :, pension_value].max(axis=1)
+    return totals
+
+
+def precision_report(
+    scenarios: Sequence[ScenarioParams], dtype: np.dtype = np.float32
+) -> pd.DataFrame:
+    """
+    Compare the totals computed in a reduced precision against the double precision reference.
+
+    Parameters
+    ----------
+    scenarios The scenarios to compare e.g. the quality-control cases
+    dtype The reduced precision
+
+    Returns
+    -------
+    A dataframe of the maximum absolute (£) and relative error of each stream.
+
+    """
+    batch = ScenarioBatch.from_scenarios(scenarios)
+    reference = schedule_totals(payment_schedules(batch, np.float64))
+    reduced = schedule_totals(payment_schedules(batch, dtype))
+    abs_error = np.abs(reduced - reference)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel_error = np.where(reference == 0, 0, abs_error / np.abs(reference))
+
+    return pd.DataFrame(
+        {
+            "max_abs_error": abs_error.max(axis=0),
+            "max_rel_error": rel_error.max(axis=0),
+        },
+        index=list(STREAMS),
+    )
@@ -0,0 +1,295 @@
+"""
+metrics.py
+
+Live throughput and memory metrics for long-running scenario sweeps.
+
+A `SweepMetrics` object is updated by the sweep as scenarios complete. Snapshots of it are published to one or more
+sinks (a log line, a Prometheus text-format file, or a local HTTP endpoint) by a `MetricsReporter` running in a
+background thread.
+"""
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Protocol
+
+from pension_calculator.compute.atomic import write_text
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of the current process in bytes.
+
+    Reads `/proc/self/statm` where available and otherwise falls back to the peak RSS reported by `getrusage`.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    """A point-in-time view of sweep progress.
+
+    Attributes:
+        total: The number of scenarios in the sweep.
+        completed: The number of scenarios evaluated so far.
+        elapsed_s: Seconds since the sweep started.
+        scenarios_per_s: Mean throughput since the sweep started.
+        queue_depth: Scenarios submitted but not yet completed, per queue e.g. 'main' or the worker 'pool'.
+        cache_hit_rate: Fraction of cache lookups that hit, or None if no lookups were recorded.
+        rss_bytes: Resident set size of the process.
+        eta_s: Estimated seconds to completion, or None before any scenario completes.
+        peak_bytes: The largest traced allocation recorded for a chunk, or None if none was recorded.
+    """
+
+    total: int
+    completed: int
+    elapsed_s: float
+    scenarios_per_s: float
+    queue_depth: Dict[str, int]
+    cache_hit_rate: Optional[float]
+    rss_bytes: int
+    eta_s: Optional[float]
+    peak_bytes: Optional[int] = None
+
+    def to_prometheus(self, prefix: str = "pension_sweep") -> str:
+        """Render the snapshot in the Prometheus text exposition format."""
+        lines = [
+            f"# TYPE {prefix}_scenarios_total gauge",
+            f"{prefix}_scenarios_total {self.total}",
+            f"# TYPE {prefix}_scenarios_completed_total counter",
+            f"{prefix}_scenarios_completed_total {self.completed}",
+            f"# TYPE {prefix}_scenarios_per_second gauge",
+            f"{prefix}_scenarios_per_second {self.scenarios_per_s:.6g}",
+            f"# TYPE {prefix}_queue_depth gauge",
+        ]
+        for worker, depth in sorted(self.queue_depth.items()):
+            lines.append(f'{prefix}_queue_depth{{worker="{worker}"}} {depth}')
+        if self.cache_hit_rate is not None:
+            lines.append(f"# TYPE {prefix}_cache_hit_rate gauge")
+            lines.append(f"{prefix}_cache_hit_rate {self.cache_hit_rate:.6g}")
+        lines.append(f"# TYPE {prefix}_rss_bytes gauge")
+        lines.append(f"{prefix}_rss_bytes {self.rss_bytes}")
+        if self.peak_bytes is not None:
+            lines.append(f"# TYPE {prefix}_chunk_peak_bytes gauge")
+            lines.append(f"{prefix}_chunk_peak_bytes {self.peak_bytes}")
+        if self.eta_s is not None:
+            lines.append(f"# TYPE {prefix}_eta_seconds gauge")
+            lines.append(f"{prefix}_eta_seconds {self.eta_s:.6g}")
+        return "\n".join(lines) + "\n"
+
+    def to_log_line(self) -> str:
+        """Render the snapshot as a single human readable line."""
+        queue = sum(self.queue_depth.values())
+        hit_rate = (
+            "n/a" if self.cache_hit_rate is None else f"{self.cache_hit_rate:.1%}"
+        )
+        eta = "n/a" if self.eta_s is None else f"{self.eta_s:.0f}s"
+        peak = (
+            ""
+            if self.peak_bytes is None
+            else f" (chunk peak {self.peak_bytes / 2 ** 20:.0f}MB)"
+        )
+        return (
+            f"{self.completed}/{self.total} scenarios | {self.scenarios_per_s:.1f}/s | "
+            f"queued: {queue} | cache hits: {hit_rate} | "
+            f"RSS: {self.rss_bytes / 2 ** 20:.0f}MB{peak} | ETA: {eta}"
+        )
+
+
+class SweepMetrics:
+    """Thread-safe progress counters for a sweep.
+
+    Args:
+        total: The number of scenarios in the sweep.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._completed = 0
+        self._queued: Dict[str, int] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._peak_bytes: Optional[int] = None
+
+    def submitted(self, worker: str, count: int = 1) -> None:
+        """Record that `count` scenarios were queued on `worker`."""
+        with self._lock:
+            self._queued[worker] = self._queued.get(worker, 0) + count
+
+    def completed(self, worker: str, count: int = 1) -> None:
+        """Record that `count` scenarios queued on `worker` have been evaluated."""
+        with self._lock:
+            self._queued[worker] = max(self._queued.get(worker, 0) - count, 0)
+            self._completed += count
+
+    def record_cache(self, hits: int = 0, misses: int = 0) -> None:
+        """Record cache lookups."""
+        with self._lock:
+            self._cache_hits += hits
+            self._cache_misses += misses
+
+    def record_peak(self, peak_bytes: int) -> None:
+        """Record the peak memory measured while computing a chunk."""
+        with self._lock:
+            self._peak_bytes = max(self._peak_bytes or 0, peak_bytes)
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Return the current state of the sweep."""
+        with self._lock:
+            elapsed = time.monotonic() - self._start
+            completed = self._completed
+            queue_depth = dict(self._queued)
+            lookups = self._cache_hits + self._cache_misses
+            hit_rate = self._cache_hits / lookups if lookups else None
+            peak_bytes = self._peak_bytes
+
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - completed) / rate if rate > 0 else None
+
+        return MetricsSnapshot(
+            total=self.total,
+            completed=completed,
+            elapsed_s=elapsed,
+            scenarios_per_s=rate,
+            queue_depth=queue_depth,
+            cache_hit_rate=hit_rate,
+            rss_bytes=current_rss_bytes(),
+            eta_s=eta,
+            peak_bytes=peak_bytes,
+        )
+
+
+class MetricsSink(Protocol):
+    """Somewhere to publish metrics snapshots."""
+
+    def emit(self, snapshot: MetricsSnapshot) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class LogSink:
+    """Publish snapshots as log lines."""
+
+    def __init__(self, log: logging.Logger = logger, level: int = logging.INFO):
+        self.log = log
+        self.level = level
+
+    def emit(self, snapshot: MetricsSnapshot) -> None:
+        self.log.log(self.level, snapshot.to_log_line())
+
+    def close(self) -> None:
+        pass
+
+
+class PrometheusFileSink:
+    """Publish snapshots to a Prometheus text-format file, e.g. for the node exporter textfile collector.
+
+    The file is replaced atomically so scrapers never see a partial write.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def emit(self, snapshot: MetricsSnapshot) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_text(self.path, snapshot.to_prometheus())
+
+    def close(self) -> None:
+        pass
+
+
+class PrometheusHTTPSink:
+    """Serve the latest snapshot in Prometheus text format from a local HTTP endpoint.
+
+    Args:
+        port: The port to listen on. Use 0 to pick a free port, available afterwards as `port`.
+        host: The interface to bind to.
+    """
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1"):
+        self._body = b""
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = sink._body
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def emit(self, snapshot: MetricsSnapshot) -> None:
+        self._body = snapshot.to_prometheus().encode()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@dataclass
+class MetricsReporter:
+    """Periodically publish snapshots of `metrics` to `sinks` from a background thread.
+
+    Use as a context manager around a sweep; a final snapshot is published on exit.
+
+    Attributes:
+        metrics: The sweep metrics to report.
+        sinks: Where to publish snapshots.
+        interval_s: Seconds between snapshots.
+    """
+
+    metrics: SweepMetrics
+    sinks: Iterable[MetricsSink]
+    interval_s: float = 30.0
+    _stop: threading.Event = field(default_factory=threading.Event, init=False)
+    _thread: Optional[threading.Thread] = field(default=None, init=False)
+
+    def publish(self) -> MetricsSnapshot:
+        """Publish a snapshot to every sink now."""
+        snapshot = self.metrics.snapshot()
+        for sink in self.sinks:
+            sink.emit(snapshot)
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.publish()
+
+    def __enter__(self) -> "MetricsReporter":
+        self.sinks = list(self.sinks)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.publish()
+        for sink in self.sinks:
+            sink.close()
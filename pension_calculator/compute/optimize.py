@@ -0,0 +1,197 @@
+"""
+optimize.py
+
+Choose the mortgage term, deposit, and passive house premium of a passive house for a person, to maximise the net
+lifetime saving over an average house or to minimise the peak annual outlay.
+
+Candidates are searched on a grid: every feasible term, and a few values of the deposit and premium, evaluated as one
+batch. The deposit and premium ranges are then narrowed around the best candidate and the search repeated. Terms are
+limited so that the mortgage is paid before the person retires.
+
+Raising the premium buys a lower heating demand, described by `heating_for_premium`. By default, the heating demand
+falls linearly from the average house's at its premium to the passive house's at its premium, and no further.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pension_calculator.compute.comparison import COST_STREAMS
+from pension_calculator.compute.kernels import PENSION_AGE, STREAMS
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import iter_sweep
+from pension_calculator.compute.validation import validate_batch
+from pension_calculator.plot.scenario import ScenarioParams, average, passive
+
+OBJECTIVES = ("net_saving", "peak_outlay")
+
+DECISIONS = ("length_years", "deposit_pcnt", "passive_house_premium_pcnt")
+
+
+class OptimizationResult(NamedTuple):
+    """The best candidate found.
+
+    Attributes:
+        params: The best term, deposit, and premium, and the heating demand the premium buys.
+        value: The objective at the best candidate.
+        n_evaluations: The number of candidates evaluated.
+    """
+
+    params: Dict[str, float]
+    value: float
+    n_evaluations: int
+
+
+def linear_heating_for_premium(
+    average_params: ScenarioParams, passive_params: ScenarioParams
+) -> Callable[[np.ndarray], np.ndarray]:
+    """Return the heating demand bought by each premium, interpolated between an average and a passive house."""
+    premiums = [
+        average_params.house.passive_house_premium_pcnt,
+        passive_params.house.passive_house_premium_pcnt,
+    ]
+    demands = [
+        average_params.house.annual_heating_kwh_m2a,
+        passive_params.house.annual_heating_kwh_m2a,
+    ]
+
+    def heating_for_premium(premium: np.ndarray) -> np.ndarray:
+        return np.interp(premium, premiums, demands)
+
+    return heating_for_premium
+
+
+def outlays(batch: ScenarioBatch, **sweep_kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the lifetime and peak annual outlay of each scenario.
+
+    Parameters
+    ----------
+    batch The scenarios
+    sweep_kwargs Passed to `iter_sweep`
+
+    Returns
+    -------
+    The lifetime outlay, the deposit plus the heating, mortgage, and pension payments, and the largest sum of those
+    payments in any year. Both are NaN for infeasible scenarios.
+
+    """
+    streams = [STREAMS.index(name) for name in COST_STREAMS]
+    lifetime, peak = [], []
+    for chunk in iter_sweep(batch, **sweep_kwargs):
+        annual = chunk.schedules[:, :, streams].sum(axis=2, dtype=np.float64)
+        lifetime.append(annual.sum(axis=1))
+        peak.append(annual.max(axis=1))
+    deposit = batch.mortgage_price() * batch.deposit_pcnt
+    return np.concatenate(lifetime) + deposit, np.concatenate(peak)
+
+
+def optimize_mortgage(
+    passive_params: ScenarioParams = passive,
+    average_params: ScenarioParams = average,
+    objective: str = "net_saving",
+    terms: Optional[Sequence[int]] = None,
+    deposit_range: Tuple[float, float] = (0.05, 0.4),
+    premium_range: Tuple[float, float] = (0.0, 0.25),
+    heating_for_premium: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    points: int = 9,
+    iterations: int = 6,
+    **sweep_kwargs,
+) -> OptimizationResult:
+    """
+    Search the mortgage term, deposit, and premium of a passive house.
+
+    Parameters
+    ----------
+    passive_params The passive house scenario, whose other parameters are fixed
+    average_params The average house to compare against, for the net saving
+    objective "net_saving" to maximise the net lifetime saving over the average house, counting deposits as outlay,
+        or "peak_outlay" to minimise the largest annual payments
+    terms The mortgage terms to consider (default every term from 5 years until retirement)
+    deposit_range The smallest and largest deposit
+    premium_range The smallest and largest passive house premium
+    heating_for_premium The heating demand bought by each premium (default `linear_heating_for_premium`)
+    points The number of deposits and of premiums in each grid
+    iterations The number of times the grid is narrowed
+    sweep_kwargs Passed to `iter_sweep` e.g. `workers`
+
+    Returns
+    -------
+    The best candidate found. A ValueError names the constraints broken if no candidate is feasible.
+
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective}, expected one of {OBJECTIVES}")
+    if heating_for_premium is None:
+        heating_for_premium = linear_heating_for_premium(average_params, passive_params)
+
+    retirement_term = (
+        passive_params.person.yob + PENSION_AGE - passive_params.house.purchase_year
+    )
+    if terms is None:
+        terms = range(5, retirement_term + 1)
+    terms = np.array([t for t in terms if t <= retirement_term])
+    if not len(terms):
+        raise ValueError(
+            f"No mortgage term is paid before retirement in {retirement_term} years"
+        )
+
+    base = ScenarioBatch.from_scenarios([passive_params])
+    if objective == "net_saving":
+        average_batch = ScenarioBatch.from_scenarios([average_params])
+        average_lifetime, _ = outlays(average_batch)
+        if np.isnan(average_lifetime).any():
+            broken = validate_batch(average_batch).describe(0)
+            raise ValueError(f"The average house is infeasible: {broken}")
+
+    limits = {
+        "deposit_pcnt": deposit_range,
+        "passive_house_premium_pcnt": premium_range,
+    }
+    ranges = dict(limits)
+    n_evaluations = 0
+    best_params, best_score = None, -np.inf
+    for _ in range(iterations):
+        grids = [terms] + [np.linspace(*ranges[name], points) for name in DECISIONS[1:]]
+        candidates = dict(
+            zip(DECISIONS, (g.ravel() for g in np.meshgrid(*grids, indexing="ij")))
+        )
+        batch = base[np.zeros(len(candidates["length_years"]), dtype=int)].replace(
+            annual_heating_kwh_m2a=heating_for_premium(
+                candidates["passive_house_premium_pcnt"]
+            ),
+            **candidates,
+        )
+
+        lifetime, peak = outlays(batch, **sweep_kwargs)
+        scores = average_lifetime - lifetime if objective == "net_saving" else -peak
+        n_evaluations += len(batch)
+        if np.isnan(scores).all():
+            if best_params is None:
+                counts = validate_batch(batch).counts()
+                broken = {name: n for name, n in counts.items() if n}
+                raise ValueError(
+                    f"No candidate of {len(batch)} is feasible, breaking {broken}"
+                )
+            continue
+        i = int(np.nanargmax(scores))
+        if scores[i] >= best_score:
+            best_score = scores[i]
+            best_params = {
+                name: getattr(batch, name)[i].item()
+                for name in DECISIONS + ("annual_heating_kwh_m2a",)
+            }
+
+        # Narrow the continuous ranges to a grid step either side of the best candidate.
+        for name, (low, high) in ranges.items():
+            step = (high - low) / (points - 1)
+            centre = best_params[name]
+            ranges[name] = (
+                max(centre - step, limits[name][0]),
+                min(centre + step, limits[name][1]),
+            )
+
+    value = best_score if objective == "net_saving" else -best_score
+    return OptimizationResult(
+        params=best_params, value=float(value), n_evaluations=n_evaluations
+    )
@@ -0,0 +1,179 @@
+"""
+payback.py
+
+Find the year in which a passive house pays back its premium over an average house, for many pairs of scenarios.
+
+The annual saving of a passive house is the average house's heating, mortgage, and pension payments in a year less
+the passive house's, as in `comparison.compare`. It is usually negative while the larger mortgage is paid and positive
+once the lower heating cost dominates. The payback year is the first year in which the cumulative saving is positive.
+
+The passive and average houses are swept in step, in chunks of the same size, and each pair of chunks is aligned on a
+common calendar year axis before the saving is accumulated. The cumulative saving of each chunk is available from
+`iter_cumulative_saving`, e.g. to plot how the saving evolves, without holding the whole sweep in memory.
+"""
+
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.chunking import (
+    choose_chunk_size,
+    estimate_bytes_per_scenario,
+)
+from pension_calculator.compute.comparison import COST_STREAMS
+from pension_calculator.compute.kernels import PRECISIONS, STREAMS
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import SweepChunk, iter_sweep, sweep_year_span
+
+# The payback year of a passive house that never pays back, or of an infeasible scenario.
+NEVER = -1
+
+
+def first_payback(years: np.ndarray, annual_saving: np.ndarray) -> np.ndarray:
+    """
+    Find the first year in which the cumulative saving of each scenario is positive.
+
+    Parameters
+    ----------
+    years The calendar years, of shape (years,)
+    annual_saving The saving of each scenario in each year, of shape (scenarios, years)
+
+    Returns
+    -------
+    The payback year of each scenario, or `NEVER` if its cumulative saving is never positive or it is NaN.
+
+    """
+    return _first_positive(years, np.cumsum(annual_saving, axis=1))
+
+
+def _first_positive(years: np.ndarray, cumulative_saving: np.ndarray) -> np.ndarray:
+    """Find the first year in which each cumulative saving is positive, or `NEVER`."""
+    paid_back = cumulative_saving > 0
+    first = paid_back.argmax(axis=1)
+    return np.where(paid_back.any(axis=1), years[first], NEVER)
+
+
+class CumulativeSaving(NamedTuple):
+    """The cumulative saving of a chunk of passive houses over average houses.
+
+    Attributes:
+        start: The position of the first pair of scenarios in the sweep.
+        years: The calendar years, of shape (years,).
+        values: The saving of each pair of scenarios up to the end of each year, of shape (scenarios, years). It is
+            NaN where either scenario is infeasible.
+    """
+
+    start: int
+    years: np.ndarray
+    values: np.ndarray
+
+
+def _annual_cost(chunk: SweepChunk, years: np.ndarray) -> np.ndarray:
+    """Return the annual cost of each scenario of a chunk, on a calendar year axis that spans the chunk's."""
+    streams = [STREAMS.index(name) for name in COST_STREAMS]
+    cost = np.zeros((len(chunk), len(years)))
+    offset = chunk.base_year - years[0]
+    cost[:, offset : offset + len(chunk.year_offsets)] = chunk.schedules[
+        :, :, streams
+    ].sum(axis=2, dtype=np.float64)
+    return cost
+
+
+def iter_cumulative_saving(
+    passive: ScenarioBatch,
+    average: ScenarioBatch,
+    chunk_size: Optional[int] = None,
+    **sweep_kwargs,
+) -> Iterator[CumulativeSaving]:
+    """
+    Compute the cumulative saving of each passive scenario over the average scenario in the same position, one chunk
+    at a time.
+
+    Parameters
+    ----------
+    passive The passive house scenarios
+    average The average house scenarios
+    chunk_size The number of pairs per chunk. By default it is chosen from the memory budget.
+    sweep_kwargs Passed to `iter_sweep` e.g. `workers`
+
+    Returns
+    -------
+    An iterator of the cumulative savings of each chunk, in the order supplied.
+
+    """
+    if len(passive) != len(average):
+        raise ValueError(
+            f"Expected as many average scenarios as passive, got {len(average)} and {len(passive)}"
+        )
+    if chunk_size is None:
+        precision = sweep_kwargs.get("precision") or CONFIG.get("sweep").get(
+            "precision"
+        )
+        span = max(sweep_year_span(passive), sweep_year_span(average))
+        chunk_size = choose_chunk_size(
+            estimate_bytes_per_scenario(span, len(STREAMS), PRECISIONS[precision]),
+            memory_budget_bytes=sweep_kwargs.get("memory_budget_bytes"),
+            chunks_in_flight=4 * max(sweep_kwargs.get("workers", 1), 1),
+        )
+
+    for passive_chunk, average_chunk in zip(
+        iter_sweep(passive, chunk_size=chunk_size, **sweep_kwargs),
+        iter_sweep(average, chunk_size=chunk_size, **sweep_kwargs),
+    ):
+        chunks = (passive_chunk, average_chunk)
+        years = np.arange(
+            min(c.years[0] for c in chunks), max(c.years[-1] for c in chunks) + 1
+        )
+        saving = _annual_cost(average_chunk, years) - _annual_cost(passive_chunk, years)
+        yield CumulativeSaving(
+            start=passive_chunk.start,
+            years=years,
+            values=np.cumsum(saving, axis=1),
+        )
+
+
+def payback(
+    passive: ScenarioBatch,
+    average: ScenarioBatch,
+    chunk_size: Optional[int] = None,
+    **sweep_kwargs,
+) -> pd.DataFrame:
+    """
+    Find the payback year of each passive scenario over the average scenario in the same position.
+
+    Parameters
+    ----------
+    passive The passive house scenarios
+    average The average house scenarios
+    chunk_size The number of pairs per chunk. By default it is chosen from the memory budget.
+    sweep_kwargs Passed to `iter_sweep` e.g. `workers`
+
+    Returns
+    -------
+    A dataframe of the payback year of each passive scenario, the years from purchase to payback inclusive, and the
+    net saving, the cumulative saving at the end. Scenarios that never pay back, or where either scenario is
+    infeasible, have a payback year and years to payback of `NEVER`. The cumulative saving year by year is available
+    from `iter_cumulative_saving`.
+
+    """
+    payback_years, net_savings = [], []
+    for cumulative in iter_cumulative_saving(
+        passive, average, chunk_size, **sweep_kwargs
+    ):
+        payback_years.append(_first_positive(cumulative.years, cumulative.values))
+        net_savings.append(cumulative.values[:, -1])
+
+    payback_year = np.concatenate(payback_years) if payback_years else np.empty(0, int)
+    return pd.DataFrame(
+        {
+            "payback_year": payback_year,
+            "years_to_payback": np.where(
+                payback_year == NEVER,
+                NEVER,
+                payback_year - passive.purchase_year + 1,
+            ),
+            "net_saving": np.concatenate(net_savings) if net_savings else np.empty(0),
+        }
+    )
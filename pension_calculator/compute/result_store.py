@@ -0,0 +1,199 @@
+"""
+result_store.py
+
+Store sweep results as partitioned Parquet datasets, and query them without rerunning the sweep.
+
+A store is a directory with two hive-partitioned datasets:
+
+    summary/   One row per scenario: its parameters, lifetime totals, and `Infeasible` flags.
+    schedules/ One row per scenario and year: the payments in that year.
+
+Both are partitioned by house type and year of birth by default. Reads support column projection and predicate
+pushdown (e.g. `pc.field("yob") == 1997`), so only the files and columns needed are loaded.
+
+Requires pyarrow, installed with the `store` extra.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.kernels import LIFE_EXPECTANCY, STREAMS
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sweep import SweepChunk, iter_sweep, scenario_block
+from pension_calculator.plot.scenario import ScenarioParams
+
+SUMMARY = "summary"
+SCHEDULES = "schedules"
+
+PARTITION_FIELDS = {"house_type": pa.string(), "yob": pa.int32()}
+
+
+def house_types(annual_heating_kwh_m2a: np.ndarray) -> np.ndarray:
+    """Name each house by its heating demand as in the CONFIG file's `energy_use` section, otherwise "custom"."""
+    names = np.full(len(annual_heating_kwh_m2a), "custom", dtype=object)
+    for house_type, kwh_m2a in CONFIG.get("energy_use").items():
+        names[np.isclose(annual_heating_kwh_m2a, kwh_m2a)] = house_type
+    return names
+
+
+def _partitioning(partition_by: Sequence[str]) -> ds.Partitioning:
+    return ds.partitioning(
+        pa.schema([(name, PARTITION_FIELDS[name]) for name in partition_by]),
+        flavor="hive",
+    )
+
+
+def write_chunk(
+    root: Path,
+    chunk: SweepChunk,
+    batch: ScenarioBatch,
+    partition_by: Sequence[str] = ("house_type", "yob"),
+) -> None:
+    """
+    Append a chunk of sweep results to a store.
+
+    Parameters
+    ----------
+    root The store directory
+    chunk The chunk of schedules
+    batch The scenarios of the chunk (see `scenario_block`)
+    partition_by The columns to partition by, from "house_type" and "yob"
+
+    """
+    root = Path(root)
+    columns = batch.columns()
+    scenario = np.arange(chunk.start, chunk.start + len(chunk))
+    house_type = house_types(columns["annual_heating_kwh_m2a"])
+    totals = chunk.totals()
+
+    summary = {"scenario": scenario, "house_type": house_type}
+    summary.update(columns)
+    summary["yob"] = summary["yob"].astype(np.int32)
+    summary.update({stream: totals[stream].to_numpy() for stream in STREAMS})
+    summary["infeasible"] = chunk.reasons
+
+    # Keep only the years in each feasible scenario's schedule.
+    years = chunk.years
+    in_schedule = (
+        (years[None, :] >= columns["purchase_year"][:, None])
+        & (years[None, :] <= (columns["yob"] + LIFE_EXPECTANCY)[:, None])
+        & (chunk.reasons == 0)[:, None]
+    )
+    row, year = np.nonzero(in_schedule)
+    schedules = {
+        "scenario": scenario[row],
+        "house_type": house_type[row],
+        "yob": columns["yob"][row].astype(np.int32),
+        "year": years[year].astype(np.int16),
+    }
+    values = chunk.schedules[row, year]
+    schedules.update({stream: values[:, i] for i, stream in enumerate(STREAMS)})
+
+    for name, table in ((SUMMARY, summary), (SCHEDULES, schedules)):
+        ds.write_dataset(
+            pa.table(table),
+            root / name,
+            format="parquet",
+            partitioning=_partitioning(partition_by),
+            basename_template=f"part-{chunk.start}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+
+def write_sweep(
+    root: Path,
+    scenarios: Union[Sequence[ScenarioParams], ScenarioSpace],
+    partition_by: Sequence[str] = ("house_type", "yob"),
+    **sweep_kwargs,
+) -> None:
+    """
+    Run a sweep and write its results to a store one chunk at a time.
+
+    Any results already in the store are removed first, so that no part files of an earlier sweep, e.g. one with a
+    different chunk size, are read back with the new results.
+
+    Parameters
+    ----------
+    root The store directory
+    scenarios The scenarios to evaluate
+    partition_by The columns to partition by, from "house_type" and "yob"
+    sweep_kwargs Passed to `iter_sweep` e.g. `workers`, `precision`
+
+    """
+    for name in (SUMMARY, SCHEDULES):
+        shutil.rmtree(Path(root) / name, ignore_errors=True)
+    for chunk in iter_sweep(scenarios, **sweep_kwargs):
+        write_chunk(
+            root,
+            chunk,
+            scenario_block(scenarios, chunk.start, chunk.start + len(chunk)),
+            partition_by=partition_by,
+        )
+
+
+def open_dataset(
+    root: Path, name: str = SUMMARY, partition_by: Sequence[str] = ("house_type", "yob")
+) -> ds.Dataset:
+    """Open the summary or schedules dataset of a store."""
+    return ds.dataset(
+        Path(root) / name, format="parquet", partitioning=_partitioning(partition_by)
+    )
+
+
+def read_table(
+    root: Path,
+    name: str = SUMMARY,
+    columns: Optional[List[str]] = None,
+    filter: Optional[ds.Expression] = None,
+    partition_by: Sequence[str] = ("house_type", "yob"),
+) -> pa.Table:
+    """
+    Read the summary or schedules table of a store.
+
+    Parameters
+    ----------
+    root The store directory
+    name SUMMARY or SCHEDULES
+    columns The columns to read (default all)
+    filter A predicate pushed down to skip partitions and row groups e.g. `pc.field("yob") == 1997`
+    partition_by The columns the store is partitioned by
+
+    Returns
+    -------
+    The matching rows, in partition order. Each row carries its `scenario` position in the sweep.
+
+    """
+    return open_dataset(root, name, partition_by).to_table(
+        columns=columns, filter=filter
+    )
+
+
+def to_arrays(table: pa.Table) -> Dict[str, np.ndarray]:
+    """Convert a table to NumPy arrays, without copying columns held in a single chunk with no nulls."""
+    arrays = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if column.num_chunks == 1 and column.null_count == 0:
+            column = column.chunk(0)
+        arrays[name] = column.to_numpy()
+    return arrays
+
+
+def iter_batches(
+    root: Path,
+    name: str = SUMMARY,
+    columns: Optional[List[str]] = None,
+    filter: Optional[ds.Expression] = None,
+    partition_by: Sequence[str] = ("house_type", "yob"),
+) -> Iterable[pa.RecordBatch]:
+    """Stream the matching rows of a store in record batches, for results too large to load at once."""
+    return open_dataset(root, name, partition_by).to_batches(
+        columns=columns, filter=filter
+    )
@@ -0,0 +1,219 @@
+"""
+scenario_batch.py
+
+A struct-of-arrays container for many scenarios: one contiguous array per parameter instead of one `ScenarioParams`
+(and five model objects) per scenario.
+
+A mortgage may be taken out on any price in any year. Where its price is NaN it finances the total cost of the house,
+as in `plot/scenario.py`, so it follows the house's purchase cost and premium when they are varied.
+"""
+
+from dataclasses import dataclass, fields, replace
+from math import isclose
+from typing import Dict, List, Mapping, Sequence, Union
+
+import numpy as np
+
+from pension_calculator.models import Energy, House, Mortgage, Pension, Person
+from pension_calculator.plot.scenario import ScenarioParams
+
+INTEGER_DTYPE = np.int32
+FLOAT_DTYPE = np.float64
+
+
+@dataclass(frozen=True, slots=True)
+class ScenarioBatch:
+    """The parameters of many scenarios, one array per parameter.
+
+    Attributes:
+        yob: Year of birth.
+        purchase_year: The year of purchase of the house, and start of the mortgage.
+        purchase_cost: The purchase cost of the house, before any passive house premium.
+        passive_house_premium_pcnt: The additional cost to meet Passive House standard e.g. '0.1'.
+        area_m2: The area of the house for heating purposes.
+        annual_heating_kwh_m2a: The annual heating requirement of the house.
+        deposit_pcnt: The mortgage deposit e.g. '0.1'.
+        interest_rate_pcnt: The mortgage interest rate e.g. '0.05'.
+        length_years: The length of the mortgage.
+        mortgage_purchase_year: The year the mortgage starts.
+        mortgage_purchase_price: The price the mortgage is taken out on, or NaN for the total cost of the house.
+        growth_rate_pcnt: The pension growth rate e.g. '0.01'.
+        pension_start_year: The year that pension saving commences.
+        pension_end_year: The year that pension saving ends (exclusive).
+        tariff: The energy tariff in pounds per kWh.
+        cagr_pcnt: The energy tariff compound annual growth rate e.g. '0.05'.
+    """
+
+    yob: np.ndarray
+    purchase_year: np.ndarray
+    purchase_cost: np.ndarray
+    passive_house_premium_pcnt: np.ndarray
+    area_m2: np.ndarray
+    annual_heating_kwh_m2a: np.ndarray
+    deposit_pcnt: np.ndarray
+    interest_rate_pcnt: np.ndarray
+    length_years: np.ndarray
+    mortgage_purchase_year: np.ndarray
+    mortgage_purchase_price: np.ndarray
+    growth_rate_pcnt: np.ndarray
+    pension_start_year: np.ndarray
+    pension_end_year: np.ndarray
+    tariff: np.ndarray
+    cagr_pcnt: np.ndarray
+
+    def __post_init__(self):
+        n = None
+        for name in SCENARIO_FIELDS:
+            values = np.ascontiguousarray(getattr(self, name), dtype=field_dtype(name))
+            if values.ndim != 1 or (n is not None and len(values) != n):
+                raise ValueError(f"{name} must be a 1-d array of {n} values")
+            n = len(values)
+            object.__setattr__(self, name, values)
+
+    def __len__(self) -> int:
+        return len(self.yob)
+
+    def __getitem__(
+        self, index: Union[slice, np.ndarray, Sequence[int]]
+    ) -> "ScenarioBatch":
+        """Select scenarios by slice, integer indices, or boolean mask. An integer selects a batch of one."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return ScenarioBatch(
+            **{name: getattr(self, name)[index] for name in SCENARIO_FIELDS}
+        )
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, np.ndarray]) -> "ScenarioBatch":
+        """Create a batch from a mapping of parameter name to values."""
+        return cls(**{name: columns[name] for name in SCENARIO_FIELDS})
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Return the arrays of the batch by parameter name, without copying."""
+        return {name: getattr(self, name) for name in SCENARIO_FIELDS}
+
+    @classmethod
+    def from_scenarios(cls, scenarios: Sequence[ScenarioParams]) -> "ScenarioBatch":
+        """Convert scenarios to a batch.
+
+        A batch holds a constant CAGR per scenario, so scenarios with a tariff curve are refused rather than swept
+        without it. Pass the curve to the sweep instead, e.g. `run_sweep(batch, curve=curve)`.
+        """
+        curves = sum(p.energy.curve is not None for p in scenarios)
+        if curves:
+            raise ValueError(
+                f"{curves} scenarios have a tariff curve, which a batch can not hold. "
+                "Pass the curve to the sweep instead"
+            )
+        return cls(
+            yob=[p.person.yob for p in scenarios],
+            purchase_year=[p.house.purchase_year for p in scenarios],
+            purchase_cost=[p.house.purchase_cost for p in scenarios],
+            passive_house_premium_pcnt=[
+                p.house.passive_house_premium_pcnt for p in scenarios
+            ],
+            area_m2=[p.house.area_m2 for p in scenarios],
+            annual_heating_kwh_m2a=[p.house.annual_heating_kwh_m2a for p in scenarios],
+            deposit_pcnt=[p.mortgage.deposit_pcnt for p in scenarios],
+            interest_rate_pcnt=[p.mortgage.interest_rate_pcnt for p in scenarios],
+            length_years=[p.mortgage.length_years for p in scenarios],
+            mortgage_purchase_year=[p.mortgage.purchase_year for p in scenarios],
+            mortgage_purchase_price=[
+                np.nan
+                if isclose(p.mortgage.purchase_price, p.house.total_cost())
+                else p.mortgage.purchase_price
+                for p in scenarios
+            ],
+            growth_rate_pcnt=[p.pension.growth_rate_pcnt for p in scenarios],
+            pension_start_year=[p.pension.start_year for p in scenarios],
+            pension_end_year=[p.pension.end_year for p in scenarios],
+            tariff=[p.energy.tariff for p in scenarios],
+            cagr_pcnt=[p.energy.cagr_pcnt for p in scenarios],
+        )
+
+    def to_scenarios(self) -> List[ScenarioParams]:
+        """Convert the batch back to scenarios."""
+        rows = {name: getattr(self, name).tolist() for name in SCENARIO_FIELDS}
+        rows["mortgage_purchase_price"] = self.mortgage_price().tolist()
+        scenarios = []
+        for i in range(len(self)):
+            row = {name: values[i] for name, values in rows.items()}
+            house = House(
+                purchase_year=row["purchase_year"],
+                purchase_cost=row["purchase_cost"],
+                passive_house_premium_pcnt=row["passive_house_premium_pcnt"],
+                area_m2=row["area_m2"],
+                annual_heating_kwh_m2a=row["annual_heating_kwh_m2a"],
+            )
+            scenarios.append(
+                ScenarioParams(
+                    person=Person(row["yob"]),
+                    house=house,
+                    mortgage=Mortgage(
+                        purchase_year=row["mortgage_purchase_year"],
+                        purchase_price=row["mortgage_purchase_price"],
+                        deposit_pcnt=row["deposit_pcnt"],
+                        interest_rate_pcnt=row["interest_rate_pcnt"],
+                        length_years=row["length_years"],
+                    ),
+                    pension=Pension(
+                        target=None,
+                        growth_rate_pcnt=row["growth_rate_pcnt"],
+                        start_year=row["pension_start_year"],
+                        end_year=row["pension_end_year"],
+                    ),
+                    energy=Energy(tariff=row["tariff"], cagr_pcnt=row["cagr_pcnt"]),
+                )
+            )
+        return scenarios
+
+    def replace(self, **changes) -> "ScenarioBatch":
+        """Return a copy of the batch with some parameters replaced, by arrays or scalars."""
+        changes = {
+            name: np.broadcast_to(values, len(self)) for name, values in changes.items()
+        }
+        return replace(self, **changes)
+
+    @classmethod
+    def concat(cls, batches: Sequence["ScenarioBatch"]) -> "ScenarioBatch":
+        """Join batches end to end."""
+        return cls(
+            **{
+                name: np.concatenate([getattr(b, name) for b in batches])
+                for name in SCENARIO_FIELDS
+            }
+        )
+
+    def mortgage_price(self) -> np.ndarray:
+        """Return the price each mortgage is taken out on, the total cost of the house where none is given."""
+        return np.where(
+            np.isnan(self.mortgage_purchase_price),
+            self.purchase_cost * (1 + self.passive_house_premium_pcnt),
+            self.mortgage_purchase_price,
+        )
+
+    def mortgage_final_year(self) -> np.ndarray:
+        """Return the final payment year of each mortgage."""
+        return self.mortgage_purchase_year + self.length_years - 1
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the arrays of the batch."""
+        return sum(getattr(self, name).nbytes for name in SCENARIO_FIELDS)
+
+
+SCENARIO_FIELDS = tuple(f.name for f in fields(ScenarioBatch))
+
+INTEGER_FIELDS = (
+    "yob",
+    "purchase_year",
+    "length_years",
+    "mortgage_purchase_year",
+    "pension_start_year",
+    "pension_end_year",
+)
+
+
+def field_dtype(name: str) -> np.dtype:
+    """Return the dtype a parameter is stored in."""
+    return INTEGER_DTYPE if name in INTEGER_FIELDS else FLOAT_DTYPE
@@ -0,0 +1,183 @@
+"""
+scenario_space.py
+
+A declarative space of scenarios: the Cartesian product of a few varying axes, with every other parameter fixed.
+
+Scenarios are never materialised up front. Each one has a flat index, decoded to its parameters by mixed-radix
+arithmetic with the last axis varying fastest, so the size of the space, any single scenario, any contiguous block
+and any random sample are all available without expanding the space. Blocks are returned as a `ScenarioBatch`, ready
+for the kernels in `pension_calculator.compute.kernels`.
+"""
+
+from math import prod
+from typing import Iterator, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pension_calculator.compute.kernels import LIFE_EXPECTANCY, PENSION_AGE
+from pension_calculator.compute.scenario_batch import (
+    SCENARIO_FIELDS,
+    ScenarioBatch,
+    field_dtype,
+)
+from pension_calculator.plot.scenario import ScenarioParams
+
+# When not given, the pension is saved from the purchase year until retirement, and the mortgage finances the total
+# cost of the house from the purchase year, as in `plot/scenario.py`.
+DERIVED_FIELDS = (
+    "pension_start_year",
+    "pension_end_year",
+    "mortgage_purchase_year",
+    "mortgage_purchase_price",
+)
+
+
+class ScenarioSpace(Sequence):
+    """The scenarios spanned by a set of axes.
+
+    Args:
+        axes: The values of each varying parameter, e.g. `{"tariff": [0.05, 0.1], "cagr_pcnt": [0.05, 0.1]}`.
+        defaults: The value of every other parameter. The pension and mortgage years, and the mortgage's price, may be
+            omitted, see `DERIVED_FIELDS`.
+    """
+
+    def __init__(
+        self,
+        axes: Mapping[str, Sequence[float]],
+        defaults: Mapping[str, float],
+        _start: int = 0,
+        _stop: Optional[int] = None,
+    ):
+        unknown = (set(axes) | set(defaults)) - set(SCENARIO_FIELDS)
+        if unknown:
+            raise KeyError(f"Unknown scenario parameters: {sorted(unknown)}")
+        missing = set(SCENARIO_FIELDS) - set(axes) - set(defaults) - set(DERIVED_FIELDS)
+        if missing:
+            raise KeyError(f"No value for scenario parameters: {sorted(missing)}")
+
+        self.axes = {
+            name: np.asarray(values, field_dtype(name)) for name, values in axes.items()
+        }
+        self.defaults = dict(defaults)
+        self.shape = tuple(len(values) for values in self.axes.values())
+        self._start = _start
+        self._stop = prod(self.shape) if _stop is None else _stop
+
+    @classmethod
+    def from_scenario(
+        cls, base: ScenarioParams, axes: Mapping[str, Sequence[float]]
+    ) -> "ScenarioSpace":
+        """Vary some parameters of a base scenario (e.g. `plot/scenario.py`'s `passive`), keeping the rest fixed.
+
+        The pension and mortgage years are derived from the purchase year and year of retirement, and the mortgage's
+        price from the house, if the base scenario does.
+        """
+        defaults = {
+            name: values[0]
+            for name, values in ScenarioBatch.from_scenarios([base]).columns().items()
+        }
+        if defaults["pension_start_year"] == defaults["purchase_year"]:
+            del defaults["pension_start_year"]
+        if defaults["pension_end_year"] == defaults["yob"] + PENSION_AGE:
+            del defaults["pension_end_year"]
+        if defaults["mortgage_purchase_year"] == defaults["purchase_year"]:
+            del defaults["mortgage_purchase_year"]
+        if np.isnan(defaults["mortgage_purchase_price"]):
+            del defaults["mortgage_purchase_price"]
+        for name in axes:
+            defaults.pop(name, None)
+        return cls(axes, defaults)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[ScenarioParams, "ScenarioSpace"]:
+        """Return the scenario at `index`, or a contiguous slice of the space without expanding it."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Scenario spaces only support contiguous slices")
+            return ScenarioSpace(
+                self.axes,
+                self.defaults,
+                _start=self._start + start,
+                _stop=self._start + max(start, stop),
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Scenario {index} is outside a space of {len(self)}")
+        return self.take(np.array([index])).to_scenarios()[0]
+
+    def take(self, indices: np.ndarray) -> ScenarioBatch:
+        """Decode the scenarios at `indices` to a batch."""
+        indices = np.asarray(indices, dtype=np.int64) + self._start
+        columns = {}
+        for name, values in reversed(list(self.axes.items())):
+            indices, digit = np.divmod(indices, len(values))
+            columns[name] = values[digit]
+        return self.at(columns)
+
+    def at(self, values: Mapping[str, np.ndarray]) -> ScenarioBatch:
+        """Return a batch with the axes at `values`, which need not lie on the grid, and every other parameter fixed."""
+        if set(values) != set(self.axes):
+            raise KeyError(
+                f"Values must be given for exactly the axes {list(self.axes)}"
+            )
+        columns = {
+            name: np.atleast_1d(np.asarray(v, field_dtype(name)))
+            for name, v in values.items()
+        }
+        n = max((len(v) for v in columns.values()), default=1)
+        columns = {name: np.broadcast_to(v, n) for name, v in columns.items()}
+        for name, value in self.defaults.items():
+            columns[name] = np.full(n, value, field_dtype(name))
+        if "pension_start_year" not in columns:
+            columns["pension_start_year"] = columns["purchase_year"]
+        if "pension_end_year" not in columns:
+            columns["pension_end_year"] = columns["yob"] + PENSION_AGE
+        if "mortgage_purchase_year" not in columns:
+            columns["mortgage_purchase_year"] = columns["purchase_year"]
+        if "mortgage_purchase_price" not in columns:
+            columns["mortgage_purchase_price"] = np.full(n, np.nan)
+        return ScenarioBatch.from_columns(columns)
+
+    def block(self, start: int, stop: int) -> ScenarioBatch:
+        """Decode the scenarios from `start` to `stop` to a batch."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return self.take(np.arange(start, max(start, stop)))
+
+    def blocks(
+        self, chunk_size: int, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[ScenarioBatch]:
+        """Decode the scenarios from `start` to `stop` in blocks of `chunk_size`."""
+        stop = len(self) if stop is None else stop
+        for block_start in range(start, stop, chunk_size):
+            yield self.block(block_start, min(block_start + chunk_size, stop))
+
+    def sample(
+        self, n: int, seed: Optional[int] = None, replace: bool = False
+    ) -> np.ndarray:
+        """Return the indices of `n` scenarios drawn at random, for use with `take`."""
+        rng = np.random.default_rng(seed)
+        if replace:
+            return rng.integers(len(self), size=n)
+        return rng.choice(len(self), size=n, replace=False)
+
+    def _extent(self, name: str) -> np.ndarray:
+        if name in self.axes:
+            return self.axes[name]
+        return np.array([self.defaults[name]])
+
+    def years(self) -> Tuple[int, int]:
+        """Return the earliest purchase year and the latest year of death, without expanding."""
+        first_year = self._extent("purchase_year").min()
+        last_year = self._extent("yob").max() + LIFE_EXPECTANCY
+        return int(first_year), int(last_year)
+
+    def year_span(self) -> int:
+        """Return the number of years between the earliest purchase and the latest death, without expanding."""
+        first_year, last_year = self.years()
+        return last_year - first_year + 1
@@ -0,0 +1,152 @@
+"""
+sensitivity.py
+
+Global sensitivity of the net saving and house pension of a passive house to every scenario input, as first-order and
+total Sobol indices.
+
+Inputs are drawn uniformly from ranges (whole-number inputs uniformly from the whole numbers in range) with Saltelli's
+scheme: two independent samples A and B of N points, and for each of the d inputs a copy of A with that input's
+column taken from B. All N * (d + 2) points are evaluated as one batch per house, see `comparison.compare`. First-order
+indices use Saltelli's (2010) estimator and total indices Jansen's.
+
+An input applies to both houses unless it is in `PASSIVE_ONLY`, which describes what makes a house passive.
+"""
+
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.comparison import OUTPUTS, PASSIVE_ONLY, compare
+from pension_calculator.compute.scenario_batch import INTEGER_FIELDS
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.plot.scenario import ScenarioParams, average, passive
+
+
+def default_bounds() -> Dict[str, Tuple[float, float]]:
+    """Return the range of every input, with the tariff and CAGR ranges set from the CONFIG file."""
+    sensitivities = CONFIG.get("sensitivities")
+    return {
+        "tariff": (sensitivities.get("price_min"), sensitivities.get("price_max")),
+        "cagr_pcnt": (sensitivities.get("cagr_min"), sensitivities.get("cagr_max")),
+        "passive_house_premium_pcnt": (0.05, 0.2),
+        "interest_rate_pcnt": (0.02, 0.06),
+        "length_years": (20, 40),
+        "growth_rate_pcnt": (0.005, 0.05),
+        "area_m2": (60.0, 150.0),
+        "annual_heating_kwh_m2a": (10.0, 25.0),
+        "yob": (1995, 2000),
+    }
+
+
+def saltelli_sample(
+    bounds: Mapping[str, Tuple[float, float]], n: int, seed: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Draw Saltelli's samples of the inputs.
+
+    Parameters
+    ----------
+    bounds The range of each input
+    n The number of base points
+    seed Seeds the sample
+
+    Returns
+    -------
+    The samples A and B with shape (n, inputs), and the mixed samples AB with shape (inputs, n, inputs).
+
+    """
+    rng = np.random.default_rng(seed)
+    low, high = np.array(list(bounds.values()), dtype=float).T
+    discrete = np.array([name in INTEGER_FIELDS for name in bounds])
+    high = np.where(discrete, high + 1, high)
+
+    u = rng.random((2, n, len(bounds)))
+    a, b = low + u * (high - low)
+    a[:, discrete], b[:, discrete] = np.floor(a[:, discrete]), np.floor(b[:, discrete])
+
+    ab = np.repeat(a[None, :, :], len(bounds), axis=0)
+    for i in range(len(bounds)):
+        ab[i, :, i] = b[:, i]
+    return a, b, ab
+
+
+def sobol_indices(
+    f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate first-order and total Sobol indices from model outputs on Saltelli's samples.
+
+    Parameters
+    ----------
+    f_a The outputs on A, with shape (n,)
+    f_b The outputs on B, with shape (n,)
+    f_ab The outputs on each AB, with shape (inputs, n)
+
+    Returns
+    -------
+    The first-order and total index of each input.
+
+    """
+    # Centring the outputs leaves the estimators unbiased, and reduces their variance.
+    mean = np.mean(np.concatenate([f_a, f_b]))
+    f_a, f_b, f_ab = f_a - mean, f_b - mean, f_ab - mean
+    variance = np.var(np.concatenate([f_a, f_b]))
+    first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    return first_order, total
+
+
+def sobol_analysis(
+    bounds: Optional[Mapping[str, Tuple[float, float]]] = None,
+    n: int = 1024,
+    seed: Optional[int] = None,
+    passive_params: ScenarioParams = passive,
+    average_params: ScenarioParams = average,
+    outputs: Sequence[str] = OUTPUTS,
+    **sweep_kwargs,
+) -> pd.DataFrame:
+    """
+    Compute the Sobol indices of the net saving and house pension of a passive house.
+
+    Parameters
+    ----------
+    bounds The range of each input, by `ScenarioBatch` field (default `default_bounds`)
+    n The number of base points. The model is evaluated n * (inputs + 2) times per house.
+    seed Seeds the sample
+    passive_params The passive house scenario, whose other inputs are fixed
+    average_params The average house scenario, whose other inputs are fixed
+    outputs The outputs to analyse, see `comparison.compare`
+    sweep_kwargs Passed to `run_sweep` e.g. `workers` to evaluate in parallel
+
+    Returns
+    -------
+    A dataframe of the first-order ("S1") and total ("ST") index of each output, indexed by input. Base points at
+    which any evaluation is infeasible are dropped.
+
+    """
+    bounds = default_bounds() if bounds is None else bounds
+    names = list(bounds)
+    a, b, ab = saltelli_sample(bounds, n, seed)
+    points = np.concatenate([a, b, ab.reshape(-1, len(names))])
+
+    batches = {}
+    for house, params in (("passive", passive_params), ("average", average_params)):
+        varied = [
+            name for name in names if house == "passive" or name not in PASSIVE_ONLY
+        ]
+        space = ScenarioSpace.from_scenario(params, {name: [0] for name in varied})
+        batches[house] = space.at(
+            {name: points[:, names.index(name)] for name in varied}
+        )
+    comparison = compare(batches["passive"], batches["average"], **sweep_kwargs)
+
+    columns = {}
+    for output in outputs:
+        values = comparison[output].to_numpy().reshape(len(names) + 2, n)
+        feasible = ~np.isnan(values).any(axis=0)
+        f_a, f_b, f_ab = values[0, feasible], values[1, feasible], values[2:, feasible]
+        columns[(output, "S1")], columns[(output, "ST")] = sobol_indices(f_a, f_b, f_ab)
+
+    return pd.DataFrame(columns, index=pd.Index(names, name="input"))
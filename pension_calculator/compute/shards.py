@@ -0,0 +1,424 @@
+"""
+shards.py
+
+Split a sweep into deterministic shards that separate processes or machines claim from a shared directory, with
+atomic checkpoints so that a killed worker's shard resumes where it stopped.
+
+The shared directory is a simple file-lock work queue:
+
+    plan.json              The number of scenarios, the shard size, and a fingerprint of the scenarios and the options
+                           that change their results, which every worker must agree on.
+    locks/shard-NNNNN      Created exclusively by the worker that claims a shard, and holding its owner. A background
+                           thread refreshes the lock while the shard is evaluated, and locks that go stale are
+                           reclaimed.
+    checkpoints/shard-NNNNN.npy  Totals of the scenarios of a shard completed so far.
+    results/shard-NNNNN.npy      Totals of a finished shard.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.atomic import save_array
+from pension_calculator.compute.kernels import STREAMS
+from pension_calculator.compute.metrics import SweepMetrics
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sweep import (
+    Scenarios,
+    iter_sweep,
+    scenario_block,
+    sweep_years,
+)
+from pension_calculator.plot.scenario import ScenarioParams
+
+
+@dataclass(frozen=True)
+class Shard:
+    """A contiguous run of scenarios in a sweep.
+
+    Attributes:
+        index: The position of the shard in the plan.
+        start: The position of the first scenario in the sweep.
+        stop: The position after the last scenario in the sweep.
+    """
+
+    index: int
+    start: int
+    stop: int
+
+    @property
+    def name(self) -> str:
+        return f"shard-{self.index:05d}"
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+
+def plan_shards(n_scenarios: int, shard_size: int) -> List[Shard]:
+    """Split `n_scenarios` into shards of `shard_size` scenarios (the last may be smaller)."""
+    return [
+        Shard(index=i, start=start, stop=min(start + shard_size, n_scenarios))
+        for i, start in enumerate(range(0, n_scenarios, shard_size))
+    ]
+
+
+def sweep_fingerprint(
+    scenarios: Scenarios, block_size: int = 100_000, **sweep_kwargs
+) -> str:
+    """
+    Hash the scenarios of a sweep and the options that change their results, so a shared directory is only resumed
+    by workers of the same sweep.
+
+    Parameters
+    ----------
+    scenarios The scenarios of the whole sweep. A scenario space is hashed by its axes and defaults, without decoding.
+    block_size The number of scenarios of a list or batch hashed at a time
+    sweep_kwargs The options passed to `iter_sweep`, of which the precision, deduplication, tariff curve, and heating
+        factor change the results
+
+    Returns
+    -------
+    A hex digest.
+
+    """
+    digest = hashlib.sha256()
+    if isinstance(scenarios, ScenarioSpace):
+        for name, values in scenarios.axes.items():
+            digest.update(name.encode())
+            digest.update(values.tobytes())
+        digest.update(
+            json.dumps(scenarios.defaults, sort_keys=True, default=float).encode()
+        )
+        # The first and last scenarios locate a slice of the space.
+        blocks = (
+            [(0, 1), (len(scenarios) - 1, len(scenarios))] if len(scenarios) else []
+        )
+    else:
+        blocks = [
+            (start, start + block_size)
+            for start in range(0, len(scenarios), block_size)
+        ]
+    for start, stop in blocks:
+        for name, values in scenario_block(scenarios, start, stop).columns().items():
+            digest.update(name.encode())
+            digest.update(values.tobytes())
+
+    precision = sweep_kwargs.get("precision") or CONFIG.get("sweep").get("precision")
+    curve = sweep_kwargs.get("curve")
+    options = {
+        "precision": precision,
+        "deduplicate": bool(sweep_kwargs.get("deduplicate", False)),
+        "curve": None if curve is None else [curve.first_year, list(curve.rates)],
+    }
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    heating_factor = sweep_kwargs.get("heating_factor")
+    if heating_factor is not None and len(scenarios):
+        first_year, last_year = sweep_years(scenarios)
+        years = np.arange(first_year, last_year + 1)
+        digest.update(np.asarray(heating_factor(years), dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class LockLost(RuntimeError):
+    """The lock on a shard was reclaimed by another worker."""
+
+
+class ShardQueue:
+    """A work queue of shards in a shared directory.
+
+    Args:
+        root: The shared directory.
+        n_scenarios: The number of scenarios in the sweep.
+        shard_size: The number of scenarios per shard.
+        stale_after_s: Seconds after which a lock that has not been refreshed is assumed to belong to a dead worker.
+        fingerprint: The `sweep_fingerprint` of the sweep, which must match the plan's. Queues opened without one,
+            e.g. to collect the results, do not check it.
+
+    Attributes:
+        owner: The host, process, and queue that this queue's locks are held by.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        n_scenarios: int,
+        shard_size: int,
+        stale_after_s: float = 3600.0,
+        fingerprint: Optional[str] = None,
+    ):
+        self.root = Path(root)
+        self.shards = plan_shards(n_scenarios, shard_size)
+        self.stale_after_s = stale_after_s
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        for directory in ("locks", "checkpoints", "results"):
+            (self.root / directory).mkdir(parents=True, exist_ok=True)
+
+        plan = {
+            "n_scenarios": n_scenarios,
+            "shard_size": shard_size,
+            "fingerprint": fingerprint,
+        }
+        plan_path = self.root / "plan.json"
+        try:
+            with open(plan_path, "x") as f:
+                json.dump(plan, f)
+        except FileExistsError:
+            existing = json.loads(plan_path.read_text())
+            if fingerprint is None:
+                plan["fingerprint"] = existing.get("fingerprint")
+            if existing != plan:
+                raise ValueError(
+                    f"Sweep in {self.root} was planned as {existing}, not {plan}"
+                )
+
+    def _lock_path(self, shard: Shard) -> Path:
+        return self.root / "locks" / shard.name
+
+    def _checkpoint_path(self, shard: Shard) -> Path:
+        return self.root / "checkpoints" / f"{shard.name}.npy"
+
+    def _result_path(self, shard: Shard) -> Path:
+        return self.root / "results" / f"{shard.name}.npy"
+
+    def is_done(self, shard: Shard) -> bool:
+        return self._result_path(shard).exists()
+
+    def _try_lock(self, shard: Shard) -> bool:
+        lock = self._lock_path(shard)
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                judged = lock.stat()
+            except FileNotFoundError:
+                return self._try_lock(shard)
+            if time.time() - judged.st_mtime <= self.stale_after_s:
+                return False
+            return self._reclaim(shard, judged) and self._try_lock(shard)
+
+        with os.fdopen(fd, "w") as f:
+            f.write(self.owner)
+        return True
+
+    def _reclaim(self, shard: Shard, judged: os.stat_result) -> bool:
+        """Remove a lock judged stale, unless it has been refreshed or replaced since it was judged."""
+        lock = self._lock_path(shard)
+        moved = lock.with_name(f"{lock.name}.stale-{self.owner.replace(':', '-')}")
+        try:
+            os.rename(lock, moved)
+        except FileNotFoundError:
+            return False
+        # Between the stat and the rename, the lock may have been refreshed by its owner, or reclaimed and claimed
+        # afresh by another worker. Only the exact file judged stale is removed; any other is put back, unless a
+        # newer lock has taken its place.
+        renamed = moved.stat()
+        if (renamed.st_ino, renamed.st_mtime_ns) != (judged.st_ino, judged.st_mtime_ns):
+            try:
+                os.link(moved, lock)
+            except FileExistsError:
+                pass
+            os.remove(moved)
+            return False
+        os.remove(moved)
+        return True
+
+    def owns(self, shard: Shard) -> bool:
+        """Return whether this queue holds the lock on a shard."""
+        try:
+            return self._lock_path(shard).read_text() == self.owner
+        except FileNotFoundError:
+            return False
+
+    def claim(self) -> Optional[Shard]:
+        """Claim the first shard that is neither finished nor locked, or return None if there are none."""
+        for shard in self.shards:
+            if self.is_done(shard):
+                continue
+            if self._try_lock(shard):
+                if self.is_done(shard):
+                    self.release(shard)
+                    continue
+                return shard
+        return None
+
+    def heartbeat(self, shard: Shard) -> None:
+        """Refresh the lock on a shard so that it is not reclaimed, or raise `LockLost` if it has been."""
+        if not self.owns(shard):
+            raise LockLost(
+                f"The lock on {shard.name} is no longer held by {self.owner}"
+            )
+        try:
+            os.utime(self._lock_path(shard))
+        except FileNotFoundError:
+            raise LockLost(f"The lock on {shard.name} was reclaimed")
+
+    def heartbeats(
+        self, shard: Shard, interval_s: Optional[float] = None
+    ) -> "Heartbeat":
+        """Return a context manager that refreshes the lock on a shard from a background thread.
+
+        Args:
+            shard: The claimed shard.
+            interval_s: Seconds between refreshes (default a quarter of `stale_after_s`).
+        """
+        if interval_s is None:
+            interval_s = self.stale_after_s / 4
+        return Heartbeat(self, shard, interval_s)
+
+    def release(self, shard: Shard) -> None:
+        """Give up a claimed shard, unless its lock has since been reclaimed by another worker."""
+        if not self.owns(shard):
+            return
+        try:
+            os.remove(self._lock_path(shard))
+        except FileNotFoundError:
+            pass
+
+    def load_checkpoint(self, shard: Shard) -> np.ndarray:
+        """Return the totals of the scenarios of a shard completed so far, with shape (completed, streams)."""
+        try:
+            return np.load(self._checkpoint_path(shard))
+        except FileNotFoundError:
+            return np.empty((0, len(STREAMS)))
+
+    def save_checkpoint(self, shard: Shard, totals: np.ndarray) -> None:
+        """Atomically record the totals of the scenarios of a shard completed so far.
+
+        Raises `LockLost`, without writing, if another worker has reclaimed the shard.
+        """
+        self.heartbeat(shard)
+        save_array(self._checkpoint_path(shard), totals)
+
+    def complete(self, shard: Shard, totals: np.ndarray) -> None:
+        """Atomically record the totals of a finished shard, and release it.
+
+        Raises `LockLost`, without writing, if another worker has reclaimed the shard.
+        """
+        self.heartbeat(shard)
+        save_array(self._result_path(shard), totals)
+        try:
+            os.remove(self._checkpoint_path(shard))
+        except FileNotFoundError:
+            pass
+        self.release(shard)
+
+    def collect(self) -> pd.DataFrame:
+        """Return the totals of every scenario in the sweep, once all shards have finished."""
+        missing = [shard.name for shard in self.shards if not self.is_done(shard)]
+        if missing:
+            raise RuntimeError(f"{len(missing)} shards have not finished: {missing}")
+        if not self.shards:
+            return pd.DataFrame(columns=STREAMS)
+        totals = np.concatenate([np.load(self._result_path(s)) for s in self.shards])
+        return pd.DataFrame(totals, columns=STREAMS)
+
+
+class Heartbeat:
+    """Context manager that refreshes the lock on a shard from a background thread, see `ShardQueue.heartbeats`.
+
+    Refreshes stop once the lock is lost, which is then recorded in `lost`, and on exit.
+
+    Attributes:
+        lost: Whether the lock was found to have been reclaimed by another worker.
+    """
+
+    def __init__(self, queue: ShardQueue, shard: Shard, interval_s: float):
+        self.queue = queue
+        self.shard = shard
+        self.interval_s = interval_s
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.queue.heartbeat(self.shard)
+            except LockLost:
+                self.lost = True
+                return
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _claimed(queue: ShardQueue) -> Iterator[Shard]:
+    while True:
+        shard = queue.claim()
+        if shard is None:
+            return
+        yield shard
+
+
+def run_shard_worker(
+    scenarios: Sequence[ScenarioParams],
+    root: Path,
+    shard_size: int,
+    metrics: Optional[SweepMetrics] = None,
+    stale_after_s: float = 3600.0,
+    **sweep_kwargs,
+) -> int:
+    """
+    Claim and evaluate shards of a sweep until none are left.
+
+    Every worker must be given the same scenarios, shard size, and options that change the results, which are checked
+    against the plan with `sweep_fingerprint`. Each chunk's totals are checkpointed, so a shard whose worker was
+    killed resumes from its last checkpoint once its lock goes stale. The lock is refreshed from a background thread
+    while the shard is evaluated, however long its chunks take, and a shard whose lock is reclaimed regardless (e.g.
+    after the worker was suspended) is abandoned to the worker that reclaimed it.
+
+    Parameters
+    ----------
+    scenarios The scenarios of the whole sweep
+    root The shared directory
+    shard_size The number of scenarios per shard
+    metrics Progress counters to update as chunks complete
+    stale_after_s Seconds after which another worker's lock is reclaimed
+    sweep_kwargs Passed to `iter_sweep` e.g. `chunk_size`, `precision`
+
+    Returns
+    -------
+    The number of shards this worker finished.
+
+    """
+    queue = ShardQueue(
+        root,
+        len(scenarios),
+        shard_size,
+        stale_after_s,
+        fingerprint=sweep_fingerprint(scenarios, **sweep_kwargs),
+    )
+    finished = 0
+
+    for shard in _claimed(queue):
+        try:
+            with queue.heartbeats(shard):
+                totals = queue.load_checkpoint(shard)
+                remaining = scenarios[shard.start + len(totals) : shard.stop]
+                for chunk in iter_sweep(remaining, metrics=metrics, **sweep_kwargs):
+                    totals = np.concatenate([totals, chunk.totals().to_numpy()])
+                    queue.save_checkpoint(shard, totals)
+                queue.complete(shard, totals)
+        except LockLost:
+            continue
+        finished += 1
+
+    return finished
@@ -0,0 +1,167 @@
+"""
+surface.py
+
+Precompute the payment schedules of a few scenarios over a grid of energy tariffs and CAGRs, so that the schedules at
+any tariff and CAGR in the grid are a lookup rather than a recompute.
+
+The surface is built once by the vectorised sweep in `pension_calculator.compute.sweep` and is read-only afterwards,
+so a single surface can be shared by every session of the web app. Points between grid values are interpolated
+bilinearly. Heating and pension payments are linear in the tariff, so interpolating in the tariff is exact; in the
+CAGR it is an approximation whose error shrinks with the grid step.
+"""
+
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.kernels import STREAMS
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sweep import iter_sweep
+from pension_calculator.plot.scenario import ScenarioParams
+
+
+def config_axis(name: str) -> np.ndarray:
+    """Return the grid of the surface axis `name` ("tariff" or "cagr"), as set in the CONFIG file."""
+    surface = CONFIG.get("surface")
+    start, stop, step = (surface.get(f"{name}_{key}") for key in ("min", "max", "step"))
+    n = int(round((stop - start) / step)) + 1
+    return np.round(start + step * np.arange(n), 10)
+
+
+@dataclass(frozen=True)
+class PaymentSurface:
+    """The payment schedules of named scenarios over a grid of energy tariffs and CAGRs.
+
+    Attributes:
+        names: The names of the scenarios, e.g. ("average", "passive").
+        tariffs: The energy tariffs of the grid, ascending.
+        cagrs: The energy CAGRs of the grid, ascending.
+        years: The calendar years of the schedules.
+        values: An array of shape (scenarios, tariffs, cagrs, years, streams).
+    """
+
+    names: Tuple[str, ...]
+    tariffs: np.ndarray
+    cagrs: np.ndarray
+    years: np.ndarray
+    values: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the schedules of the surface."""
+        return self.values.nbytes
+
+    def _interpolate(self, tariff: float, cagr: float, interpolate: bool) -> np.ndarray:
+        """Return the schedules of every scenario at a point, with shape (scenarios, years, streams)."""
+        (t0, t1, wt), (c0, c1, wc) = (
+            _bracket(axis, value, interpolate)
+            for axis, value in ((self.tariffs, tariff), (self.cagrs, cagr))
+        )
+        v = self.values
+        return (
+            (1 - wt) * (1 - wc) * v[:, t0, c0]
+            + (1 - wt) * wc * v[:, t0, c1]
+            + wt * (1 - wc) * v[:, t1, c0]
+            + wt * wc * v[:, t1, c1]
+        )
+
+    def schedule(
+        self, name: str, tariff: float, cagr: float, interpolate: bool = True
+    ) -> pd.DataFrame:
+        """
+        Return the payment schedule of a scenario at a tariff and CAGR.
+
+        Parameters
+        ----------
+        name The scenario
+        tariff The energy tariff, within the grid
+        cagr The energy CAGR, within the grid
+        interpolate Interpolate between grid values, rather than take the nearest
+
+        Returns
+        -------
+        A dataframe of the payments of each stream, indexed by year, as returned by `compute_payment_schedule`.
+
+        """
+        values = self._interpolate(tariff, cagr, interpolate)[self.names.index(name)]
+        return pd.DataFrame(values, index=self.years, columns=STREAMS)
+
+    def delta(
+        self,
+        name: str,
+        reference: str,
+        tariff: float,
+        cagr: float,
+        interpolate: bool = True,
+    ) -> pd.DataFrame:
+        """Return the difference between the schedules of scenario `name` and a reference scenario."""
+        values = self._interpolate(tariff, cagr, interpolate)
+        delta = values[self.names.index(name)] - values[self.names.index(reference)]
+        return pd.DataFrame(delta, index=self.years, columns=STREAMS)
+
+
+def _bracket(
+    axis: np.ndarray, value: float, interpolate: bool
+) -> Tuple[int, int, float]:
+    """Return the grid points either side of `value` and the weight of the upper one."""
+    if not axis[0] <= value <= axis[-1]:
+        raise ValueError(f"{value} is outside the surface grid [{axis[0]}, {axis[-1]}]")
+    if len(axis) == 1:
+        return 0, 0, 0.0
+    upper = int(np.clip(np.searchsorted(axis, value), 1, len(axis) - 1))
+    lower = upper - 1
+    weight = (value - axis[lower]) / (axis[upper] - axis[lower])
+    if not interpolate:
+        return (upper, upper, 0.0) if weight >= 0.5 else (lower, lower, 0.0)
+    return lower, upper, float(weight)
+
+
+def build_payment_surface(
+    scenarios: Mapping[str, ScenarioParams],
+    tariffs: Optional[Sequence[float]] = None,
+    cagrs: Optional[Sequence[float]] = None,
+    **sweep_kwargs,
+) -> PaymentSurface:
+    """
+    Compute the payment schedules of named scenarios over a grid of energy tariffs and CAGRs.
+
+    Parameters
+    ----------
+    scenarios The scenarios by name, e.g. `{"average": average, "passive": passive}`
+    tariffs The energy tariffs of the grid (default set from CONFIG file)
+    cagrs The energy CAGRs of the grid (default set from CONFIG file)
+    sweep_kwargs Passed to `iter_sweep` e.g. `workers`, `precision`
+
+    Returns
+    -------
+    The surface of schedules.
+
+    """
+    tariffs = config_axis("tariff") if tariffs is None else np.sort(tariffs)
+    cagrs = config_axis("cagr") if cagrs is None else np.sort(cagrs)
+    axes = {"tariff": tariffs, "cagr_pcnt": cagrs}
+
+    spaces = [ScenarioSpace.from_scenario(p, axes) for p in scenarios.values()]
+    years = None
+    values = []
+    for space in spaces:
+        for chunk in iter_sweep(space, **sweep_kwargs):
+            if years is None:
+                years = chunk.years
+            elif not np.array_equal(chunk.years, years):
+                raise ValueError("The scenarios of a surface must span the same years")
+            values.append(chunk.schedules)
+
+    shape = (len(spaces), len(tariffs), len(cagrs), len(years), len(STREAMS))
+    values = np.concatenate(values).reshape(shape)
+    values.setflags(write=False)
+    return PaymentSurface(
+        names=tuple(scenarios),
+        tariffs=np.asarray(tariffs, dtype=float),
+        cagrs=np.asarray(cagrs, dtype=float),
+        years=years,
+        values=values,
+    )
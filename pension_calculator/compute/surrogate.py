@@ -0,0 +1,191 @@
+"""
+surrogate.py
+
+A surrogate for the lifetime totals of the scenarios in a parameter envelope: the totals are computed once on a grid
+(a `ScenarioSpace`), and queries are answered by multilinear interpolation between the grid points around them.
+
+The surrogate's error is estimated from exact evaluations at random points inside the envelope that are held out of
+the grid. Queries outside the envelope, or next to infeasible grid points, are evaluated exactly instead.
+"""
+
+from itertools import product
+from typing import Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.kernels import STREAMS
+from pension_calculator.compute.scenario_batch import INTEGER_FIELDS, ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sweep import compute_chunk, run_sweep
+
+
+def exact_totals(batch: ScenarioBatch) -> np.ndarray:
+    """Return the totals of a batch, NaN for infeasible scenarios, with shape (scenarios, streams)."""
+    return compute_chunk(batch).totals().to_numpy()
+
+
+class Surrogate:
+    """Interpolated lifetime totals over a grid of scenarios.
+
+    Args:
+        space: The grid. Its axes must be continuous parameters, in ascending order.
+        totals: The totals at every grid point, with shape (*space.shape, streams).
+    """
+
+    def __init__(self, space: ScenarioSpace, totals: np.ndarray):
+        for name, values in space.axes.items():
+            if name in INTEGER_FIELDS:
+                raise ValueError(
+                    f"Cannot interpolate the whole-number parameter {name}"
+                )
+            if np.any(np.diff(values) <= 0):
+                raise ValueError(f"The values of axis {name} must be ascending")
+        self.space = space
+        self.totals = totals
+        self.error: Optional[pd.DataFrame] = None
+
+    def inside(self, points: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Return a mask of the points inside the grid's envelope."""
+        mask = True
+        for name, values in self.space.axes.items():
+            x = np.asarray(points[name], dtype=float)
+            mask = mask & (x >= values[0]) & (x <= values[-1])
+        return np.atleast_1d(mask)
+
+    def interpolate(self, points: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Interpolate the totals at points inside the envelope.
+
+        Parameters
+        ----------
+        points The value of every axis at each point, by axis name
+
+        Returns
+        -------
+        The totals at each point with shape (points, streams), NaN at points next to an infeasible grid point.
+
+        """
+        lower, upper, weights = [], [], []
+        for name, values in self.space.axes.items():
+            x = np.atleast_1d(np.asarray(points[name], dtype=float))
+            if len(values) == 1:
+                i = np.zeros(len(x), dtype=int)
+                lower.append(i)
+                upper.append(i)
+                weights.append(np.zeros(len(x)))
+                continue
+            i = np.clip(
+                np.searchsorted(values, x, side="right") - 1, 0, len(values) - 2
+            )
+            lower.append(i)
+            upper.append(i + 1)
+            weights.append((x - values[i]) / (values[i + 1] - values[i]))
+
+        n = max(len(w) for w in weights)
+        result = np.zeros((n, len(STREAMS)))
+        for corner in product((0, 1), repeat=len(weights)):
+            index = tuple(u if c else l for c, l, u in zip(corner, lower, upper))
+            weight = np.prod(
+                [w if c else 1 - w for c, w in zip(corner, weights)], axis=0
+            )
+            result += weight[:, None] * self.totals[index]
+        return result
+
+    def predict(self, points: Mapping[str, Union[float, np.ndarray]]) -> pd.DataFrame:
+        """
+        Return the totals at arbitrary points, interpolated inside the envelope and evaluated exactly outside it.
+
+        Parameters
+        ----------
+        points The value of every axis at each point, by axis name
+
+        Returns
+        -------
+        A dataframe of the totals at each point, with an `exact` column marking the points evaluated exactly.
+
+        """
+        batch = self.space.at(points)
+        points = {name: getattr(batch, name) for name in self.space.axes}
+        inside = np.broadcast_to(self.inside(points), len(batch))
+
+        totals = np.full((len(batch), len(STREAMS)), np.nan)
+        totals[inside] = self.interpolate(
+            {name: x[inside] for name, x in points.items()}
+        )
+        exact = np.isnan(totals).any(axis=1)
+        if exact.any():
+            totals[exact] = exact_totals(batch[exact])
+
+        df = pd.DataFrame(totals, columns=STREAMS)
+        df["exact"] = exact
+        return df
+
+
+def holdout_error(
+    surrogate: Surrogate, n: int = 256, seed: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Estimate the error of a surrogate from exact evaluations at random points inside its envelope.
+
+    Parameters
+    ----------
+    surrogate The surrogate
+    n The number of held-out points
+    seed Seeds the random points
+
+    Returns
+    -------
+    A dataframe of the maximum absolute (£) and relative error of each stream, over the feasible held-out points.
+
+    """
+    rng = np.random.default_rng(seed)
+    points = {
+        name: rng.uniform(values[0], values[-1], size=n)
+        for name, values in surrogate.space.axes.items()
+    }
+    reference = exact_totals(surrogate.space.at(points))
+    interpolated = surrogate.interpolate(points)
+
+    feasible = ~np.isnan(reference).any(axis=1) & ~np.isnan(interpolated).any(axis=1)
+    abs_error = np.abs(interpolated - reference)[feasible]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel_error = np.where(
+            reference[feasible] == 0, 0, abs_error / np.abs(reference[feasible])
+        )
+
+    return pd.DataFrame(
+        {
+            "max_abs_error": abs_error.max(axis=0, initial=0),
+            "max_rel_error": rel_error.max(axis=0, initial=0),
+        },
+        index=list(STREAMS),
+    )
+
+
+def build_surrogate(
+    space: ScenarioSpace,
+    holdout: int = 256,
+    seed: Optional[int] = None,
+    **sweep_kwargs,
+) -> Surrogate:
+    """
+    Compute the totals on a grid, and estimate the error of interpolating between them.
+
+    Parameters
+    ----------
+    space The grid. Its axes must be continuous parameters, in ascending order.
+    holdout The number of held-out points to estimate the error from, or 0 to skip the estimate
+    seed Seeds the held-out points
+    sweep_kwargs Passed to `run_sweep` e.g. `workers`, `precision`
+
+    Returns
+    -------
+    The surrogate, with its estimated error in `error`.
+
+    """
+    totals = run_sweep(space, **sweep_kwargs).to_numpy()
+    surrogate = Surrogate(space, totals.reshape(space.shape + (len(STREAMS),)))
+    if holdout:
+        surrogate.error = holdout_error(surrogate, holdout, seed)
+    return surrogate
@@ -0,0 +1,376 @@
+"""
+sweep.py
+
+Evaluate the payment schedules of many scenarios in chunks, and summarise each one by its lifetime totals.
+
+Each chunk holds the schedules of its scenarios as a dense array of shape (scenarios, years, streams) on a common year
+axis, computed by the vectorised kernels in `pension_calculator.compute.kernels` in the configured precision. Chunk
+sizes are chosen to keep the chunks held in memory under a budget, see `pension_calculator.compute.chunking`. Progress
+is published through `pension_calculator.compute.metrics` so that long-running sweeps can be monitored.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.chunking import (
+    TracedPeak,
+    choose_chunk_size,
+    estimate_bytes_per_scenario,
+    year_span,
+)
+from pension_calculator import CONFIG
+from pension_calculator.compute import canonical
+from pension_calculator.compute.demand import HourlyDemand
+from pension_calculator.compute.kernels import (
+    LIFE_EXPECTANCY,
+    PRECISIONS,
+    STREAMS,
+    YEAR_OFFSET_DTYPE,
+    Schedules,
+    payment_schedules,
+    schedule_totals,
+)
+from pension_calculator.compute.metrics import SweepMetrics
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.validation import validate_batch
+from pension_calculator.models.tariff import TariffCurve
+from pension_calculator.plot.scenario import ScenarioParams
+
+# The queue that chunks submitted to the worker pool are counted against in `SweepMetrics`. Which process evaluates a
+# chunk is not known until it completes, so the depth is reported for the pool as a whole.
+POOL = "pool"
+
+
+@dataclass
+class SweepChunk:
+    """The schedules of a contiguous run of scenarios.
+
+    Attributes:
+        start: The position of the first scenario in the sweep.
+        base_year: The first year of the chunk's year axis.
+        year_offsets: The years of the chunk as int16 offsets from `base_year`.
+        schedules: An array of shape (scenarios, years, streams). Years outside a scenario's schedule are zero, and
+            the schedules of infeasible scenarios are NaN.
+        reasons: The `Infeasible` flags broken by each scenario, zero if it is feasible.
+        peak_bytes: The peak traced allocation while computing the chunk, if it was measured.
+        evaluated: The number of scenarios actually evaluated, if duplicates were skipped.
+    """
+
+    start: int
+    base_year: int
+    year_offsets: np.ndarray
+    schedules: np.ndarray
+    reasons: np.ndarray
+    peak_bytes: Optional[int] = None
+    evaluated: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self.schedules.shape[0]
+
+    @property
+    def years(self) -> np.ndarray:
+        """The calendar years of the chunk."""
+        return self.base_year + self.year_offsets.astype(int)
+
+    def totals(self) -> pd.DataFrame:
+        """Return the lifetime payments of each stream, and the peak pension value, of each scenario."""
+        totals = schedule_totals(
+            Schedules(self.base_year, self.year_offsets, self.schedules)
+        )
+        return pd.DataFrame(
+            totals, columns=STREAMS, index=range(self.start, self.start + len(self))
+        )
+
+
+Scenarios = Union[Sequence[ScenarioParams], ScenarioSpace, ScenarioBatch]
+
+
+def scenario_block(scenarios: Scenarios, start: int, stop: int) -> ScenarioBatch:
+    """Return the scenarios from `start` to `stop` as a batch, decoding them directly from a scenario space."""
+    if isinstance(scenarios, ScenarioSpace):
+        return scenarios.block(start, stop)
+    if isinstance(scenarios, ScenarioBatch):
+        return scenarios[start:stop]
+    return ScenarioBatch.from_scenarios(scenarios[start:stop])
+
+
+def sweep_years(scenarios: Scenarios) -> Tuple[int, int]:
+    """Return the earliest purchase year and the latest year of death of the scenarios of a sweep."""
+    if isinstance(scenarios, ScenarioSpace):
+        return scenarios.years()
+    if isinstance(scenarios, ScenarioBatch):
+        return (
+            int(scenarios.purchase_year.min()),
+            int(scenarios.yob.max()) + LIFE_EXPECTANCY,
+        )
+    return (
+        min(p.house.purchase_year for p in scenarios),
+        max(p.person.yod for p in scenarios),
+    )
+
+
+def sweep_year_span(scenarios: Scenarios) -> int:
+    """Return the number of years spanned by the scenarios of a sweep."""
+    if isinstance(scenarios, ScenarioSpace):
+        return scenarios.year_span()
+    if isinstance(scenarios, ScenarioBatch):
+        first_year, last_year = sweep_years(scenarios)
+        return last_year - first_year + 1
+    return year_span(scenarios)
+
+
+def _feasible_schedules(
+    batch: ScenarioBatch,
+    dtype: np.dtype,
+    deduplicate: bool,
+    curve: Optional[TariffCurve] = None,
+    heating_factor: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Tuple[Schedules, int]:
+    """Return the schedules of feasible scenarios, and the number of scenarios evaluated to produce them."""
+    if not deduplicate:
+        return payment_schedules(batch, dtype, curve, heating_factor), len(batch)
+    # Equivalent scenarios share a year of birth and purchase year, so the unique ones span the same years.
+    unique, inverse = canonical.deduplicate(batch)
+    schedules = payment_schedules(unique, dtype, curve, heating_factor)
+    return schedules._replace(values=schedules.values[inverse]), len(unique)
+
+
+def compute_chunk(
+    batch: ScenarioBatch,
+    start: int = 0,
+    trace_memory: bool = False,
+    precision: str = "float64",
+    deduplicate: bool = False,
+    curve: Optional[TariffCurve] = None,
+    heating_factor: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> SweepChunk:
+    """
+    Compute the payment schedules of a chunk of scenarios.
+
+    The chunk is validated first, and only its feasible scenarios are evaluated. With `deduplicate`, scenarios that
+    are equivalent up to `pension_calculator.compute.canonical.TOLERANCES` are evaluated once.
+
+    Parameters
+    ----------
+    batch The scenarios in the chunk (see `scenario_block`)
+    start The position of the first scenario in the sweep
+    trace_memory Measure the peak allocation with tracemalloc
+    precision The floating point precision of the schedules, "float64" or "float32"
+    deduplicate Evaluate each equivalent scenario once, and copy its schedules to the others
+    curve The growth of the tariff year by year, shared by every scenario, instead of each scenario's CAGR
+    heating_factor A multiple of each calendar year's heating cost, e.g. `demand.HourlyDemand`
+
+    Returns
+    -------
+    The chunk of schedules.
+
+    """
+    tracer = TracedPeak()
+    with tracer if trace_memory else nullcontext():
+        validation = validate_batch(batch)
+        evaluated = 0
+        if validation.valid.all():
+            schedules, evaluated = _feasible_schedules(
+                batch, PRECISIONS[precision], deduplicate, curve, heating_factor
+            )
+            base_year, year_offsets = schedules.base_year, schedules.year_offsets
+            values = schedules.values
+        else:
+            base_year = int(batch.purchase_year.min())
+            n_years = int(batch.yob.max()) + LIFE_EXPECTANCY - base_year + 1
+            year_offsets = np.arange(n_years).astype(YEAR_OFFSET_DTYPE)
+            values = np.zeros((len(batch), n_years, len(STREAMS)), precision)
+            if validation.valid.any():
+                feasible, evaluated = _feasible_schedules(
+                    batch[validation.valid],
+                    PRECISIONS[precision],
+                    deduplicate,
+                    curve,
+                    heating_factor,
+                )
+                offset = feasible.base_year - base_year
+                values[
+                    validation.valid, offset : offset + len(feasible.year_offsets)
+                ] = feasible.values
+            values[~validation.valid] = np.nan
+
+    return SweepChunk(
+        start=start,
+        base_year=base_year,
+        year_offsets=year_offsets,
+        schedules=values,
+        reasons=validation.reasons,
+        peak_bytes=tracer.peak_bytes if trace_memory else None,
+        evaluated=evaluated if deduplicate else None,
+    )
+
+
+def iter_sweep(
+    scenarios: Scenarios,
+    chunk_size: Optional[int] = None,
+    workers: int = 1,
+    metrics: Optional[SweepMetrics] = None,
+    memory_budget_bytes: Optional[int] = None,
+    trace_memory: bool = False,
+    precision: Optional[str] = None,
+    deduplicate: bool = False,
+    curve: Optional[TariffCurve] = None,
+    heating_factor: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Iterator[SweepChunk]:
+    """
+    Compute the payment schedules of every scenario in a sweep, one chunk at a time.
+
+    Parameters
+    ----------
+    scenarios The scenarios to evaluate, as a list, a batch, or a scenario space that is decoded a chunk at a time
+    chunk_size The number of scenarios per chunk. By default it is chosen from the memory budget.
+    workers The number of worker processes. With one worker, scenarios are evaluated in this process.
+    metrics Progress counters to update as chunks complete (e.g. reported by a `MetricsReporter`)
+    memory_budget_bytes The memory available for chunks in flight (default set from CONFIG file)
+    trace_memory Measure the peak allocation of each chunk with tracemalloc, and record it in `metrics`
+    precision The floating point precision of the schedules, "float64" or "float32" (default set from CONFIG file)
+    deduplicate Evaluate equivalent scenarios within a chunk once, recording the skipped ones as cache hits in `metrics`
+    curve The growth of the tariff year by year, shared by every scenario, instead of each scenario's CAGR
+    heating_factor A multiple of each calendar year's heating cost, e.g. `demand.HourlyDemand`, whose factors for
+        the years of the sweep are computed once here rather than in every chunk
+
+    Returns
+    -------
+    An iterator of chunks, in the order supplied.
+
+    """
+    if metrics is None:
+        metrics = SweepMetrics(total=len(scenarios))
+    if not len(scenarios):
+        return
+    if precision is None:
+        precision = CONFIG.get("sweep").get("precision")
+    if isinstance(heating_factor, HourlyDemand):
+        heating_factor = heating_factor.table(*sweep_years(scenarios))
+
+    # The parent holds a result and a queued chunk per worker.
+    chunks_in_flight = 2 * max(workers, 1)
+    if chunk_size is None:
+        chunk_size = choose_chunk_size(
+            estimate_bytes_per_scenario(
+                sweep_year_span(scenarios), len(STREAMS), PRECISIONS[precision]
+            ),
+            memory_budget_bytes=memory_budget_bytes,
+            chunks_in_flight=chunks_in_flight,
+        )
+
+    starts = range(0, len(scenarios), chunk_size)
+
+    def completed(chunk: SweepChunk, worker: str) -> SweepChunk:
+        metrics.completed(worker, len(chunk))
+        if chunk.peak_bytes is not None:
+            metrics.record_peak(chunk.peak_bytes)
+        if chunk.evaluated is not None:
+            feasible = int(np.count_nonzero(chunk.reasons == 0))
+            metrics.record_cache(
+                hits=feasible - chunk.evaluated, misses=chunk.evaluated
+            )
+        return chunk
+
+    if workers <= 1:
+        for start in starts:
+            batch = scenario_block(scenarios, start, start + chunk_size)
+            metrics.submitted("main", len(batch))
+            yield completed(
+                compute_chunk(
+                    batch,
+                    start,
+                    trace_memory,
+                    precision,
+                    deduplicate,
+                    curve,
+                    heating_factor,
+                ),
+                "main",
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        finished = {}
+        next_start = iter(starts)
+        next_yield = 0
+
+        def submit() -> None:
+            start = next(next_start, None)
+            if start is None:
+                return
+            batch = scenario_block(scenarios, start, start + chunk_size)
+            metrics.submitted(POOL, len(batch))
+            future = executor.submit(
+                compute_chunk,
+                batch,
+                start,
+                trace_memory,
+                precision,
+                deduplicate,
+                curve,
+                heating_factor,
+            )
+            pending[future] = POOL
+
+        for _ in range(chunks_in_flight):
+            submit()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = completed(future.result(), pending.pop(future))
+                finished[chunk.start] = chunk
+            while next_yield in finished:
+                yield finished.pop(next_yield)
+                next_yield += chunk_size
+                submit()
+
+
+def run_sweep(
+    scenarios: Scenarios,
+    chunk_size: Optional[int] = None,
+    workers: int = 1,
+    metrics: Optional[SweepMetrics] = None,
+    memory_budget_bytes: Optional[int] = None,
+    trace_memory: bool = False,
+    precision: Optional[str] = None,
+    deduplicate: bool = False,
+    curve: Optional[TariffCurve] = None,
+    heating_factor: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> pd.DataFrame:
+    """
+    Compute the lifetime totals of every scenario in a sweep.
+
+    Parameters are as for `iter_sweep`.
+
+    Returns
+    -------
+    A dataframe of totals with one row per scenario, in the order supplied.
+
+    """
+    totals: List[pd.DataFrame] = [
+        chunk.totals()
+        for chunk in iter_sweep(
+            scenarios,
+            chunk_size=chunk_size,
+            workers=workers,
+            metrics=metrics,
+            memory_budget_bytes=memory_budget_bytes,
+            trace_memory=trace_memory,
+            precision=precision,
+            deduplicate=deduplicate,
+            curve=curve,
+            heating_factor=heating_factor,
+        )
+    ]
+    if not totals:
+        return pd.DataFrame(columns=STREAMS)
+    return pd.concat(totals)
@@ -0,0 +1,214 @@
+"""
+tariff_store.py
+
+Ingest large files of energy tariffs by region, fuel, and date into a compact store of annual tariffs, so that tariff
+curves are looked up without reparsing the files.
+
+Files are read a chunk of rows at a time, and each chunk is reduced to the sum and count of tariffs per region, fuel,
+and year, so memory depends on the number of regions, fuels, and years rather than the size of the files. A store is a
+directory holding:
+
+    tariffs-XXXXXXXX.npy  The mean tariff of each (region, fuel, year), with shape (regions, fuels, years), NaN where
+                          missing.
+    index.json            The name of the array, the regions and fuels in its order, and the year of its first column.
+
+Each ingest writes a new array under a new name and then replaces the index atomically, so a reader always opens an
+array with the index it was written with, even while the store is re-ingested. The array the index named before is
+removed afterwards.
+
+The array is memory-mapped when the store is opened, so only the curves looked up are read from disk.
+
+CSV files are read with pandas. Parquet files require pyarrow, installed with the `store` extra.
+"""
+
+import json
+import uuid
+from pathlib import Path
+from typing import Iterator, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.atomic import save_array, write_text
+from pension_calculator.models.tariff import TariffCurve
+
+TARIFFS = "tariffs-{version}.npy"
+INDEX = "index.json"
+
+# The number of times a reader re-reads the index if its array is replaced while the store is opened.
+OPEN_ATTEMPTS = 3
+
+KEYS = ("region", "fuel", "year")
+
+PathLike = Union[str, Path]
+
+
+def _chunks(
+    path: Path, columns: Sequence[str], chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """Read the columns of a CSV or Parquet file a chunk of rows at a time."""
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(
+            batch_size=chunk_rows, columns=list(columns)
+        ):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=list(columns), chunksize=chunk_rows)
+
+
+def _annual_sums(chunk: pd.DataFrame, date_column: str) -> pd.DataFrame:
+    """Reduce a chunk of tariffs to the sum and count of tariffs per region, fuel, and year."""
+    dates = chunk[date_column]
+    if pd.api.types.is_integer_dtype(dates):
+        year = dates
+    else:
+        year = pd.to_datetime(dates).dt.year
+    return (
+        chunk.assign(year=year.astype(np.int32))
+        .groupby(list(KEYS))["tariff"]
+        .agg(["sum", "count"])
+    )
+
+
+def ingest_tariffs(
+    sources: Union[PathLike, Sequence[PathLike]],
+    root: PathLike,
+    chunk_rows: int = 1_000_000,
+    region_column: str = "region",
+    fuel_column: str = "fuel",
+    date_column: str = "date",
+    tariff_column: str = "tariff",
+    dtype: np.dtype = np.float32,
+) -> "TariffStore":
+    """
+    Ingest tariff files into a store of the mean tariff per region, fuel, and year.
+
+    Parameters
+    ----------
+    sources The CSV or Parquet files, with a row per region, fuel, and date
+    root The store directory, created if necessary
+    chunk_rows The number of rows read at a time
+    region_column The column of regions
+    fuel_column The column of fuels
+    date_column The column of dates, or of integer years
+    tariff_column The column of tariffs, in pounds per kWh
+    dtype The floating point type the tariffs are stored in
+
+    Returns
+    -------
+    The store.
+
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    renames = {
+        region_column: "region",
+        fuel_column: "fuel",
+        tariff_column: "tariff",
+    }
+
+    sums = None
+    for source in sources:
+        for chunk in _chunks(Path(source), list(renames) + [date_column], chunk_rows):
+            annual = _annual_sums(chunk.rename(columns=renames), date_column)
+            sums = annual if sums is None else sums.add(annual, fill_value=0)
+    if sums is None:
+        raise ValueError("No tariffs to ingest")
+
+    means = sums["sum"] / sums["count"]
+    regions = sorted(means.index.unique("region").astype(str))
+    fuels = sorted(means.index.unique("fuel").astype(str))
+    years = means.index.get_level_values("year")
+    first_year = int(years.min())
+
+    tariffs = np.full(
+        (len(regions), len(fuels), int(years.max()) - first_year + 1), np.nan, dtype
+    )
+    tariffs[
+        pd.Index(regions).get_indexer(
+            means.index.get_level_values("region").astype(str)
+        ),
+        pd.Index(fuels).get_indexer(means.index.get_level_values("fuel").astype(str)),
+        years - first_year,
+    ] = means.to_numpy()
+
+    index_path = root / INDEX
+    previous = (
+        json.loads(index_path.read_text()).get("tariffs")
+        if index_path.exists()
+        else None
+    )
+    name = TARIFFS.format(version=uuid.uuid4().hex[:8])
+    save_array(root / name, tariffs)
+    write_text(
+        index_path,
+        json.dumps(
+            {
+                "tariffs": name,
+                "regions": regions,
+                "fuels": fuels,
+                "first_year": first_year,
+            }
+        ),
+    )
+    if previous is not None:
+        try:
+            (root / previous).unlink()
+        except OSError:
+            pass  # removed by another ingest, or still mapped by a reader on Windows
+    return TariffStore(root)
+
+
+class TariffStore:
+    """
+    A store of annual tariffs by region, fuel, and year, see `ingest_tariffs`.
+
+    Attributes:
+        regions: The regions of the store.
+        fuels: The fuels of the store.
+        years: The years of the store.
+        tariffs: The memory-mapped tariffs, with shape (regions, fuels, years).
+    """
+
+    def __init__(self, root: PathLike):
+        root = Path(root)
+        for attempt in range(OPEN_ATTEMPTS):
+            index = json.loads((root / INDEX).read_text())
+            try:
+                self.tariffs = np.load(root / index["tariffs"], mmap_mode="r")
+                break
+            except FileNotFoundError:
+                if attempt == OPEN_ATTEMPTS - 1:
+                    raise
+        self.regions = index["regions"]
+        self.fuels = index["fuels"]
+        self.years = index["first_year"] + np.arange(self.tariffs.shape[2])
+        self._regions = {region: i for i, region in enumerate(self.regions)}
+        self._fuels = {fuel: i for i, fuel in enumerate(self.fuels)}
+
+    def series(self, region: str, fuel: str) -> pd.Series:
+        """Return the tariffs of a region and fuel, indexed by year, for the years that have them."""
+        if region not in self._regions or fuel not in self._fuels:
+            raise KeyError(f"No tariffs for {fuel} in {region}")
+        values = np.asarray(self.tariffs[self._regions[region], self._fuels[fuel]])
+        present = ~np.isnan(values)
+        return pd.Series(
+            values[present].astype(float), index=self.years[present], name="tariff"
+        )
+
+    def curve(self, region: str, fuel: str) -> TariffCurve:
+        """Return the growth of the tariffs of a region and fuel as a curve, for `Energy` and the kernels.
+
+        Years missing between the first and last years with tariffs are filled at a constant growth rate across the
+        gap, by interpolating the log of the tariffs.
+        """
+        series = self.series(region, fuel)
+        if series.empty:
+            raise KeyError(f"No tariffs for {fuel} in {region}")
+        years = np.arange(series.index[0], series.index[-1] + 1)
+        tariffs = np.exp(np.interp(years, series.index, np.log(series.to_numpy())))
+        return TariffCurve.from_tariffs(years, tariffs)
@@ -0,0 +1,195 @@
+"""
+threshold.py
+
+Find the scenarios of a space whose passive house saves more than a threshold, or the k that save most, without
+evaluating every scenario.
+
+Only the energy costs of a scenario depend on the tariff and CAGR. The heating and pension payments rise with both, and
+are proportional to the heating demand, so the net saving is monotonic in the tariff and CAGR together: increasing in
+both if the passive house uses less energy than the average house, and decreasing in both otherwise. So for a group of
+scenarios that differ only in their tariff and CAGR, the net savings at the lowest and at the highest tariff and CAGR
+bound the net saving of every scenario in the group.
+
+Queries start from groups spanning every tariff and CAGR, accept or discard whole groups on their bounds, and split the
+rest by tariff and then by CAGR. Only the scenarios left undecided are evaluated individually.
+
+Each passive scenario is compared with an average house in the same circumstances, see
+`comparison.average_counterpart`.
+"""
+
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+from pension_calculator.compute.comparison import average_counterpart, compare
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.plot.scenario import ScenarioParams, average
+
+MONOTONE_AXES = ("tariff", "cagr_pcnt")
+
+
+class QueryResult(NamedTuple):
+    """The scenarios answering a query.
+
+    Attributes:
+        indices: The positions of the scenarios in the space.
+        net_saving: The net saving of each scenario, or NaN if it was accepted on its bounds without evaluation.
+        n_evaluations: The number of scenarios evaluated, including those at the corners of groups.
+    """
+
+    indices: np.ndarray
+    net_saving: np.ndarray
+    n_evaluations: int
+
+
+class _Search:
+    """Groups of scenarios of a space, as multi-indices with -1 on the axes that vary within the group."""
+
+    def __init__(
+        self, space: ScenarioSpace, average_params: ScenarioParams, sweep_kwargs
+    ):
+        if len(space) != np.prod(space.shape):
+            raise ValueError("Queries need a whole scenario space, not a slice")
+        self.space = space
+        self.average_params = average_params
+        self.sweep_kwargs = sweep_kwargs
+        self.names = list(space.axes)
+        self.monotone = [self.names.index(a) for a in MONOTONE_AXES if a in self.names]
+        self.n_evaluations = 0
+
+    def initial_groups(self) -> np.ndarray:
+        fixed = [
+            np.arange(n) if i not in self.monotone else np.array([-1])
+            for i, n in enumerate(self.space.shape)
+        ]
+        grids = np.meshgrid(*fixed, indexing="ij")
+        return np.stack([g.ravel() for g in grids], axis=1)
+
+    def net_saving(self, multi: np.ndarray) -> np.ndarray:
+        """Evaluate the scenarios at fully specified multi-indices."""
+        self.n_evaluations += len(multi)
+        if not len(multi):
+            return np.empty(0)
+        flat = np.ravel_multi_index(tuple(multi.T), self.space.shape)
+        passive = self.space.take(flat)
+        comparison = compare(
+            passive,
+            average_counterpart(passive, self.average_params),
+            **self.sweep_kwargs,
+        )
+        return comparison["net_saving"].to_numpy()
+
+    def bounds(self, groups: np.ndarray, free: List[int]) -> Tuple[np.ndarray, ...]:
+        """Return the lower and upper bound of the net saving in each group, from its two extreme corners."""
+        corners = []
+        for pick in (np.argmin, np.argmax):
+            corner = groups.copy()
+            for i in free:
+                corner[:, i] = pick(self.space.axes[self.names[i]])
+            corners.append(corner)
+        values = self.net_saving(np.concatenate(corners)).reshape(2, len(groups))
+        return values.min(axis=0), values.max(axis=0)
+
+    def size(self, free: List[int]) -> int:
+        return int(np.prod([self.space.shape[i] for i in free]))
+
+    def expand(self, groups: np.ndarray, free: List[int]) -> np.ndarray:
+        """Return the positions in the space of every scenario in the groups."""
+        multi = groups
+        for i in free:
+            n = self.space.shape[i]
+            multi = np.repeat(multi, n, axis=0)
+            multi[:, i] = np.tile(np.arange(n), len(multi) // n)
+        return np.ravel_multi_index(tuple(multi.T), self.space.shape)
+
+    def split(self, groups: np.ndarray, axis: int) -> np.ndarray:
+        """Split each group on one of its varying axes."""
+        n = self.space.shape[axis]
+        groups = np.repeat(groups, n, axis=0)
+        groups[:, axis] = np.tile(np.arange(n), len(groups) // n)
+        return groups
+
+
+def query_threshold(
+    space: ScenarioSpace,
+    threshold: float,
+    average_params: ScenarioParams = average,
+    **sweep_kwargs,
+) -> QueryResult:
+    """
+    Find the passive house scenarios of a space that save at least `threshold` over an average house.
+
+    Parameters
+    ----------
+    space The passive house scenarios
+    threshold The net saving to reach, in pounds
+    average_params The average house, whose `PASSIVE_ONLY` inputs are compared
+    sweep_kwargs Passed to `run_sweep` e.g. `workers`
+
+    Returns
+    -------
+    The qualifying scenarios, in the order of the space.
+
+    """
+    search = _Search(space, average_params, sweep_kwargs)
+    groups = search.initial_groups()
+    accepted = []
+    for level, axis in enumerate(search.monotone):
+        free = search.monotone[level:]
+        lower, upper = search.bounds(groups, free)
+        accept = lower >= threshold
+        accepted.append(search.expand(groups[accept], free))
+        undecided = groups[~accept & ~(upper < threshold)]
+        groups = search.split(undecided, axis)
+
+    values = search.net_saving(groups)
+    qualify = values >= threshold
+    indices = np.concatenate(
+        accepted + [np.ravel_multi_index(tuple(groups[qualify].T), space.shape)]
+    )
+    net_saving = np.concatenate(
+        [np.full(len(a), np.nan) for a in accepted] + [values[qualify]]
+    )
+    order = np.argsort(indices, kind="stable")
+    return QueryResult(indices[order], net_saving[order], search.n_evaluations)
+
+
+def query_top_k(
+    space: ScenarioSpace,
+    k: int,
+    average_params: ScenarioParams = average,
+    **sweep_kwargs,
+) -> QueryResult:
+    """
+    Find the k passive house scenarios of a space that save most over an average house.
+
+    Groups are discarded when even their upper bound is below the k-th largest lower bound.
+
+    Parameters
+    ----------
+    space The passive house scenarios
+    k The number of scenarios to find
+    average_params The average house, whose `PASSIVE_ONLY` inputs are compared
+    sweep_kwargs Passed to `run_sweep` e.g. `workers`
+
+    Returns
+    -------
+    The k best scenarios (fewer if the space has fewer feasible scenarios), best first.
+
+    """
+    search = _Search(space, average_params, sweep_kwargs)
+    groups = search.initial_groups()
+    for level, axis in enumerate(search.monotone):
+        free = search.monotone[level:]
+        lower, upper = search.bounds(groups, free)
+        order = np.argsort(-np.nan_to_num(lower, nan=-np.inf), kind="stable")
+        covered = np.cumsum(np.full(len(groups), search.size(free)))
+        kth = np.searchsorted(covered, k)
+        cutoff = lower[order[kth]] if kth < len(groups) else -np.inf
+        groups = search.split(groups[~(upper < cutoff)], axis)
+
+    values = search.net_saving(groups)
+    feasible = np.flatnonzero(~np.isnan(values))
+    best = feasible[np.argsort(-values[feasible], kind="stable")[:k]]
+    indices = np.ravel_multi_index(tuple(groups[best].T), space.shape)
+    return QueryResult(indices, values[best], search.n_evaluations)
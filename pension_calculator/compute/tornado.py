@@ -0,0 +1,87 @@
+"""
+tornado.py
+
+One-at-a-time sensitivity of the net saving of a passive house: move each input to its low and then its high value,
+with every other input at its base value, and rank the inputs by the swing in net saving.
+
+The base scenario and all 2 * d perturbed scenarios are evaluated as one batch per house, see `comparison.compare`.
+"""
+
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator.compute.comparison import PASSIVE_ONLY, compare
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sensitivity import default_bounds
+from pension_calculator.plot.scenario import ScenarioParams, average, passive
+
+
+def _perturbed(
+    params: ScenarioParams,
+    bounds: Mapping[str, Tuple[float, float]],
+    fixed: Sequence[str] = (),
+) -> ScenarioBatch:
+    """Return the base scenario, then the scenario with each input at its low and high value in turn.
+
+    Inputs in `fixed` stay at their base value throughout.
+    """
+    base = ScenarioBatch.from_scenarios([params]).columns()
+    names = [name for name in bounds if name not in fixed]
+    n = 2 * len(bounds) + 1
+    points = {name: np.full(n, base[name][0]) for name in names}
+    for i, (name, (low, high)) in enumerate(bounds.items()):
+        if name in points:
+            points[name][[2 * i + 1, 2 * i + 2]] = low, high
+    space = ScenarioSpace.from_scenario(params, {name: [0] for name in names})
+    return space.at(points)
+
+
+def tornado(
+    bounds: Optional[Mapping[str, Tuple[float, float]]] = None,
+    passive_params: ScenarioParams = passive,
+    average_params: ScenarioParams = average,
+    output: str = "net_saving",
+    **sweep_kwargs,
+) -> pd.DataFrame:
+    """
+    Compute the swing in the net saving of a passive house as each input moves between its low and high value.
+
+    Parameters
+    ----------
+    bounds The low and high value of each input, by `ScenarioBatch` field (default `sensitivity.default_bounds`)
+    passive_params The base passive house scenario, e.g. `plot/scenario.py`'s `passive`
+    average_params The base average house scenario
+    output The output to analyse, see `comparison.compare`
+    sweep_kwargs Passed to `run_sweep` e.g. `workers`
+
+    Returns
+    -------
+    A dataframe indexed by input, ranked by swing, of each input's low and high value, the output at each, and the
+    swing between them. The output of the base scenario is in the dataframe's `attrs["base"]`.
+
+    """
+    bounds = default_bounds() if bounds is None else bounds
+    comparison = compare(
+        _perturbed(passive_params, bounds),
+        _perturbed(average_params, bounds, fixed=PASSIVE_ONLY),
+        **sweep_kwargs,
+    )
+    values = comparison[output].to_numpy()
+
+    low, high = np.array(list(bounds.values()), dtype=float).T
+    df = pd.DataFrame(
+        {
+            "low": low,
+            "high": high,
+            f"{output}_low": values[1::2],
+            f"{output}_high": values[2::2],
+        },
+        index=pd.Index(list(bounds), name="input"),
+    )
+    df["swing"] = (df[f"{output}_high"] - df[f"{output}_low"]).abs()
+    df = df.sort_values("swing", ascending=False)
+    df.attrs["base"] = values[0]
+    return df
@@ -0,0 +1,100 @@
+"""
+validation.py
+
+Check the timeline constraints of a whole batch of scenarios at once.
+
+`compute_payment_schedule` raises on the first infeasible scenario. Here every scenario is checked in one vectorised
+pass, giving a mask of the feasible scenarios and, for the rest, a bit flag for every constraint they break.
+"""
+
+from enum import IntFlag
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from pension_calculator.compute.kernels import LIFE_EXPECTANCY, PENSION_AGE
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+
+
+class Infeasible(IntFlag):
+    """Reasons a scenario cannot be evaluated."""
+
+    MORTGAGE_AFTER_DEATH = 1
+    MORTGAGE_AFTER_RETIREMENT = 2
+    PENSION_ENDS_BEFORE_START = 4
+    PENSION_ENDS_AFTER_RETIREMENT = 8
+    PURCHASE_BEFORE_BIRTH = 16
+    PURCHASE_AFTER_DEATH = 32
+    NON_POSITIVE_RATE = 64
+    NON_POSITIVE_TERM = 128
+    MORTGAGE_BEFORE_PURCHASE = 256
+
+
+class ValidationResult(NamedTuple):
+    """The outcome of validating a batch.
+
+    Attributes:
+        valid: A boolean mask of the feasible scenarios.
+        reasons: The `Infeasible` flags broken by each scenario, zero if it is feasible.
+    """
+
+    valid: np.ndarray
+    reasons: np.ndarray
+
+    def describe(self, i: int) -> List[str]:
+        """Return the names of the constraints broken by scenario `i`."""
+        return [reason.name for reason in Infeasible if self.reasons[i] & reason]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of scenarios breaking each constraint."""
+        return {
+            reason.name: int(np.count_nonzero(self.reasons & reason))
+            for reason in Infeasible
+        }
+
+
+def validate_batch(batch: ScenarioBatch) -> ValidationResult:
+    """
+    Check the timeline constraints of every scenario in a batch.
+
+    Parameters
+    ----------
+    batch The scenarios to check
+
+    Returns
+    -------
+    A mask of the feasible scenarios and the reasons the others are infeasible.
+
+    """
+    yor = batch.yob + PENSION_AGE
+    yod = batch.yob + LIFE_EXPECTANCY
+    mortgage_final_year = batch.mortgage_final_year()
+
+    checks = [
+        (Infeasible.MORTGAGE_AFTER_DEATH, mortgage_final_year >= yod),
+        (Infeasible.MORTGAGE_AFTER_RETIREMENT, mortgage_final_year >= yor),
+        (
+            Infeasible.PENSION_ENDS_BEFORE_START,
+            batch.pension_end_year <= batch.pension_start_year,
+        ),
+        (Infeasible.PENSION_ENDS_AFTER_RETIREMENT, batch.pension_end_year > yor),
+        (Infeasible.PURCHASE_BEFORE_BIRTH, batch.purchase_year < batch.yob),
+        (Infeasible.PURCHASE_AFTER_DEATH, batch.purchase_year > yod),
+        (
+            Infeasible.NON_POSITIVE_RATE,
+            (batch.interest_rate_pcnt <= 0)
+            | (batch.growth_rate_pcnt <= 0)
+            | (batch.tariff <= 0),
+        ),
+        (Infeasible.NON_POSITIVE_TERM, batch.length_years <= 0),
+        (
+            Infeasible.MORTGAGE_BEFORE_PURCHASE,
+            batch.mortgage_purchase_year < batch.purchase_year,
+        ),
+    ]
+
+    reasons = np.zeros(len(batch), dtype=np.uint16)
+    for reason, broken in checks:
+        reasons |= np.where(broken, reason.value, 0).astype(np.uint16)
+
+    return ValidationResult(valid=reasons == 0, reasons=reasons)
@@ -1,5 +1,9 @@
+from pension_calculator.models.demand import TimeOfUseTariff, Weather
 from pension_calculator.models.energy import Energy
+from pension_calculator.models.heating_system import HeatingSystem
 from pension_calculator.models.house import House
+from pension_calculator.models.mortality import LifeTable
 from pension_calculator.models.mortgage import Mortgage
 from pension_calculator.models.pension import Pension
 from pension_calculator.models.person import Person
+from pension_calculator.models.tariff import TariffCurve
@@ -0,0 +1,111 @@
+"""Classes that represent hourly weather and time-of-use tariffs, for hourly heating demand.
+
+A house's hourly heating demand is taken to be proportional to its heating degree hours: the amount by which the
+outdoor temperature falls below a base temperature in each hour. Hourly temperatures are read from local weather data,
+or spread evenly through each day from daily heating degree days.
+
+A time-of-use tariff multiplies the tariff in each hour of the year, e.g. cheaper at night.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_DAY = 24
+DAYS_PER_YEAR = 365
+HOURS_PER_YEAR = HOURS_PER_DAY * DAYS_PER_YEAR
+
+BASE_TEMPERATURE = 15.5
+
+
+def degree_hours(
+    temperatures, base_temperature: float = BASE_TEMPERATURE
+) -> np.ndarray:
+    """Return the heating degree hours of hourly temperatures in Celsius."""
+    return np.maximum(base_temperature - np.asarray(temperatures), 0.0)
+
+
+@dataclass(frozen=True, slots=True)
+class Weather:
+    """Represents hourly outdoor temperatures over one or more years.
+
+    Attributes:
+        temperatures: The temperature in Celsius in each hour, with shape (years, `HOURS_PER_YEAR`).
+    """
+
+    temperatures: np.ndarray
+
+    def __post_init__(self):
+        temperatures = np.asarray(self.temperatures, dtype=float)
+        if temperatures.size % HOURS_PER_YEAR or not temperatures.size:
+            raise ValueError(f"Weather needs {HOURS_PER_YEAR} hours for each year")
+        object.__setattr__(
+            self, "temperatures", temperatures.reshape(-1, HOURS_PER_YEAR)
+        )
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path], column: str = "temperature") -> "Weather":
+        """Load hourly temperatures from a CSV file with a row per hour, leap days removed.
+
+        Args:
+            path: The CSV file.
+            column: The column of temperatures in Celsius.
+
+        Returns:
+            The weather.
+        """
+        return cls(pd.read_csv(path, usecols=[column])[column].to_numpy())
+
+    @classmethod
+    def from_degree_days(
+        cls, degree_days, base_temperature: float = BASE_TEMPERATURE
+    ) -> "Weather":
+        """Create hourly temperatures from daily heating degree days, constant through each day.
+
+        Args:
+            degree_days: The heating degree days of each day, `DAYS_PER_YEAR` for each year.
+            base_temperature: The base temperature of the degree days.
+
+        Returns:
+            The weather.
+        """
+        daily = base_temperature - np.asarray(degree_days, dtype=float)
+        return cls(np.repeat(daily, HOURS_PER_DAY))
+
+    @property
+    def n_years(self) -> int:
+        """The number of years of weather."""
+        return self.temperatures.shape[0]
+
+
+@dataclass(frozen=True, slots=True)
+class TimeOfUseTariff:
+    """Represents a time-of-use tariff as multiples of the tariff in each hour of the year.
+
+    Attributes:
+        multipliers: The multiple of the tariff in each hour, with shape (`HOURS_PER_YEAR`,).
+    """
+
+    multipliers: np.ndarray
+
+    def __post_init__(self):
+        multipliers = np.asarray(self.multipliers, dtype=float)
+        if multipliers.shape != (HOURS_PER_YEAR,):
+            raise ValueError(f"A time-of-use tariff needs {HOURS_PER_YEAR} hours")
+        object.__setattr__(self, "multipliers", multipliers)
+
+    @classmethod
+    def flat(cls) -> "TimeOfUseTariff":
+        """Create a tariff that is the same in every hour."""
+        return cls(np.ones(HOURS_PER_YEAR))
+
+    @classmethod
+    def from_daily(cls, multipliers) -> "TimeOfUseTariff":
+        """Create a tariff that repeats the same multiples of the tariff in each hour of every day."""
+        multipliers = np.asarray(multipliers, dtype=float)
+        if multipliers.shape != (HOURS_PER_DAY,):
+            raise ValueError(f"A daily profile needs {HOURS_PER_DAY} hours")
+        return cls(np.tile(multipliers, DAYS_PER_YEAR))
@@ -0,0 +1,124 @@
+"""A module for drawing down pensions in retirement.
+
+A pension pot is drawn down by a withdrawal at the start of each year, and the remainder grows at the pension's
+growth rate until the next. The strategies are:
+
+    schedule: Withdraw a given amount each year, e.g. the heating cost.
+    fixed_real: Withdraw a fixed amount, raised each year by inflation.
+    percentage: Withdraw a fixed percent of the pot each year.
+    annuity: Buy an annuity with the whole pot, which pays a fixed percent of the pot each year for life.
+
+The functions are vectorised across scenarios, with a strategy and parameters per scenario, so strategies can be
+compared for many scenarios at once. The pot after each year is found from the cumulative sum of the discounted
+withdrawals rather than year by year.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+STRATEGIES = ("schedule", "fixed_real", "percentage", "annuity")
+
+# The depletion year of a pot that is never depleted.
+NEVER = -1
+
+
+class DrawdownResult(NamedTuple):
+    """The drawdown of pension pots.
+
+    Attributes:
+        withdrawals: The withdrawal planned in each year, with shape (scenarios, years).
+        values: The value of each pot at the end of each year, zero once depleted.
+        depletion_year: The first year whose withdrawal the pot can not pay in full, or `NEVER`.
+        terminal_value: The value of each pot at the end of the last year.
+    """
+
+    withdrawals: np.ndarray
+    values: np.ndarray
+    depletion_year: np.ndarray
+    terminal_value: np.ndarray
+
+
+def drawdown(
+    strategy,
+    initial_value,
+    growth_rate_pcnt,
+    n_years: int,
+    first_year=0,
+    schedule: Optional[np.ndarray] = None,
+    amount=0.0,
+    inflation_pcnt=0.0,
+    rate_pcnt=0.0,
+) -> DrawdownResult:
+    """Draw down pension pots over retirement.
+
+    Args:
+        strategy: The strategy of each scenario, one of `STRATEGIES`.
+        initial_value: The value of each pot at retirement, in pounds.
+        growth_rate_pcnt: The growth rate of each pot during retirement e.g. '0.01'.
+        n_years: The number of years of retirement.
+        first_year: The first year of retirement of each scenario.
+        schedule: The withdrawals of the schedule strategy, with shape (scenarios, years).
+        amount: The first year's withdrawal of the fixed real strategy, in pounds.
+        inflation_pcnt: The annual rise in the withdrawal of the fixed real strategy e.g. '0.02'.
+        rate_pcnt: The percent of the pot withdrawn each year by the percentage strategy, or paid by the annuity.
+
+    Returns:
+        The withdrawals and value of each pot in each year, the year it is depleted, and its final value.
+    """
+    strategy = np.atleast_1d(np.asarray(strategy))
+    unknown = set(strategy.tolist()) - set(STRATEGIES)
+    if unknown:
+        raise ValueError(
+            f"Unknown strategies {sorted(unknown)}, expected one of {STRATEGIES}"
+        )
+    shape = (len(strategy),)
+    initial_value, growth_rate_pcnt, amount, inflation_pcnt, rate_pcnt = (
+        np.broadcast_to(np.asarray(value, dtype=float), shape)[:, None]
+        for value in (
+            initial_value,
+            growth_rate_pcnt,
+            amount,
+            inflation_pcnt,
+            rate_pcnt,
+        )
+    )
+    first_year = np.broadcast_to(np.asarray(first_year, dtype=int), shape)
+    if schedule is None:
+        schedule = np.zeros((len(strategy), n_years))
+    periods = np.arange(n_years)[None, :]
+
+    # Withdrawals, with the percentage strategy's in closed form as its pot shrinks geometrically.
+
+    kind = strategy[:, None]
+    withdrawals = np.select(
+        [kind == "schedule", kind == "fixed_real", kind == "percentage"],
+        [
+            np.broadcast_to(schedule, (len(strategy), n_years)),
+            amount * np.exp(periods * np.log1p(inflation_pcnt)),
+            rate_pcnt
+            * initial_value
+            * np.power((1 - rate_pcnt) * (1 + growth_rate_pcnt), periods),
+        ],
+        default=rate_pcnt * initial_value * np.ones(n_years),
+    )
+
+    # The pot at the end of year k is (1 + g) ** (k + 1) times the initial value less the withdrawals discounted to
+    # retirement. It is depleted once the discounted withdrawals exceed the initial value.
+
+    growth = np.exp(periods * np.log1p(growth_rate_pcnt))
+    remaining = initial_value - np.cumsum(withdrawals / growth, axis=1)
+    annuity = kind == "annuity"
+    depleted = (remaining < -1e-9 * np.maximum(initial_value, 1)) & ~annuity
+    values = np.where(
+        depleted | annuity, 0.0, remaining * growth * (1 + growth_rate_pcnt)
+    )
+    depletion_year = np.where(
+        depleted.any(axis=1), first_year + depleted.argmax(axis=1), NEVER
+    )
+    return DrawdownResult(
+        withdrawals=withdrawals,
+        values=values,
+        depletion_year=depletion_year,
+        terminal_value=values[:, -1] if n_years else initial_value[:, 0],
+    )
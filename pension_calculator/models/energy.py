@@ -2,28 +2,39 @@
 
 Classes:
     Energy: Represents energy costs over time.
+
+Functions:
+    heating_cost_total: Compute total energy payments in closed form.
+    heating_cost_total_gradient: Compute the derivatives of total energy payments.
 """
+
 from dataclasses import dataclass
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
 import toml
 
 from pension_calculator import ROOT
+from pension_calculator.models.pension import compound_sum, compound_sum_derivative
+from pension_calculator.models.tariff import TariffCurve
 
 config = toml.load(f"{ROOT}/app.config.toml")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Energy:
     """Represents energy costs over time.
 
     Attributes:
         tariff: The energy tariff in pounds e.g. '0.05'
         cagr: The compound annual growth rate in percent e.g. '0.05'
+        curve: The growth of the tariff year by year, which replaces the CAGR if given.
     """
 
     tariff: float
     cagr_pcnt: float
+    curve: Optional[TariffCurve] = None
 
     def annual_energy_cost(self, house_kwh_m2a: float, house_area_m2: float) -> float:
         """Compute the annual energy cost of a house with the given area and heating energy demand.
@@ -62,9 +73,15 @@ class Energy:
         initial_payment = self.annual_energy_cost(
             house_kwh_m2a=house_kwh_m2a, house_area_m2=house_area_m2
         )
-        payments = [
-            initial_payment * pow(1 + self.cagr_pcnt, period) for period in range(years)
-        ]
+        if self.curve is not None:
+            payments = initial_payment * self.curve.growth_factors(
+                first_year, np.arange(first_year, last_year + 1)
+            )
+        else:
+            payments = [
+                initial_payment * pow(1 + self.cagr_pcnt, period)
+                for period in range(years)
+            ]
 
         return pd.Series(data=payments, index=range(first_year, last_year + 1))
 
@@ -103,3 +120,73 @@ class Energy:
         ]
 
         return retirement_annual_payments.sum()
+
+    def total_cost_gradient(
+        self,
+        house_kwh_m2a: float,
+        house_area_m2: float,
+        first_year: int,
+        year_from: int,
+        year_to: int,
+    ) -> Dict[str, float]:
+        """Compute the derivatives of the total energy payments from one year to another, inclusive.
+
+        e.g. `year_from=year_of_retirement, year_to=year_of_death` differentiates `retirement_cost`.
+
+        Args:
+            house_kwh_m2a: House heating energy demand (kwh_m2a)
+            house_area_m2: House area (m2)
+            first_year: First year of energy payments
+            year_from: First year of the total
+            year_to: Last year of the total
+
+        Returns:
+            The derivatives with respect to the tariff and the CAGR.
+        """
+        if self.curve is not None:
+            raise ValueError("Derivatives are only available for a constant CAGR")
+        gradient = heating_cost_total_gradient(
+            tariff=self.tariff,
+            cagr_pcnt=self.cagr_pcnt,
+            annual_kwh=house_kwh_m2a * house_area_m2,
+            period_from=year_from - first_year,
+            period_to=year_to - first_year + 1,
+        )
+        return {name: float(value) for name, value in gradient.items()}
+
+
+def heating_cost_total(
+    tariff, cagr_pcnt, annual_kwh, period_from, period_to
+) -> np.ndarray:
+    """Compute the total energy payments from one period after the first year to another (exclusive).
+
+    Args:
+        tariff: The energy tariff in pounds.
+        cagr_pcnt: The compound annual growth rate of the tariff.
+        annual_kwh: The annual energy demand of the house.
+        period_from: Years from the first year of payments to the first year of the total.
+        period_to: Years from the first year of payments to the year after the last year of the total.
+
+    Returns:
+        The total payments, in pounds.
+    """
+    span = compound_sum(cagr_pcnt, period_to) - compound_sum(cagr_pcnt, period_from)
+    return annual_kwh * tariff * span
+
+
+def heating_cost_total_gradient(
+    tariff, cagr_pcnt, annual_kwh, period_from, period_to
+) -> Dict[str, np.ndarray]:
+    """Compute the derivatives of `heating_cost_total`.
+
+    Returns:
+        The derivatives with respect to the tariff and the CAGR.
+    """
+    span = compound_sum(cagr_pcnt, period_to) - compound_sum(cagr_pcnt, period_from)
+    span_derivative = compound_sum_derivative(
+        cagr_pcnt, period_to
+    ) - compound_sum_derivative(cagr_pcnt, period_from)
+    return {
+        "tariff": annual_kwh * span,
+        "cagr_pcnt": annual_kwh * tariff * span_derivative,
+    }
@@ -0,0 +1,76 @@
+"""A class that represents the heating system of a house.
+
+A heating system turns fuel into heat: a gas boiler at its efficiency, or a heat pump at its seasonal coefficient of
+performance (COP), so the fuel used is the house's heating demand divided by the system's efficiency. Tariffs and
+their growth for each fuel are set in the CONFIG file.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from pension_calculator import CONFIG
+
+FUELS = ("gas", "electricity")
+
+
+@dataclass(frozen=True, slots=True)
+class HeatingSystem:
+    """Represents a heating system.
+
+    Attributes:
+        name: The name of the system e.g. 'heat_pump'.
+        fuel: The fuel it uses, one of `FUELS`.
+        efficiency: The heat delivered per unit of fuel, e.g. '0.9' for a gas boiler or '3.0' for a heat pump.
+    """
+
+    name: str
+    fuel: str
+    efficiency: float
+
+    def __post_init__(self):
+        if self.fuel not in FUELS:
+            raise ValueError(f"Unknown fuel {self.fuel}, expected one of {FUELS}")
+        if self.efficiency <= 0:
+            raise ValueError("The efficiency of a heating system must be positive")
+
+    def annual_fuel_kwh(self, house_kwh_m2a: float, house_area_m2: float) -> float:
+        """Compute the fuel used to meet the heating demand of a house in a year, in kWh."""
+        return house_kwh_m2a * house_area_m2 / self.efficiency
+
+
+GAS_BOILER = HeatingSystem(name="gas_boiler", fuel="gas", efficiency=0.9)
+
+HEAT_PUMP = HeatingSystem(name="heat_pump", fuel="electricity", efficiency=3.0)
+
+
+def fuel_tariffs() -> Dict[str, float]:
+    """Return the tariff of each fuel from CONFIG file, in pounds per kWh."""
+    return {
+        fuel: CONFIG.get("basic").get(f"variable_unit_cost_{fuel}") for fuel in FUELS
+    }
+
+
+def fuel_use(
+    fuel_index, efficiency, heating_kwh_m2a, area_m2, ventilation_kwh_m2a=0.0
+) -> np.ndarray:
+    """Compute the annual use of each fuel by many heating systems.
+
+    Args:
+        fuel_index: The position in `FUELS` of the fuel of each system.
+        efficiency: The efficiency or seasonal COP of each system.
+        heating_kwh_m2a: The heating demand of each house.
+        area_m2: The area of each house.
+        ventilation_kwh_m2a: The electricity used by mechanical ventilation, e.g. in a passive house.
+
+    Returns:
+        The kWh of each fuel used by each system in a year, with shape (systems, fuels).
+    """
+    fuel_index = np.asarray(fuel_index)
+    heat = np.asarray(heating_kwh_m2a) * area_m2 / np.asarray(efficiency)
+    use = np.where(
+        np.arange(len(FUELS))[None, :] == fuel_index[..., None], heat[..., None], 0.0
+    )
+    use[..., FUELS.index("electricity")] += np.asarray(ventilation_kwh_m2a) * area_m2
+    return use
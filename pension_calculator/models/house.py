@@ -3,7 +3,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class House:
     """Represents a house with a purchase cost and annual heating requirements.
 
@@ -0,0 +1,85 @@
+"""A class that represents a life table.
+
+A life table gives the probability `qx` that a person of age x dies before reaching age x + 1, e.g. from the ONS
+national life tables. Everybody is assumed to die by the last age in the table.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True, slots=True)
+class LifeTable:
+    """Represents the probability of death at each age.
+
+    Attributes:
+        ages: Consecutive ages in years, from the first age in the table.
+        qx: The probability of dying at each age having reached it, from 0 to 1.
+    """
+
+    ages: np.ndarray
+    qx: np.ndarray
+
+    def __post_init__(self):
+        if len(self.ages) != len(self.qx) or not len(self.ages):
+            raise ValueError("A life table needs a probability of death at each age")
+        if np.any(np.diff(self.ages) != 1):
+            raise ValueError("The ages of a life table must be consecutive")
+        if np.any((self.qx < 0) | (self.qx > 1)):
+            raise ValueError("The probabilities of death must be from 0 to 1")
+
+    @classmethod
+    def from_csv(
+        cls, path: Union[str, Path], age_column: str = "age", qx_column: str = "qx"
+    ) -> "LifeTable":
+        """Load a life table from a CSV file with a row per age.
+
+        Args:
+            path: The CSV file.
+            age_column: The column of ages.
+            qx_column: The column of probabilities of death.
+
+        Returns:
+            The life table.
+        """
+        df = pd.read_csv(path).sort_values(age_column)
+        return cls(
+            ages=df[age_column].to_numpy(dtype=int),
+            qx=df[qx_column].to_numpy(dtype=float),
+        )
+
+    @property
+    def lx(self) -> np.ndarray:
+        """The probability of reaching each age from the first age in the table."""
+        qx = self.qx.copy()
+        qx[-1] = 1.0
+        return np.concatenate([[1.0], np.cumprod(1 - qx)[:-1]])
+
+    def survival(self, from_age, ages: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compute the probability of reaching each age, having reached `from_age`.
+
+        Args:
+            from_age: The age reached, a scalar or an array of shape (n,).
+            ages: The ages to reach (default the ages of the table).
+
+        Returns:
+            An array of shape (n, ages), one before `from_age` and zero beyond the table.
+        """
+        ages = self.ages if ages is None else np.asarray(ages)
+        from_age = np.atleast_1d(np.asarray(from_age))[:, None]
+        lx = np.concatenate([self.lx, [0.0]])
+        index = np.clip(ages - self.ages[0], 0, len(self.ages))[None, :]
+        start = np.clip(from_age - self.ages[0], 0, len(self.ages) - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            survival = lx[index] / lx[start]
+        return np.where(ages[None, :] <= from_age, 1.0, np.nan_to_num(survival))
+
+    def life_expectancy(self, from_age) -> np.ndarray:
+        """Compute the expected age of death having reached `from_age`, counting the year of death in full."""
+        from_age = np.atleast_1d(np.asarray(from_age))
+        reached = self.survival(from_age) * (self.ages[None, :] >= from_age[:, None])
+        return from_age + reached.sum(axis=1) - 1
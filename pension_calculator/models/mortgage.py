@@ -5,17 +5,20 @@ Classes:
 
 Functions:
     compute_loan_amount: Compute the loan amount, given a purchase price and deposit.
+    mortgage_total: Compute the total payments of mortgages in closed form.
+    mortgage_total_gradient: Compute the derivatives of the total payments of mortgages.
 """
 
 from dataclasses import dataclass
 from math import isclose
+from typing import Dict
 
 import numpy as np
 import numpy_financial as npf
 import pandas as pd
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Mortgage:
     """A mortgage.
 
@@ -98,6 +101,23 @@ class Mortgage:
         """Return the final payment year."""
         return self.purchase_year + self.length_years - 1
 
+    def total_payments_gradient(self) -> Dict[str, float]:
+        """Compute the derivatives of the total payments.
+
+        Returns:
+            The derivatives with respect to the purchase price, deposit, interest rate, and length.
+        """
+        loan_amount = compute_loan_amount(self.purchase_price, self.deposit_pcnt)
+        gradient = mortgage_total_gradient(
+            loan_amount, self.interest_rate_pcnt, self.length_years
+        )
+        return {
+            "purchase_price": float(gradient["loan"] * (1 - self.deposit_pcnt)),
+            "deposit_pcnt": float(-gradient["loan"] * self.purchase_price),
+            "interest_rate_pcnt": float(gradient["interest_rate_pcnt"]),
+            "length_years": float(gradient["length_years"]),
+        }
+
 
 def compute_loan_amount(purchase_price: float, deposit_percent: float) -> float:
     """Compute the loan amount, given a purchase price and deposit.
@@ -111,3 +131,56 @@ def compute_loan_amount(purchase_price: float, deposit_percent: float) -> float:
     """
 
     return purchase_price * (1 - deposit_percent)
+
+
+def _monthly_payment(loan, rate, n_months):
+    """Return the level monthly payment, and its derivatives with respect to the monthly rate and number of months."""
+    loan, rate = np.asarray(loan, dtype=float), np.asarray(rate, dtype=float)
+    n_months = np.asarray(n_months, dtype=float)
+    discount = np.exp(-n_months * np.log1p(rate))
+    annuity = -np.expm1(-n_months * np.log1p(rate))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = loan * rate / annuity
+        d_rate = loan / annuity - loan * rate * n_months * discount / (
+            (1 + rate) * annuity**2
+        )
+        d_months = -loan * rate * discount * np.log1p(rate) / annuity**2
+    payment = np.where(rate == 0, loan / n_months, payment)
+    d_rate = np.where(rate == 0, loan * (n_months + 1) / (2 * n_months), d_rate)
+    d_months = np.where(rate == 0, -loan / n_months**2, d_months)
+    return payment, d_rate, d_months
+
+
+def mortgage_total(loan, interest_rate_pcnt, length_years) -> np.ndarray:
+    """Compute the total payments of mortgages, compounded monthly.
+
+    Args:
+        loan: The loan amount, in pounds.
+        interest_rate_pcnt: The annual interest rate e.g. '0.05'.
+        length_years: The length of the mortgage, in years.
+
+    Returns:
+        The total payments, in pounds.
+    """
+    payment, _, _ = _monthly_payment(loan, interest_rate_pcnt / 12, length_years * 12)
+    return 12 * length_years * payment
+
+
+def mortgage_total_gradient(
+    loan, interest_rate_pcnt, length_years
+) -> Dict[str, np.ndarray]:
+    """Compute the derivatives of `mortgage_total`.
+
+    The length is treated as continuous, so its derivative is the rate of change between whole years.
+
+    Returns:
+        The derivatives with respect to the loan, interest rate, and length.
+    """
+    payment, d_rate, d_months = _monthly_payment(
+        loan, interest_rate_pcnt / 12, length_years * 12
+    )
+    return {
+        "loan": 12 * length_years * payment / loan,
+        "interest_rate_pcnt": length_years * d_rate,
+        "length_years": 12 * payment + 144 * length_years * d_months,
+    }
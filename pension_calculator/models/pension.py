@@ -1,14 +1,18 @@
-"""A class that represents a pension."""
+"""A class that represents a pension.
+
+The module functions compute the pension's totals and their derivatives in closed form. They are vectorised, so they
+accept arrays of parameters as well as scalars.
+"""
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 
 import numpy as np
 import numpy_financial as npf
 import pandas as pd
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Pension:
     """Represents a pension.
 
@@ -53,3 +57,71 @@ class Pension:
     def annual_payment(self) -> float:
         """Compute the annual payment amount."""
         return self.annual_payments().iloc[0]
+
+    def total_payments_gradient(self) -> Dict[str, float]:
+        """Compute the derivatives of the total of the annual payments.
+
+        Returns:
+            The derivatives with respect to the target and the growth rate.
+        """
+        gradient = pension_total_gradient(
+            self.target, self.growth_rate_pcnt, self.end_year - self.start_year
+        )
+        return {name: float(value) for name, value in gradient.items()}
+
+
+def compound_sum(rate, periods) -> np.ndarray:
+    """Return the sum of (1 + rate) ** k for k from 0 to periods - 1, i.e. the future value of an annuity of 1.
+
+    Args:
+        rate: The growth rate per period e.g. '0.01'.
+        periods: The number of periods.
+
+    Returns:
+        ((1 + rate) ** periods - 1) / rate, or periods where the rate is zero.
+    """
+    rate, periods = np.asarray(rate, dtype=float), np.asarray(periods, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.expm1(periods * np.log1p(rate)) / rate
+    return np.where(rate == 0, periods, value)
+
+
+def compound_sum_derivative(rate, periods) -> np.ndarray:
+    """Return the derivative of `compound_sum` with respect to the rate."""
+    rate, periods = np.asarray(rate, dtype=float), np.asarray(periods, dtype=float)
+    growth = np.exp(periods * np.log1p(rate))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = (periods * growth * rate / (1 + rate) - (growth - 1)) / rate**2
+    return np.where(rate == 0, periods * (periods - 1) / 2, value)
+
+
+def pension_total(target, growth_rate_pcnt, duration_years) -> np.ndarray:
+    """Compute the total of the annual payments of pensions.
+
+    Args:
+        target: The target amount the pension must reach, in pounds.
+        growth_rate_pcnt: The growth rate e.g. '0.01'.
+        duration_years: The number of years of saving.
+
+    Returns:
+        The total payments, in pounds.
+    """
+    return target * duration_years / compound_sum(growth_rate_pcnt, duration_years)
+
+
+def pension_total_gradient(
+    target, growth_rate_pcnt, duration_years
+) -> Dict[str, np.ndarray]:
+    """Compute the derivatives of `pension_total`.
+
+    Returns:
+        The derivatives with respect to the target and the growth rate.
+    """
+    factor = compound_sum(growth_rate_pcnt, duration_years)
+    return {
+        "target": duration_years / factor,
+        "growth_rate_pcnt": -target
+        * duration_years
+        * compound_sum_derivative(growth_rate_pcnt, duration_years)
+        / factor**2,
+    }
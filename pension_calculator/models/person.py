@@ -8,7 +8,7 @@ pension_age = CONFIG.get("basic").get("pension_age")
 life_expectancy = CONFIG.get("basic").get("life_expectancy")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Person:
     """Represents a person and dates of birth, retirement, and death.
 
@@ -0,0 +1,156 @@
+"""A class that represents year by year growth of an energy tariff.
+
+A tariff curve replaces the constant CAGR of `Energy` with a growth rate per year, e.g. from piecewise segments or a
+forecast of the tariff of each fuel. Beyond the years of the curve, its first and last rates continue.
+
+The growth from one year to another is the product of the growth factors between them, computed from the cumulative
+sum of the log growth factors, so payments for many scenarios are computed from one curve without copying it.
+
+The rates are stored as a tuple, so that curves, and the `Energy` that holds them, are hashable and compare by value.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from pension_calculator import CONFIG
+
+
+@dataclass(frozen=True, slots=True)
+class TariffCurve:
+    """Represents the growth of an energy tariff year by year.
+
+    Attributes:
+        first_year: The first year of the curve.
+        rates: The growth rate of the tariff into each year from the year before, from the first year e.g. '0.05'.
+    """
+
+    first_year: int
+    rates: Tuple[float, ...]
+
+    def __post_init__(self):
+        rates = np.asarray(self.rates, dtype=float)
+        if rates.ndim != 1 or not len(rates):
+            raise ValueError("A tariff curve needs a growth rate for at least one year")
+        if np.any(rates <= -1):
+            raise ValueError("Growth rates must be greater than -100%")
+        object.__setattr__(self, "first_year", int(self.first_year))
+        object.__setattr__(self, "rates", tuple(rates.tolist()))
+
+    @classmethod
+    def constant(cls, cagr_pcnt: float, first_year: int = 0) -> "TariffCurve":
+        """Create a curve with the same growth rate every year."""
+        return cls(first_year=first_year, rates=np.array([cagr_pcnt]))
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[Tuple[int, float]]) -> "TariffCurve":
+        """Create a piecewise constant curve.
+
+        Args:
+            segments: The first year and growth rate of each segment, in order of year. Each rate applies until the
+                next segment starts, and the last one indefinitely.
+
+        Returns:
+            The tariff curve.
+        """
+        years = [year for year, _ in segments]
+        if not years or np.any(np.diff(years) <= 0):
+            raise ValueError("Segments must start in increasing years")
+        lengths = np.diff(years + [years[-1] + 1])
+        return cls(
+            first_year=years[0],
+            rates=np.repeat([rate for _, rate in segments], lengths),
+        )
+
+    @classmethod
+    def from_tariffs(
+        cls, years: Sequence[int], tariffs: Sequence[float]
+    ) -> "TariffCurve":
+        """Create a curve from a forecast of the tariff in consecutive years.
+
+        Args:
+            years: The consecutive years of the forecast.
+            tariffs: The forecast tariff in each year, in pounds.
+
+        Returns:
+            The curve of growth between the forecast tariffs.
+        """
+        years, tariffs = np.asarray(years), np.asarray(tariffs, dtype=float)
+        if len(years) < 2 or np.any(np.diff(years) != 1):
+            raise ValueError(
+                "A forecast needs tariffs for two or more consecutive years"
+            )
+        return cls(first_year=int(years[1]), rates=tariffs[1:] / tariffs[:-1] - 1)
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: Union[str, Path],
+        fuel: str,
+        year_column: str = "year",
+        fuel_column: str = "fuel",
+        tariff_column: str = "tariff",
+    ) -> "TariffCurve":
+        """Load the forecast tariffs of one fuel from a CSV file with a row per fuel and year.
+
+        Args:
+            path: The CSV file.
+            fuel: The fuel e.g. 'gas'.
+            year_column: The column of years.
+            fuel_column: The column of fuels.
+            tariff_column: The column of tariffs, in pounds.
+
+        Returns:
+            The curve of growth between the forecast tariffs.
+        """
+        df = pd.read_csv(path)
+        df = df[df[fuel_column] == fuel].sort_values(year_column)
+        if df.empty:
+            raise ValueError(f"No tariffs for {fuel} in {path}")
+        return cls.from_tariffs(df[year_column], df[tariff_column])
+
+    @classmethod
+    def from_config(cls, fuel: str) -> "TariffCurve":
+        """Create the curve of a fuel from CONFIG file.
+
+        The segments of `[tariff_curves.<fuel>]` are used if present, otherwise the fuel's constant rate in `[CAGR]`.
+        """
+        segments = CONFIG.get("tariff_curves", {}).get(fuel, {}).get("segments")
+        if segments:
+            return cls.from_segments([(int(year), rate) for year, rate in segments])
+        return cls.constant(CONFIG.get("CAGR")[fuel])
+
+    @property
+    def last_year(self) -> int:
+        """The last year of the curve."""
+        return self.first_year + len(self.rates) - 1
+
+    def _cumulative_log_growth(self, years: np.ndarray) -> np.ndarray:
+        """Return the log of the growth from the year before the curve to each year."""
+        logs = np.log1p(np.asarray(self.rates))
+        cumulative = np.concatenate([[0.0], np.cumsum(logs)])
+        offset = years - (self.first_year - 1)
+        inside = np.clip(offset, 0, len(self.rates))
+        return (
+            cumulative[inside]
+            + np.minimum(offset, 0) * logs[0]
+            + np.maximum(offset - len(self.rates), 0) * logs[-1]
+        )
+
+    def growth_factors(self, from_year, years) -> np.ndarray:
+        """Compute the growth of the tariff from one year to others.
+
+        Args:
+            from_year: The years to grow from, e.g. purchase years of shape (n, 1).
+            years: The years to grow to, broadcast against `from_year`.
+
+        Returns:
+            The tariff in each year as a multiple of the tariff in `from_year`.
+        """
+        from_year, years = np.asarray(from_year), np.asarray(years)
+        return np.exp(
+            self._cumulative_log_growth(years) - self._cumulative_log_growth(from_year)
+        )
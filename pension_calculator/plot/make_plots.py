@@ -8,6 +8,7 @@ from pension_calculator.plot.plot_relative_energy_cost_4_panel import (
 from pension_calculator.plot.plot_relative_energy_cost_single import (
     plot as relative_energy_cost_single,
 )
+from pension_calculator.plot.plot_tornado import plot as plot_tornado
 
 
 def main():
@@ -15,6 +16,7 @@ def main():
     plot_payment_schedule_explainer()
     relative_energy_cost_4_panel()
     relative_energy_cost_single()
+    plot_tornado()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 """Generates a plot that explains how the mortgage, heating and pension costs are built up."""
+
 import matplotlib
 import matplotlib.pyplot as plt
 
 from pension_calculator.compute.compute_payment_schedule import compute_payment_schedule
+from pension_calculator.models.drawdown import drawdown
 from pension_calculator.plot.helpers import (
     annotate_copyright,
     annotate_subtitle,
@@ -23,23 +25,24 @@ def plot():
     average_df = compute_payment_schedule(average)
     passive_df = compute_payment_schedule(passive)
 
-    # Compute pension draw down from retirement to death.
+    # Compute pension draw down from retirement to death, withdrawing the heating cost each year.
 
-    pension_final_value_average = average_df["pension_value"].loc[
-        average.person.yor - 1
+    pension_final_value_average = average_df.loc[
+        average.person.yor - 1, "pension_value"
     ]
-    pension_final_value_passive = passive_df["pension_value"].loc[
-        average.person.yor - 1
+    pension_final_value_passive = passive_df.loc[
+        average.person.yor - 1, "pension_value"
     ]
 
-    average_df["pension_value"].loc[average.person.yor : average.person.yod] = (
-        pension_final_value_average
-        - average_df["heating"].loc[average.person.yor : average.person.yod].cumsum()
-    )
-    passive_df["pension_value"].loc[average.person.yor : average.person.yod] = (
-        pension_final_value_passive
-        - passive_df["heating"].loc[average.person.yor : average.person.yod].cumsum()
-    )
+    retirement = slice(average.person.yor, average.person.yod)
+    for df, final_value in (
+        (average_df, pension_final_value_average),
+        (passive_df, pension_final_value_passive),
+    ):
+        heating = df.loc[retirement, "heating"].to_numpy()
+        df.loc[retirement, "pension_value"] = drawdown(
+            "schedule", final_value, 0.0, len(heating), schedule=heating[None, :]
+        ).values[0]
 
     # Initialise a four panel figure.
 
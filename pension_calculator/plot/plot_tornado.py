@@ -0,0 +1,80 @@
+"""Generate a tornado chart of the sensitivity of a passive house's net saving to each scenario input.
+
+Each bar spans the net saving as one input moves from its low to its high value, with every other input at its value
+in `plot/scenario.py`. Inputs are ranked by the width of their bar.
+"""
+
+from matplotlib import pyplot as plt
+
+from pension_calculator.compute.tornado import tornado
+from pension_calculator.plot.helpers import (
+    annotate_copyright,
+    annotate_subtitle,
+    currency,
+    make_outfile_name,
+)
+from pension_calculator.plot.scenario import passive
+
+
+def plot():
+    """Plot a tornado chart of net saving."""
+
+    df = tornado().iloc[::-1]
+    base = df.attrs["base"]
+
+    fig, ax = plt.subplots()
+    width_inches = 10
+    height_inches = width_inches * 9 / 16
+    fig.set_size_inches(width_inches, height_inches)
+    fig.suptitle(
+        "Sensitivity of the net saving of a Passive house to each input",
+        x=0.45,
+        fontsize=12,
+        fontweight="bold",
+    )
+
+    rows = range(len(df))
+    ax.barh(
+        rows,
+        df["net_saving_low"] - base,
+        left=base,
+        color="tab:red",
+        label="low",
+    )
+    ax.barh(
+        rows,
+        df["net_saving_high"] - base,
+        left=base,
+        color="tab:green",
+        label="high",
+    )
+    ax.axvline(base, color="black", linewidth=0.5)
+    ax.set_yticks(
+        list(rows),
+        [f"{name} ({row.low:g} - {row.high:g})" for name, row in df.iterrows()],
+    )
+    ax.xaxis.set_major_formatter(currency)
+    ax.set_xlabel("Net saving")
+    ax.legend(title="Input value", loc="lower right")
+    plt.grid(
+        visible=True,
+        which="major",
+        axis="x",
+        color="grey",
+        linestyle="-",
+        linewidth=0.5,
+    )
+    plt.tight_layout()
+
+    subtitle_text = f"Born: {passive.person.yob}, Base net saving: £{base / 1000:1.0f}K"
+    annotate_subtitle(ax, subtitle_text)
+    annotate_copyright(ax)
+
+    outfile = make_outfile_name("tornado", passive.person.yob)
+    plt.savefig(outfile)
+    plt.show()
+    print(f"\nSaved file to {outfile}")
+
+
+if __name__ == "__main__":
+    plot()
@@ -3,45 +3,53 @@ payment_schedule.py
 
 Python script to visualise payment schedules.
 
+The schedules are looked up in a surface precomputed over the tariff and CAGR sliders' range, see
+`pension_calculator.compute.surface`.
+
 streamlit run /Users/richardlyon/Documents/Version\ Controlled/pension-calculator/pension_calculator/web/payment_schedule.py
 
 
 """
+
 import pandas as pd
 import streamlit as st
 import altair as alt
 
-from pension_calculator import CONFIG
-from pension_calculator.compute.compute_payment_schedule import (
-    ScenarioParams,
-    compute_payment_schedule,
+from pension_calculator.compute.surface import (
+    PaymentSurface,
+    build_payment_surface,
+    config_axis,
 )
+from pension_calculator.plot.scenario import average, passive
 
-from pension_calculator.plot.scenario import (
-    average_params,
-    passive_params,
-)
 
-YOB = 1997
-YOD = YOB + CONFIG.get("basic").get("life_expectancy")
-YOR = YOB + CONFIG.get("basic").get("pension_age") - 1
-HOUSE_PURCHASE_YEAR = 2022
-HOUSE_PURCHASE_COST = 160000
-HOUSE_AREA_M2 = 100
-MORTGAGE_DEPOSIT_PERCENT = 0.1
-MORTGAGE_INTEREST_RATE = 0.0425
-MORTGAGE_LENGTH_YEARS = 40
-PENSION_GROWTH_RATE = 0.01
+@st.experimental_singleton
+def payment_surface() -> PaymentSurface:
+    """Build the surface once per server, and share it between sessions."""
+    return build_payment_surface({"average": average, "passive": passive})
+
+
+surface = payment_surface()
+tariffs, cagrs = config_axis("tariff"), config_axis("cagr")
+
 ENERGY_TARIFF = st.slider(
-    "Energy Tariff (£/kWh)", value=0.05, min_value=0.01, max_value=0.5, step=0.01
+    "Energy Tariff (£/kWh)",
+    value=0.05,
+    min_value=float(tariffs[0]),
+    max_value=float(tariffs[-1]),
+    step=float(tariffs[1] - tariffs[0]),
 )
 ENERGY_CAGR = st.slider(
-    "Energy CAGR (%)", value=0.05, min_value=0.0, max_value=1.0, step=0.01
+    "Energy CAGR (%)",
+    value=0.05,
+    min_value=float(cagrs[0]),
+    max_value=float(cagrs[-1]),
+    step=float(cagrs[1] - cagrs[0]),
 )
 
 
-average_df = compute_payment_schedule(average_params)
-passive_df = compute_payment_schedule(passive_params)
+average_df = surface.schedule("average", ENERGY_TARIFF, ENERGY_CAGR)
+passive_df = surface.schedule("passive", ENERGY_TARIFF, ENERGY_CAGR)
 delta_df = passive_df - average_df
 
 mortgage_total = -delta_df["mortgage"].sum()
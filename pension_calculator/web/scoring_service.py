@@ -0,0 +1,355 @@
+"""
+scoring_service.py
+
+A local HTTP service that scores scenarios: POST a scenario as JSON, and get back its payment schedule or totals.
+
+Concurrent requests are collected into micro-batches, up to a maximum size or a maximum wait after the first request
+of a batch, and each batch is evaluated by one call to the vectorised kernels. Scenarios are validated as in
+`compute_payment_schedule`, and an infeasible scenario is answered with a 422 and the constraints it breaks.
+
+    python -m pension_calculator.web.scoring_service --port 8080
+
+    POST /totals    {"yob": 1997, "purchase_year": 2022, ..., "tariff": 0.1, "cagr_pcnt": 0.05}
+    POST /schedule  (the same)
+
+A scenario has the fields of `ScenarioBatch`. The pension and mortgage years, and the mortgage's price, may be omitted,
+see `DERIVED_FIELDS`.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pension_calculator.compute.kernels import LIFE_EXPECTANCY, PENSION_AGE, STREAMS
+from pension_calculator.compute.scenario_batch import (
+    SCENARIO_FIELDS,
+    ScenarioBatch,
+    field_dtype,
+)
+from pension_calculator.compute.scenario_space import DERIVED_FIELDS
+from pension_calculator.compute.sweep import compute_chunk
+from pension_calculator.compute.validation import Infeasible
+
+logger = logging.getLogger(__name__)
+
+ROUTES = ("/schedule", "/totals")
+
+# Years are bounded so that the year axis of any batch fits the int16 year offsets of the kernels.
+YEAR_FIELDS = (
+    "yob",
+    "purchase_year",
+    "mortgage_purchase_year",
+    "pension_start_year",
+    "pension_end_year",
+)
+MIN_YEAR, MAX_YEAR = 1900, 2200
+MAX_LENGTH_YEARS = 100
+
+# The largest request body accepted, in bytes.
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BadRequest(ValueError):
+    """A request that cannot be scored."""
+
+
+def parse_scenario(payload: Any) -> Dict[str, float]:
+    """Check a scenario's JSON, and fill in the pension and mortgage fields that are omitted.
+
+    Values must be finite, and years from `MIN_YEAR` to `MAX_YEAR`, so that no request can overflow the kernels.
+    """
+    if not isinstance(payload, dict):
+        raise BadRequest("A scenario must be a JSON object")
+    unknown = set(payload) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise BadRequest(f"Unknown scenario parameters: {sorted(unknown)}")
+    missing = set(SCENARIO_FIELDS) - set(payload) - set(DERIVED_FIELDS)
+    if missing:
+        raise BadRequest(f"No value for scenario parameters: {sorted(missing)}")
+
+    scenario = {}
+    for name, value in payload.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise BadRequest(f"{name} must be a number")
+        if not math.isfinite(value):
+            raise BadRequest(f"{name} must be finite")
+        if np.dtype(field_dtype(name)).kind == "i" and value != int(value):
+            raise BadRequest(f"{name} must be a whole number")
+        if name in YEAR_FIELDS and not MIN_YEAR <= value <= MAX_YEAR:
+            raise BadRequest(f"{name} must be from {MIN_YEAR} to {MAX_YEAR}")
+        if name == "length_years" and not 0 <= value <= MAX_LENGTH_YEARS:
+            raise BadRequest(f"{name} must be from 0 to {MAX_LENGTH_YEARS}")
+        scenario[name] = value
+    scenario.setdefault("pension_start_year", scenario["purchase_year"])
+    scenario.setdefault("pension_end_year", scenario["yob"] + PENSION_AGE)
+    scenario.setdefault("mortgage_purchase_year", scenario["purchase_year"])
+    scenario.setdefault("mortgage_purchase_price", np.nan)
+    return scenario
+
+
+def score_batch(
+    scenarios: Sequence[Dict[str, float]], outputs: Sequence[str]
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Evaluate many scenarios with one vectorised call.
+
+    Parameters
+    ----------
+    scenarios The scenarios, as returned by `parse_scenario`
+    outputs The output of each scenario, "/schedule" or "/totals"
+
+    Returns
+    -------
+    The HTTP status and JSON response of each scenario.
+
+    """
+    batch = ScenarioBatch.from_columns(
+        {name: [s[name] for s in scenarios] for name in SCENARIO_FIELDS}
+    )
+    chunk = compute_chunk(batch)
+    totals = chunk.totals().to_numpy()
+    years = chunk.years
+
+    responses = []
+    for i, output in enumerate(outputs):
+        if chunk.reasons[i]:
+            reasons = [r.name for r in Infeasible if chunk.reasons[i] & r]
+            responses.append((HTTPStatus.UNPROCESSABLE_ENTITY, {"infeasible": reasons}))
+        elif output == "/totals":
+            responses.append((HTTPStatus.OK, dict(zip(STREAMS, totals[i].tolist()))))
+        else:
+            # The schedule runs from the purchase year to the year of death, as in `compute_payment_schedule`.
+            in_schedule = (years >= batch.purchase_year[i]) & (
+                years <= batch.yob[i] + LIFE_EXPECTANCY
+            )
+            schedule = {"year": years[in_schedule].tolist()}
+            for s, stream in enumerate(STREAMS):
+                schedule[stream] = chunk.schedules[i, in_schedule, s].tolist()
+            responses.append((HTTPStatus.OK, schedule))
+    return responses
+
+
+@dataclass
+class _Pending:
+    scenario: Dict[str, float]
+    output: str
+    future: asyncio.Future
+
+
+class MicroBatcher:
+    """Collect concurrent requests into batches, and evaluate each batch with one call.
+
+    A batch is evaluated once it holds `max_batch_size` requests, or `max_wait_s` after its first request arrived,
+    whichever is sooner. Evaluation runs in a thread, so the event loop keeps accepting requests meanwhile.
+
+    Args:
+        evaluate: Scores a batch, as `score_batch`.
+        max_batch_size: The most requests in a batch.
+        max_wait_s: The longest a request waits for others to join its batch.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[
+            [Sequence[Dict[str, float]], Sequence[str]], List[Tuple[int, Any]]
+        ] = score_batch,
+        max_batch_size: int = 256,
+        max_wait_s: float = 0.005,
+    ):
+        self.evaluate = evaluate
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_s
+        self.batch_sizes: List[int] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "MicroBatcher":
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def score(self, scenario: Dict[str, float], output: str) -> Tuple[int, Any]:
+        """Queue a scenario, and wait for the response from its batch."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Pending(scenario, output, future))
+        return await future
+
+    async def _next_batch(self) -> List[_Pending]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.batch_sizes.append(len(batch))
+            try:
+                responses = await loop.run_in_executor(
+                    None,
+                    self.evaluate,
+                    [p.scenario for p in batch],
+                    [p.output for p in batch],
+                )
+            except Exception as e:
+                for p in batch:
+                    if not p.future.done():
+                        p.future.set_exception(e)
+                continue
+            for p, response in zip(batch, responses):
+                if not p.future.done():
+                    p.future.set_result(response)
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Read one HTTP/1.1 request, or return None when the client closes the connection."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise BadRequest(f"Request bodies are limited to {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length)
+    return method, path, headers, body
+
+
+def _response(status: int, body: Any, keep_alive: bool) -> bytes:
+    payload = json.dumps(body).encode()
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + payload
+
+
+class ScoringService:
+    """An HTTP server answering scenario requests through a `MicroBatcher`.
+
+    Args:
+        batcher: Collects and evaluates the requests.
+        host: The interface to listen on.
+        port: The port to listen on. Port 0 picks a free port, see `port` once started.
+    """
+
+    def __init__(self, batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 0):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def __aenter__(self) -> "ScoringService":
+        await self.batcher.__aenter__()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.__aexit__(*exc)
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def _respond(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if path not in ROUTES:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+        try:
+            scenario = parse_scenario(json.loads(body))
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        return await self.batcher.score(scenario, path)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    writer.write(
+                        _response(HTTPStatus.BAD_REQUEST, {"error": str(e)}, False)
+                    )
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, response = await self._respond(method, path, body)
+                except Exception as e:
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        "error": str(e)
+                    }
+                writer.write(_response(status, response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_batch_size: int = 256,
+    max_wait_s: float = 0.005,
+) -> None:
+    """Run the scoring service until cancelled."""
+    batcher = MicroBatcher(max_batch_size=max_batch_size, max_wait_s=max_wait_s)
+    async with ScoringService(batcher, host, port) as service:
+        logger.info("Scoring scenarios on http://%s:%d", host, service.port)
+        await service.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        serve(args.host, args.port, args.max_batch_size, args.max_wait_ms / 1000)
+    )
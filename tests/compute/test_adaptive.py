@@ -0,0 +1,60 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.adaptive import refine
+from pension_calculator.compute.comparison import net_saving_function
+from pension_calculator.plot.scenario import average, passive
+
+
+def test_refine_bilinear_surface():
+    # given a surface that bilinear interpolation reproduces exactly
+    def evaluate(x, y):
+        return 1 + x * y
+
+    # when I refine it
+    mesh = refine(evaluate, (0, 1), (0, 2), initial=(2, 2), tolerance=1e-9, rtol=0)
+
+    # then no cell is split
+    assert len(mesh.cells) == 4
+    assert mesh(0.3, 1.7) == approx(1 + 0.3 * 1.7)
+
+
+def test_refine_net_saving():
+    # given the net saving of a passive house over tariff and CAGR
+    net_saving = net_saving_function(passive, average, ("tariff", "cagr_pcnt"))
+    x, y = np.meshgrid(np.linspace(0.01, 0.21, 129), np.linspace(0, 0.1, 129))
+    x, y = x.ravel(), y.ravel()
+
+    # when I refine it to the resolution of a 129 x 129 grid
+    mesh = refine(net_saving, (0.01, 0.21), (0, 0.1), max_depth=5)
+
+    # then it takes far fewer evaluations, resolves the break-even, and is accurate to within the tolerance
+    expected = net_saving(x, y)
+    interpolated = mesh(x, y)
+    assert mesh.n_evaluations < len(x) / 4
+    assert (expected < 0).any() and (expected > 0).any()
+    assert np.array_equal(np.sign(interpolated), np.sign(expected))
+    large = np.abs(expected) > 1e5
+    assert np.abs(interpolated / expected - 1)[large].max() < 0.02
+
+
+def test_locate_matches_leaf_bounds():
+    # given a mesh refined around a circle
+    def evaluate(x, y):
+        return x**2 + y**2 - 0.5
+
+    mesh = refine(evaluate, (-1, 1), (-1, 1), initial=(3, 2), tolerance=1e-3, rtol=0)
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-1.2, 1.2, (2, 1000))
+
+    # when I locate points, some outside the mesh
+    leaf = mesh.locate(x, y)
+
+    # then each point inside lies within its leaf, and the others are outside
+    inside = (np.abs(x) <= 1) & (np.abs(y) <= 1)
+    assert np.array_equal(leaf >= 0, inside)
+    x0, x1, y0, y1 = mesh.cells[leaf[inside]].T
+    assert np.all((x0 <= x[inside]) & (x[inside] <= x1))
+    assert np.all((y0 <= y[inside]) & (y[inside] <= y1))
+    assert np.isnan(mesh(x, y)[~inside]).all()
+    assert len(mesh.cells) > 6
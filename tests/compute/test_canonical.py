@@ -0,0 +1,46 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.canonical import deduplicate
+from pension_calculator.compute.metrics import SweepMetrics
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import run_sweep
+
+
+def test_deduplicate_near_duplicates(scenario_params):
+    # given the same scenario; a cheaper house with a smaller deposit and the same loan; a larger, better insulated
+    # house with the same heating cost; and a different tariff
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 4)
+    batch = batch.replace(
+        purchase_cost=[350000 / 1.1] * 2 + [350000 / 1.1 * 0.9] + [350000 / 1.1],
+        deposit_pcnt=[0.1, 0.1, 0.0, 0.1],
+        area_m2=[100, 100, 100, 200],
+        annual_heating_kwh_m2a=[100, 100, 100, 50],
+    )
+    batch = ScenarioBatch.concat([batch, batch[0].replace(tariff=0.2)])
+
+    # when I deduplicate them
+    result = deduplicate(batch)
+
+    # then only the scenario with the different tariff is distinct
+    assert len(result.unique) == 2
+    assert result.inverse.tolist() == [0, 0, 0, 0, 1]
+    assert result.duplicates == 3
+
+
+def test_sweep_deduplicate(scenario_params):
+    # given a sweep in which every scenario appears three times, and one is infeasible
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 4).replace(
+        tariff=[0.05, 0.1, 0.2, 0.1], yob=[1997, 1997, 1997, 1974]
+    )
+    scenarios = batch.to_scenarios() * 3
+    metrics = SweepMetrics(total=len(scenarios))
+
+    # when I run it with and without deduplication
+    expected = run_sweep(scenarios, chunk_size=6)
+    totals = run_sweep(scenarios, chunk_size=6, deduplicate=True, metrics=metrics)
+
+    # then the results are identical, and the skipped scenarios are counted as cache hits
+    np.testing.assert_array_equal(totals.to_numpy(), expected.to_numpy())
+    assert totals["mortgage"].iloc[1] == approx(468141, abs=1)
+    assert metrics.snapshot().cache_hit_rate == approx(3 / 9)
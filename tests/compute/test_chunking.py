@@ -0,0 +1,75 @@
+from pytest import approx
+
+from pension_calculator import CONFIG, CURRENT_YEAR
+from pension_calculator.compute.chunking import (
+    choose_chunk_size,
+    estimate_bytes_per_scenario,
+    year_span,
+)
+from pension_calculator.compute.compute_heating_cost_sensitivities import (
+    compute_heating_cost_sensitivities,
+)
+from pension_calculator.compute.metrics import SweepMetrics
+from pension_calculator.compute.sweep import STREAMS, iter_sweep
+from pension_calculator.models import Energy, Person
+
+
+def test_year_span(scenario_params):
+    # given a scenario purchased in 2022 by a person who dies in 2084
+    # then the schedule spans 63 years
+    assert year_span([scenario_params]) == 63
+
+
+def test_chunk_size_fits_budget():
+    # given a scenario needing 8KB
+    bytes_per_scenario = estimate_bytes_per_scenario(64, 4)
+    assert bytes_per_scenario == 64 * 4 * 8 * 4
+
+    # when I choose a chunk size for a 1MB budget with two chunks in flight
+    chunk_size = choose_chunk_size(bytes_per_scenario, 2 ** 20, chunks_in_flight=2)
+
+    # then both chunks fit
+    assert chunk_size == 64
+    assert choose_chunk_size(bytes_per_scenario, 1) == 1
+
+
+def test_iter_sweep_respects_budget(scenario_params):
+    # given a budget for 400 scenarios per chunk, with two chunks in flight
+    scenarios = [scenario_params] * 1000
+    allotment = 400 * estimate_bytes_per_scenario(63, len(STREAMS))
+    budget = 2 * allotment
+    metrics = SweepMetrics(total=1000)
+
+    # when I sweep
+    chunks = list(
+        iter_sweep(
+            scenarios, memory_budget_bytes=budget, metrics=metrics, trace_memory=True
+        )
+    )
+
+    # then the scenarios are chunked to fit, and the traced peak of each chunk is within its allotment
+    assert [len(chunk) for chunk in chunks] == [400, 400, 200]
+    assert chunks[0].schedules.shape == (400, 63, len(STREAMS))
+    assert max(chunk.peak_bytes for chunk in chunks) <= allotment
+    assert metrics.snapshot().peak_bytes >= chunks[0].peak_bytes
+
+
+def test_sensitivities_respect_budget():
+    # given a person
+    person = Person(yob=1970)
+
+    # when I compute the sensitivities with a budget for one growth rate at a time
+    budgeted = compute_heating_cost_sensitivities(person, memory_budget_bytes=1)
+
+    # then they match the sensitivities computed in one chunk, and a payment schedule
+    assert budgeted.to_numpy() == approx(
+        compute_heating_cost_sensitivities(person).to_numpy()
+    )
+    energy = Energy(tariff=budgeted.columns[0][1], cagr_pcnt=budgeted.index[0])
+    payments = energy.annual_payments(
+        house_kwh_m2a=CONFIG.get("energy_use")[budgeted.columns[0][0]],
+        house_area_m2=CONFIG.get("basic").get("average_house_size_m2"),
+        first_year=CURRENT_YEAR,
+        last_year=person.yod,
+    )
+    assert budgeted.iloc[0, 0] == approx(payments.sum())
@@ -0,0 +1,45 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.expected_costs import (
+    expected_drawdowns,
+    expected_totals,
+)
+from pension_calculator.compute.kernels import LIFE_EXPECTANCY
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.models.mortality import LifeTable
+
+
+def test_fixed_death_matches_kernels(scenario_params):
+    # given a life table in which everybody dies at the life expectancy, and scenarios born in different years
+    ages = np.arange(0, 111)
+    table = LifeTable(ages=ages, qx=(ages >= LIFE_EXPECTANCY).astype(float))
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 2)
+    batch = batch.replace(yob=batch.yob + np.array([0, 5]))
+
+    # when I compute the expected totals
+    df = expected_totals(batch, table)
+
+    # then they are the totals of the fixed schedules
+    totals = run_sweep(batch)
+    assert df["heating"].to_numpy() == approx(totals["heating"].to_numpy())
+    assert df["pension"].to_numpy() == approx(totals["pension"].to_numpy())
+
+
+def test_mortality_lowers_expected_costs(scenario_params):
+    # given a life table in which people may die before or after the life expectancy
+    ages = np.arange(0, 111)
+    table = LifeTable(ages=ages, qx=np.clip(np.exp((ages - 87) / 10) / 10, 0, 1))
+    batch = ScenarioBatch.from_scenarios([scenario_params])
+
+    # when I compute the expected totals and drawdowns
+    df = expected_totals(batch, table)
+    drawdowns = expected_drawdowns(batch, table)
+
+    # then the target is the sum of the drawdowns, which are zero before retirement and fall away in old age
+    assert df["pension_target"][0] == approx(drawdowns.sum())
+    retirement_age = scenario_params.person.yor - scenario_params.person.yob
+    assert not drawdowns[0, :retirement_age].any()
+    assert drawdowns[0, retirement_age] > 0
+    assert drawdowns[0, -1] < drawdowns[0, retirement_age]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from pension_calculator.compute.gradients import PARAMETERS, total_gradients
+from pension_calculator.compute.kernels import STREAMS
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import compute_chunk
+from pension_calculator.models.mortgage import mortgage_total, mortgage_total_gradient
+
+
+@pytest.fixture
+def batch(scenario_params):
+    # the quality-control scenario, one with pension saving from the purchase year, and one with a zero CAGR
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 3)
+    return batch.replace(
+        pension_start_year=[1997, 2022, 2022],
+        pension_end_year=[2030, 2064, 2064],
+        cagr_pcnt=[0.05, 0.08, 0.0],
+    )
+
+
+def totals(batch):
+    return compute_chunk(batch).totals()
+
+
+def test_total_gradients_values(batch):
+    # when I compute the totals in closed form
+    df = total_gradients(batch)
+
+    # then they match the kernels
+    for stream in STREAMS:
+        np.testing.assert_allclose(
+            df[stream, "value"], totals(batch)[stream], rtol=1e-9
+        )
+
+
+@pytest.mark.parametrize("name", [p for p in PARAMETERS if p != "length_years"])
+def test_total_gradients_match_finite_differences(batch, name):
+    # given a central difference of the kernels' totals
+    h = 1e-6
+    values = getattr(batch, name)
+    up, down = (totals(batch.replace(**{name: values + s * h})) for s in (1, -1))
+    expected = (up - down) / (2 * h)
+
+    # when I compute the derivatives analytically
+    df = total_gradients(batch)
+
+    # then they agree
+    for stream in STREAMS:
+        np.testing.assert_allclose(
+            df[stream, name], expected[stream], rtol=1e-5, atol=1e-3
+        )
+
+
+def test_mortgage_length_gradient():
+    h = 1e-6
+    expected = (
+        mortgage_total(315000, 0.0425, 20 + h) - mortgage_total(315000, 0.0425, 20 - h)
+    ) / (2 * h)
+    assert mortgage_total_gradient(315000, 0.0425, 20)["length_years"] == (
+        pytest.approx(expected, rel=1e-6)
+    )
+
+
+def test_total_gradients_infeasible(batch):
+    df = total_gradients(batch.replace(yob=1974))
+    assert df.isna().all().all()
@@ -0,0 +1,47 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator import CONFIG
+from pension_calculator.compute.heating_systems import compare_heating_systems
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.models.heating_system import (
+    GAS_BOILER,
+    HEAT_PUMP,
+    HeatingSystem,
+    fuel_tariffs,
+)
+from pension_calculator.plot.scenario import average, passive
+
+
+def test_compare_heating_systems():
+    # given an average and a passive house, and a perfectly efficient boiler, a boiler, and a heat pump
+    batch = ScenarioBatch.from_scenarios([average, passive])
+    ideal = HeatingSystem(name="ideal_boiler", fuel="gas", efficiency=1.0)
+
+    # when I compare the systems, with ventilation in the passive house
+    df = compare_heating_systems(
+        batch, [ideal, GAS_BOILER, HEAT_PUMP], ventilation_kwh_m2a=[0.0, 2.0]
+    )
+
+    # then the ideal boiler costs as much as heating at the gas tariff and growth
+    gas = batch.replace(
+        tariff=fuel_tariffs()["gas"], cagr_pcnt=CONFIG.get("CAGR")["gas"]
+    )
+    expected = run_sweep(gas)
+    assert df.loc[(0, "ideal_boiler"), "gas"] == approx(expected["heating"][0])
+    assert df.loc[(0, "gas_boiler"), "gas"] == approx(expected["heating"][0] / 0.9)
+
+    # and each system's pension saves for its own fuel payments in retirement
+    assert df.loc[(0, "ideal_boiler"), "pension"] == approx(expected["pension"][0])
+    assert df.loc[(0, "gas_boiler"), "pension"] == approx(expected["pension"][0] / 0.9)
+
+    # and the ventilation is paid for in electricity, whatever the heating system
+    assert df.loc[(0, "gas_boiler"), "electricity"] == 0
+    assert df.loc[(1, "gas_boiler"), "electricity"] > 0
+    assert df.loc[(1, "heat_pump"), "gas"] == 0
+    assert df.loc[(1, "heat_pump"), "total"] == approx(
+        df.loc[(1, "heat_pump"), ["gas", "electricity"]].sum()
+    )
+    assert len(df) == 6
+    assert np.all(df.xs("heat_pump", level="system")["total"] > 0)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.demand import HourlyDemand, YearFactors
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.models.demand import (
+    HOURS_PER_DAY,
+    TimeOfUseTariff,
+    Weather,
+)
+
+
+def _weather():
+    # Two years of weather, the second colder, each colder at night than in the day.
+    hours = np.arange(HOURS_PER_DAY)
+    day = 8 + 6 * np.sin((hours - 9) * np.pi / 12)
+    return Weather(np.concatenate([np.tile(day, 365), np.tile(day - 2, 365)]))
+
+
+def test_flat_tariff_averages_to_one():
+    # given hourly demand at a flat tariff
+    demand = HourlyDemand(_weather(), reference_year=2022)
+
+    # when I compute the factors of four years
+    factors = demand(np.array([2022, 2023, 2024, 2025]))
+
+    # then the weather cycles, with the colder year costing more, and they average to one
+    assert factors[0] == approx(factors[2])
+    assert factors[1] > factors[0]
+    assert factors.mean() == approx(1.0)
+
+
+def test_time_of_use_and_warming():
+    # given a tariff at half price at night, and the same weather warming by 0.1C a year
+    night = TimeOfUseTariff.from_daily([0.5] * 7 + [1.0] * 17)
+    flat = HourlyDemand(_weather(), reference_year=2022, chunk_years=3)
+    cheap = HourlyDemand(_weather(), night, reference_year=2022, chunk_years=3)
+    warming = HourlyDemand(_weather(), reference_year=2022, warming_per_year=0.1)
+
+    # when I compute the factors of 60 years
+    years = np.arange(2022, 2082)
+
+    # then heating at night is cheaper, and the demand falls as it warms
+    assert np.all(cheap(years) < flat(years))
+    assert warming(2080) < flat(2080)
+
+
+def test_table():
+    # given hourly demand
+    demand = HourlyDemand(_weather(), reference_year=2022)
+
+    # when I table the factors of a run of years
+    table = demand.table(2020, 2030)
+
+    # then it gives the same factors, and refuses years outside it
+    years = np.array([[2020, 2025], [2030, 2021]])
+    assert isinstance(table, YearFactors)
+    assert table(years) == approx(demand(years))
+    with pytest.raises(KeyError):
+        table(2031)
+
+
+def test_sweep_with_hourly_demand(scenario_params):
+    # given the quality-control scenario, and hourly demand at a flat tariff
+    batch = ScenarioBatch.from_scenarios([scenario_params])
+    demand = HourlyDemand(
+        _weather(), reference_year=scenario_params.house.purchase_year
+    )
+
+    # when I sweep it with and without the hourly demand
+    hourly = run_sweep(batch, heating_factor=demand)
+    annual = run_sweep(batch)
+
+    # then the lifetime heating cost is close, as the weather averages out over the years
+    assert hourly["heating"].iloc[0] == approx(annual["heating"].iloc[0], rel=0.05)
+    assert hourly["heating"].iloc[0] != annual["heating"].iloc[0]
+
+
+def test_pool_sweep_with_hourly_demand(scenario_params):
+    # given the quality-control scenario born in different years, and hourly demand
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 4)
+    batch = batch.replace(yob=batch.yob + np.arange(4))
+    demand = HourlyDemand(_weather(), reference_year=2022)
+
+    # when I sweep it in worker processes, which are sent the factors of the sweep's years
+    pooled = run_sweep(batch, chunk_size=1, workers=2, heating_factor=demand)
+
+    # then it matches a sweep in this process
+    local = run_sweep(batch, heating_factor=demand)
+    assert pooled.to_numpy() == approx(local.to_numpy())
@@ -0,0 +1,101 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.compute_payment_schedule import compute_payment_schedule
+from pension_calculator.compute.kernels import (
+    STREAMS,
+    payment_schedules,
+    precision_report,
+    schedule_totals,
+)
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.models import Person, TariffCurve
+from pension_calculator.plot.scenario import average, passive
+
+
+def test_kernel_matches_payment_schedule(scenario_params):
+    # given the quality-control scenario and the plotted scenarios
+    scenarios = [scenario_params, average, passive]
+
+    # when I compute their schedules with the kernel
+    schedules = payment_schedules(ScenarioBatch.from_scenarios(scenarios))
+
+    # then each matches compute_payment_schedule year by year
+    for i, p in enumerate(scenarios):
+        expected = compute_payment_schedule(p)[list(STREAMS)].fillna(0)
+        actual = schedules.values[i, np.isin(schedules.years, expected.index)]
+        assert actual == approx(expected.to_numpy(), rel=1e-9)
+
+
+def test_float32_schedules(scenario_params):
+    # given the quality-control scenario
+    batch = ScenarioBatch.from_scenarios([scenario_params])
+
+    # when I compute its schedules in single precision
+    schedules = payment_schedules(batch, np.float32)
+    totals = schedule_totals(schedules)
+
+    # then they are stored compactly and the totals are correct to the pound
+    assert schedules.values.dtype == np.float32
+    assert schedules.year_offsets.dtype == np.int16
+    assert schedules.years[0] == 2022
+    assert totals[0, STREAMS.index("mortgage")] == approx(468141, abs=1)
+    assert totals[0, STREAMS.index("heating")] == approx(412470, abs=1)
+
+
+def test_precision_report(scenario_params):
+    # when I compare single precision against the double precision reference
+    report = precision_report([scenario_params, average, passive])
+
+    # then the error is pennies
+    assert list(report.index) == list(STREAMS)
+    assert report["max_abs_error"].max() < 0.5
+    assert report["max_rel_error"].max() < 1e-6
+
+
+def test_kernel_matches_payment_schedule_with_curve(scenario_params):
+    # given the quality-control scenario with a tariff that rises steeply and then falls
+    curve = TariffCurve.from_segments([(2023, 0.2), (2030, -0.02), (2040, 0.03)])
+    p = replace(scenario_params, energy=replace(scenario_params.energy, curve=curve))
+
+    # when I compute its schedules with the kernel, passing the curve that a batch does not hold
+    batch = ScenarioBatch.from_scenarios([scenario_params])
+    schedules = payment_schedules(batch, curve=curve)
+
+    # then they match compute_payment_schedule year by year
+    expected = compute_payment_schedule(p)[list(STREAMS)].fillna(0)
+    actual = schedules.values[0, np.isin(schedules.years, expected.index)]
+    assert actual == approx(expected.to_numpy(), rel=1e-9)
+
+
+def test_kernel_matches_payment_schedule_with_independent_mortgage(scenario_params):
+    # given the quality-control scenario remortgaged for £200,000 over ten years from 2030
+    mortgage = replace(
+        scenario_params.mortgage,
+        purchase_year=2030,
+        purchase_price=200000,
+        length_years=10,
+    )
+    p = replace(scenario_params, mortgage=mortgage)
+
+    # when I compute its schedules with the kernel
+    schedules = payment_schedules(ScenarioBatch.from_scenarios([p]))
+
+    # then they match compute_payment_schedule year by year
+    expected = compute_payment_schedule(p)[list(STREAMS)].fillna(0)
+    actual = schedules.values[0, np.isin(schedules.years, expected.index)]
+    assert actual == approx(expected.to_numpy(), rel=1e-9)
+
+
+def test_kernel_refuses_unpaid_mortgage():
+    # given a person who retires before the mortgage is paid
+    p = replace(passive, person=Person(1960))
+    with pytest.raises(AttributeError):
+        compute_payment_schedule(p)
+
+    # then the kernel refuses the scenario too
+    with pytest.raises(ValueError, match="before the mortgage is paid"):
+        payment_schedules(ScenarioBatch.from_scenarios([p]))
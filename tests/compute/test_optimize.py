@@ -0,0 +1,61 @@
+from dataclasses import replace
+
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.compute_payment_schedule import (
+    compute_payment_schedule,
+)
+from pension_calculator.compute.optimize import optimize_mortgage
+from pension_calculator.plot.scenario import passive
+
+
+def test_optimize_net_saving():
+    # when I maximise the net saving, with heating demand falling to 15 kWh/m2(a) at a 15% premium
+    result = optimize_mortgage(objective="net_saving")
+
+    # then the shortest term and largest deposit minimise interest, and the premium stops where it stops buying
+    # lower heating demand
+    assert result.params["length_years"] == 5
+    assert result.params["deposit_pcnt"] == approx(0.4)
+    assert result.params["passive_house_premium_pcnt"] == approx(0.15, abs=1e-3)
+    assert result.value > 0
+
+
+def test_optimize_peak_outlay():
+    # when I minimise the peak annual outlay of the terms paid before retirement
+    result = optimize_mortgage(objective="peak_outlay", terms=range(20, 50))
+
+    # then the longest term is chosen, and the outlay matches `compute_payment_schedule`
+    assert result.params["length_years"] == passive.person.yor - 2022
+    house = replace(
+        passive.house,
+        passive_house_premium_pcnt=result.params["passive_house_premium_pcnt"],
+        annual_heating_kwh_m2a=result.params["annual_heating_kwh_m2a"],
+    )
+    mortgage = replace(
+        passive.mortgage,
+        purchase_price=house.total_cost(),
+        deposit_pcnt=result.params["deposit_pcnt"],
+        length_years=result.params["length_years"],
+    )
+    schedule = compute_payment_schedule(
+        replace(passive, house=house, mortgage=mortgage)
+    )
+    outlay = schedule[["heating", "mortgage", "pension"]].fillna(0).sum(axis=1)
+    assert result.value == approx(outlay.max())
+
+
+def test_optimize_rejects_terms_after_retirement():
+    with pytest.raises(ValueError):
+        optimize_mortgage(terms=[50])
+
+
+def test_optimize_rejects_infeasible_candidates():
+    # given a passive house with no energy tariff, so that every candidate is infeasible
+    free = replace(passive, energy=replace(passive.energy, tariff=0.0))
+
+    # when I optimise it
+    # then the broken constraint is named
+    with pytest.raises(ValueError, match="NON_POSITIVE_RATE"):
+        optimize_mortgage(free, iterations=1, points=2)
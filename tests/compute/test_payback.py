@@ -0,0 +1,91 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.comparison import COST_STREAMS
+from pension_calculator.compute.compute_payment_schedule import (
+    compute_payment_schedule,
+)
+from pension_calculator.compute.payback import (
+    NEVER,
+    first_payback,
+    iter_cumulative_saving,
+    payback,
+)
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.plot.scenario import average, passive
+
+
+def test_first_payback():
+    # given savings that pay back in the third year, that never pay back, and an infeasible scenario
+    years = np.arange(2020, 2025)
+    annual_saving = np.array(
+        [
+            [-10.0, 4.0, 7.0, -5.0, 1.0],
+            [-10.0, 2.0, 2.0, 2.0, 2.0],
+            [np.nan] * 5,
+        ]
+    )
+
+    # when I find the first payback year
+    actual = first_payback(years, annual_saving)
+
+    # then it is the first year the cumulative saving is positive
+    assert actual.tolist() == [2022, NEVER, NEVER]
+
+
+def test_payback():
+    # given a passive house with a large premium, and one whose premium is never paid back at a low tariff
+    passive_batch, average_batch = (
+        ScenarioBatch.from_scenarios([p, p]) for p in (passive, average)
+    )
+    tariff = np.array([passive.energy.tariff, 0.001])
+    passive_batch = passive_batch.replace(
+        passive_house_premium_pcnt=np.array([0.6, 0.5]), tariff=tariff
+    )
+    average_batch = average_batch.replace(tariff=tariff)
+
+    # when I find the payback years
+    df = payback(passive_batch, average_batch)
+
+    # then the first matches a year by year comparison of the payment schedules, and the second never pays back
+    expensive = passive_batch.to_scenarios()[0]
+    saving = sum(
+        compute_payment_schedule(average)[name].fillna(0)
+        - compute_payment_schedule(expensive)[name].fillna(0)
+        for name in COST_STREAMS
+    )
+    expected = saving.cumsum().gt(0).idxmax()
+
+    assert expected > passive.house.purchase_year
+    assert df["payback_year"].tolist() == [expected, NEVER]
+    assert df["years_to_payback"].tolist() == [
+        expected - passive.house.purchase_year + 1,
+        NEVER,
+    ]
+    assert df["net_saving"][0] == approx(saving.sum())
+
+
+def test_iter_cumulative_saving():
+    # given three pairs of scenarios swept two at a time
+    passive_batch, average_batch = (
+        ScenarioBatch.from_scenarios([p] * 3) for p in (passive, average)
+    )
+    passive_batch = passive_batch.replace(
+        passive_house_premium_pcnt=np.array([0.1, 0.2, 0.3])
+    )
+
+    # when I iterate over the cumulative savings
+    chunks = list(iter_cumulative_saving(passive_batch, average_batch, chunk_size=2))
+
+    # then each chunk's is the cumulative year by year comparison of its payment schedules
+    assert [chunk.start for chunk in chunks] == [0, 2]
+    assert [chunk.values.shape[0] for chunk in chunks] == [2, 1]
+    last = chunks[-1]
+    saving = sum(
+        compute_payment_schedule(average)[name].fillna(0)
+        - compute_payment_schedule(passive_batch.to_scenarios()[2])[name].fillna(0)
+        for name in COST_STREAMS
+    )
+    expected = saving.cumsum().reindex(last.years, fill_value=0)
+    expected = expected.where(last.years <= saving.index.max(), saving.sum())
+    assert last.values[0] == approx(expected.to_numpy())
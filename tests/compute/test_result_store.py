@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.plot.scenario import average, passive
+
+pc = pytest.importorskip("pyarrow.compute")
+result_store = pytest.importorskip("pension_calculator.compute.result_store")
+
+
+@pytest.fixture
+def store(tmp_path, scenario_params):
+    result_store.write_sweep(
+        tmp_path, [average, passive, scenario_params], chunk_size=2
+    )
+    return tmp_path
+
+
+def test_partitions(store):
+    # then the store is partitioned by house type and year of birth
+    partitions = sorted(p.name for p in (store / result_store.SUMMARY).iterdir())
+    assert partitions == ["house_type=average", "house_type=passive"]
+    assert (store / result_store.SUMMARY / "house_type=passive" / "yob=1997").is_dir()
+
+
+def test_read_summary_with_pushdown(store):
+    # when I read the passive houses' mortgage totals
+    table = result_store.read_table(
+        store,
+        columns=["scenario", "mortgage"],
+        filter=pc.field("house_type") == "passive",
+    )
+
+    # then only the projected columns of the matching rows are loaded
+    assert table.column_names == ["scenario", "mortgage"]
+    arrays = result_store.to_arrays(table)
+    assert sorted(arrays["scenario"]) == [1]
+    assert arrays["mortgage"][0] == approx(
+        passive.mortgage.annual_payments()["total"].sum()
+    )
+
+
+def test_read_schedules(store):
+    # when I read the quality-control scenario's schedules
+    table = result_store.read_table(
+        store, result_store.SCHEDULES, filter=pc.field("scenario") == 2
+    )
+    df = table.to_pandas().sort_values("year")
+
+    # then they cover the purchase year to the year of death
+    assert df["year"].tolist() == list(range(2022, 2085))
+    assert df["heating"].sum() == approx(412470, abs=1)
+    assert df["year"].dtype == np.int16
+
+
+def test_rewrite_replaces_results(store, scenario_params):
+    # when I rerun the sweep into the same store with a different chunk size
+    result_store.write_sweep(store, [average, passive, scenario_params], chunk_size=3)
+
+    # then only the new results are read back
+    table = result_store.read_table(store, columns=["scenario"])
+    assert sorted(result_store.to_arrays(table)["scenario"]) == [0, 1, 2]
@@ -0,0 +1,70 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.models import TariffCurve
+from pension_calculator.plot.scenario import average, passive
+
+
+def test_round_trip():
+    # given the plotted scenarios
+    scenarios = [average, passive]
+
+    # when I convert them to a batch and back
+    batch = ScenarioBatch.from_scenarios(scenarios)
+
+    # then nothing is lost
+    assert len(batch) == 2
+    assert batch.to_scenarios() == scenarios
+
+
+def test_round_trip_independent_mortgage(scenario_params):
+    # given a scenario remortgaged for less than the house cost, after the purchase
+    mortgage = replace(
+        scenario_params.mortgage, purchase_year=2030, purchase_price=200000
+    )
+    scenarios = [replace(scenario_params, mortgage=mortgage), passive]
+
+    # when I convert it to a batch and back
+    batch = ScenarioBatch.from_scenarios(scenarios)
+
+    # then the mortgage is kept, and a mortgage of the house's cost still follows the house
+    assert batch.mortgage_purchase_year.tolist() == [2030, 2022]
+    assert batch.mortgage_price() == approx([200000, passive.house.total_cost()])
+    assert batch.to_scenarios() == scenarios
+
+
+def test_refuses_tariff_curve():
+    # given a scenario whose tariff grows on a curve
+    energy = replace(passive.energy, curve=TariffCurve.constant(0.0))
+    scenarios = [average, replace(passive, energy=energy)]
+
+    # when I convert it to a batch
+    # then it is refused rather than swept at its CAGR
+    with pytest.raises(ValueError, match="tariff curve"):
+        ScenarioBatch.from_scenarios(scenarios)
+
+
+def test_contiguous_typed_columns():
+    batch = ScenarioBatch.from_scenarios([average, passive] * 3)
+
+    assert batch.yob.dtype == np.int32
+    assert batch.tariff.dtype == np.float64
+    assert batch.tariff.flags["C_CONTIGUOUS"]
+    assert batch.nbytes == 6 * (6 * 4 + 10 * 8)
+    assert not hasattr(batch, "__dict__")
+
+
+def test_select_and_replace():
+    batch = ScenarioBatch.from_scenarios([average, passive, passive])
+
+    passive_only = batch[batch.annual_heating_kwh_m2a < 50]
+    assert len(passive_only) == 2
+    assert len(batch[1]) == 1
+
+    dearer = batch.replace(tariff=0.2)
+    assert dearer.tariff == approx([0.2] * 3)
+    assert batch.tariff == approx([0.05] * 3)
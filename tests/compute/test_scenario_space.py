@@ -0,0 +1,67 @@
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.scenario_batch import SCENARIO_FIELDS, ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.plot.scenario import passive
+
+
+@pytest.fixture
+def space():
+    return ScenarioSpace.from_scenario(
+        passive,
+        {"yob": [1995, 1997], "tariff": [0.05, 0.1, 0.2], "cagr_pcnt": [0.05, 0.1]},
+    )
+
+
+def test_size_without_expanding(space):
+    assert len(space) == 12
+    assert space.shape == (2, 3, 2)
+
+
+def test_decode_mixed_radix(space):
+    # when I decode a flat index
+    p = space[9]  # yob 1997, tariff 0.1, cagr 0.1
+
+    # then the last axis varies fastest
+    assert p.person.yob == 1997
+    assert p.energy.tariff == 0.1
+    assert p.energy.cagr_pcnt == 0.1
+    assert p.house == passive.house
+
+    # and the pension is saved until retirement
+    assert p.pension.end_year == p.person.yor
+
+
+def test_blocks_match_scenarios(space):
+    # when I decode the space in blocks
+    blocks = list(space.blocks(5))
+
+    # then they are the columns of the individual scenarios
+    assert [len(block) for block in blocks] == [5, 5, 2]
+    expected = ScenarioBatch.from_scenarios([space[i] for i in range(len(space))])
+    actual = ScenarioBatch.concat(blocks)
+    for name in SCENARIO_FIELDS:
+        assert getattr(actual, name) == approx(getattr(expected, name), nan_ok=True)
+
+
+def test_slice_and_sample(space):
+    tail = space[10:]
+    assert len(tail) == 2
+    assert tail[0] == space[10]
+
+    indices = space.sample(4, seed=1)
+    assert len(set(indices)) == 4
+    assert space.take(indices).tariff == approx(
+        [space[i].energy.tariff for i in indices]
+    )
+
+
+def test_sweep_over_space(space):
+    # when I sweep a space
+    totals = run_sweep(space, chunk_size=5)
+
+    # then it matches sweeping its scenarios
+    expected = run_sweep([space[i] for i in range(len(space))])
+    assert totals.to_numpy() == approx(expected.to_numpy())
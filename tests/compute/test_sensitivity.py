@@ -0,0 +1,39 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.sensitivity import (
+    saltelli_sample,
+    sobol_analysis,
+    sobol_indices,
+)
+
+
+def test_sobol_indices_of_additive_function():
+    # given f = x + 2y + 0z with x, y, z uniform on [0, 1], whose variances are in the ratio 1:4:0
+    a, b, ab = saltelli_sample({"x": (0, 1), "y": (0, 1), "z": (0, 1)}, 20000, seed=0)
+
+    def f(points):
+        return points[..., 0] + 2 * points[..., 1]
+
+    # when I estimate its Sobol indices
+    first_order, total = sobol_indices(f(a), f(b), f(ab))
+
+    # then they match the variance ratios
+    assert first_order == approx([0.2, 0.8, 0], abs=0.03)
+    assert total == approx([0.2, 0.8, 0], abs=0.03)
+
+
+def test_saltelli_sample_whole_numbers():
+    a, b, ab = saltelli_sample({"yob": (1995, 2000), "tariff": (0.1, 0.2)}, 1000, 1)
+    assert set(np.unique(a[:, 0])) == set(range(1995, 2001))
+    assert (ab[0, :, 0] == b[:, 0]).all() and (ab[0, :, 1] == a[:, 1]).all()
+
+
+def test_sobol_analysis():
+    # when I analyse the default passive and average houses
+    indices = sobol_analysis(n=256, seed=0)
+
+    # then the energy CAGR dominates, and the pension growth rate does not affect the size of the house pension
+    assert indices[("net_saving", "ST")].idxmax() == "cagr_pcnt"
+    assert indices.loc["growth_rate_pcnt", ("house_pension", "ST")] == approx(0)
+    assert len(indices) == 9
@@ -0,0 +1,159 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.kernels import STREAMS
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.shards import (
+    LockLost,
+    ShardQueue,
+    plan_shards,
+    run_shard_worker,
+    sweep_fingerprint,
+)
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.plot.scenario import average, passive
+
+
+@pytest.fixture
+def scenarios(scenario_params):
+    return [average, passive, scenario_params] * 3
+
+
+def test_plan_shards():
+    shards = plan_shards(10, 4)
+    assert [(s.start, s.stop) for s in shards] == [(0, 4), (4, 8), (8, 10)]
+
+
+def test_claims_are_exclusive(tmp_path):
+    # given two workers sharing a queue
+    first = ShardQueue(tmp_path, 10, 4)
+    second = ShardQueue(tmp_path, 10, 4)
+
+    # when they claim shards
+    # then they get different ones
+    assert first.claim().index == 0
+    assert second.claim().index == 1
+    with pytest.raises(ValueError):
+        ShardQueue(tmp_path, 10, 5)
+
+
+def test_sharded_sweep_matches_sweep(tmp_path, scenarios):
+    # when workers run the sweep in shards
+    assert run_shard_worker(scenarios, tmp_path, shard_size=4, chunk_size=3) == 3
+    assert run_shard_worker(scenarios, tmp_path, shard_size=4) == 0
+
+    # then the collected totals match an unsharded sweep
+    totals = ShardQueue(tmp_path, len(scenarios), 4).collect()
+    expected = run_sweep(scenarios)
+    assert totals.to_numpy() == approx(expected.to_numpy())
+
+
+def test_resume_from_checkpoint(tmp_path, scenarios):
+    # given a worker killed after checkpointing the first two scenarios of a shard
+    queue = ShardQueue(
+        tmp_path,
+        len(scenarios),
+        4,
+        stale_after_s=60,
+        fingerprint=sweep_fingerprint(scenarios),
+    )
+    shard = queue.claim()
+    partial = np.full((2, len(STREAMS)), -1.0)  # rows that must not be recomputed
+    queue.save_checkpoint(shard, partial)
+    stale = time.time() - 120
+    os.utime(tmp_path / "locks" / shard.name, (stale, stale))
+
+    # when another worker picks up the sweep
+    run_shard_worker(scenarios, tmp_path, shard_size=4, stale_after_s=60)
+
+    # then it resumes the shard from its checkpoint
+    totals = ShardQueue(tmp_path, len(scenarios), 4).collect()
+    assert (totals.iloc[:2] == -1).all().all()
+    assert totals.iloc[2:].to_numpy() == approx(run_sweep(scenarios[2:]).to_numpy())
+
+
+def test_resume_refuses_another_sweep(tmp_path, scenarios):
+    # given a sweep started in a shared directory
+    run_shard_worker(scenarios, tmp_path, shard_size=4)
+
+    # when a sweep of as many different scenarios, or of the same ones in another precision, is run there
+    # then it is refused rather than resuming the first sweep's results
+    different = scenarios[::-1]
+    with pytest.raises(ValueError, match="planned"):
+        run_shard_worker(different, tmp_path, shard_size=4)
+    with pytest.raises(ValueError, match="planned"):
+        run_shard_worker(scenarios, tmp_path, shard_size=4, precision="float32")
+
+    # and the same sweep is still resumed
+    assert run_shard_worker(scenarios, tmp_path, shard_size=4) == 0
+
+
+def test_fingerprint_of_scenario_space():
+    # given a scenario space, a slice of it, and a space with other tariffs
+    space = ScenarioSpace.from_scenario(passive, {"tariff": [0.05, 0.1, 0.2]})
+    other = ScenarioSpace.from_scenario(passive, {"tariff": [0.05, 0.1, 0.3]})
+
+    # when I fingerprint them
+    # then each is identified without decoding it
+    assert sweep_fingerprint(space) == sweep_fingerprint(space[:])
+    assert sweep_fingerprint(space[1:]) != sweep_fingerprint(space)
+    assert sweep_fingerprint(other) != sweep_fingerprint(space)
+
+
+def test_refreshed_lock_is_not_reclaimed(tmp_path):
+    # given a lock judged stale by one worker, and refreshed by its owner before it is reclaimed
+    owner = ShardQueue(tmp_path, 10, 4, stale_after_s=60)
+    shard = owner.claim()
+    lock = tmp_path / "locks" / shard.name
+    stale = time.time() - 120
+    os.utime(lock, (stale, stale))
+    judged = lock.stat()
+    owner.heartbeat(shard)
+
+    # when the other worker reclaims it
+    other = ShardQueue(tmp_path, 10, 4, stale_after_s=60)
+    reclaimed = other._reclaim(shard, judged)
+
+    # then the owner keeps its lock
+    assert not reclaimed
+    assert owner.owns(shard)
+    assert list((tmp_path / "locks").iterdir()) == [lock]
+
+
+def test_reclaimed_shard_is_not_checkpointed(tmp_path):
+    # given a shard whose lock went stale and was claimed by another worker
+    first = ShardQueue(tmp_path, 10, 4, stale_after_s=60)
+    shard = first.claim()
+    stale = time.time() - 120
+    os.utime(tmp_path / "locks" / shard.name, (stale, stale))
+    second = ShardQueue(tmp_path, 10, 4, stale_after_s=60)
+    assert second.claim() == shard
+
+    # when the first worker tries to checkpoint it
+    # then it finds it has lost the lock, and leaves the other worker's lock alone
+    with pytest.raises(LockLost):
+        first.save_checkpoint(shard, np.zeros((1, len(STREAMS))))
+    assert first.load_checkpoint(shard).shape == (0, len(STREAMS))
+    first.release(shard)
+    assert second.owns(shard)
+
+
+def test_heartbeat_thread_refreshes_lock(tmp_path):
+    # given a claimed shard whose lock is old
+    queue = ShardQueue(tmp_path, 10, 4, stale_after_s=60)
+    shard = queue.claim()
+    lock = tmp_path / "locks" / shard.name
+    stale = time.time() - 120
+    os.utime(lock, (stale, stale))
+
+    # when the lock is held with a background heartbeat
+    with queue.heartbeats(shard, interval_s=0.01) as heartbeat:
+        time.sleep(0.1)
+
+    # then it has been refreshed without any chunk completing
+    assert time.time() - lock.stat().st_mtime < 60
+    assert not heartbeat.lost
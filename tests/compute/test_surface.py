@@ -0,0 +1,67 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.compute_payment_schedule import (
+    compute_payment_schedule,
+)
+from pension_calculator.compute.surface import build_payment_surface, config_axis
+from pension_calculator.models import Energy
+from pension_calculator.plot.scenario import average, passive
+
+
+@pytest.fixture(scope="module")
+def surface():
+    return build_payment_surface(
+        {"average": average, "passive": passive},
+        tariffs=[0.05, 0.1, 0.2],
+        cagrs=[0.05, 0.1],
+    )
+
+
+def test_surface_matches_compute_payment_schedule(surface):
+    # given the passive scenario at a point of the grid
+    expected = compute_payment_schedule(
+        replace(passive, energy=Energy(tariff=0.1, cagr_pcnt=0.1))
+    )
+
+    # when I look it up in the surface
+    schedule = surface.schedule("passive", 0.1, 0.1)
+
+    # then it is the same as computing it directly
+    assert schedule.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(
+        schedule.to_numpy(), expected.fillna(0).to_numpy(), atol=1e-6
+    )
+
+
+def test_surface_interpolates_in_tariff(surface):
+    # given a tariff between grid points
+    expected = compute_payment_schedule(
+        replace(average, energy=Energy(tariff=0.15, cagr_pcnt=0.05))
+    )
+
+    # when I look it up
+    schedule = surface.schedule("average", 0.15, 0.05)
+    nearest = surface.schedule("average", 0.16, 0.05, interpolate=False)
+
+    # then heating is exact, since it is linear in the tariff, and the nearest grid point is the upper one
+    assert schedule["heating"].sum() == approx(expected["heating"].sum())
+    assert nearest["heating"].sum() == approx(2 * expected["heating"].sum() / 1.5)
+
+
+def test_surface_delta(surface):
+    # when I take the difference between the passive and average houses
+    delta = surface.delta("passive", "average", 0.05, 0.05)
+
+    # then the passive house costs more to buy, and less to heat
+    assert delta["mortgage"].sum() > 0
+    assert delta["heating"].sum() < 0
+    with pytest.raises(ValueError):
+        surface.delta("passive", "average", 0.5, 0.05)
+
+
+def test_config_axis():
+    assert config_axis("cagr")[[0, 5, -1]].tolist() == [0.0, 0.05, 1.0]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.surrogate import build_surrogate, exact_totals
+
+
+@pytest.fixture
+def surrogate(scenario_params):
+    space = ScenarioSpace.from_scenario(
+        scenario_params,
+        {
+            "tariff": [0.05, 0.1, 0.2],
+            "cagr_pcnt": np.linspace(0.0, 0.1, 11),
+            "interest_rate_pcnt": [0.02, 0.0425, 0.06],
+        },
+    )
+    return build_surrogate(space, holdout=64, seed=1)
+
+
+def test_surrogate_at_grid_points(surrogate):
+    # when I query the quality-control scenario, which lies on the grid
+    totals = surrogate.predict(
+        {"tariff": 0.1, "cagr_pcnt": 0.05, "interest_rate_pcnt": 0.0425}
+    )
+
+    # then it is interpolated, and exact
+    assert not totals["exact"].iloc[0]
+    assert totals["mortgage"].iloc[0] == approx(468141, abs=1)
+    assert totals["heating"].iloc[0] == approx(412470, abs=1)
+
+
+def test_surrogate_error_bound(surrogate):
+    # given random points inside the envelope
+    rng = np.random.default_rng(2)
+    points = {
+        "tariff": rng.uniform(0.05, 0.2, 100),
+        "cagr_pcnt": rng.uniform(0.0, 0.1, 100),
+        "interest_rate_pcnt": rng.uniform(0.02, 0.06, 100),
+    }
+
+    # when I query them
+    totals = surrogate.predict(points)
+    reference = exact_totals(surrogate.space.at(points))
+
+    # then the errors are of the order of the held-out estimate
+    assert not totals["exact"].any()
+    rel_error = np.abs(totals.drop(columns="exact").to_numpy() / reference - 1)
+    assert (rel_error.max(axis=0) < 2 * surrogate.error["max_rel_error"]).all()
+    assert surrogate.error.loc["heating", "max_rel_error"] < 0.05
+
+
+def test_surrogate_falls_back_outside_envelope(surrogate, scenario_params):
+    # when I query a tariff outside the grid
+    totals = surrogate.predict(
+        {"tariff": [0.1, 0.4], "cagr_pcnt": 0.05, "interest_rate_pcnt": 0.0425}
+    )
+
+    # then it is evaluated exactly
+    expected = exact_totals(
+        ScenarioBatch.from_scenarios([scenario_params]).replace(tariff=0.4)
+    )
+    assert totals["exact"].tolist() == [False, True]
+    assert totals["heating"].iloc[1] == approx(expected[0, 0])
@@ -0,0 +1,95 @@
+import logging
+import urllib.request
+
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.atomic import write_text
+from pension_calculator.compute.metrics import (
+    LogSink,
+    MetricsReporter,
+    PrometheusFileSink,
+    PrometheusHTTPSink,
+    SweepMetrics,
+)
+from pension_calculator.compute.sweep import run_sweep
+
+
+def test_run_sweep_totals(scenario_params):
+    # given a sweep of identical scenarios
+    scenarios = [scenario_params] * 3
+
+    # when I run the sweep
+    totals = run_sweep(scenarios, chunk_size=2)
+
+    # then each row has the quality-control totals
+    assert len(totals) == 3
+    assert totals["mortgage"].tolist() == approx([468141] * 3, abs=1)
+    assert totals["heating"].tolist() == approx([412470] * 3, abs=1)
+
+
+def test_metrics_track_progress(scenario_params):
+    # given metrics for a sweep
+    metrics = SweepMetrics(total=4)
+
+    # when the sweep completes
+    run_sweep([scenario_params] * 4, chunk_size=3, metrics=metrics)
+    metrics.record_cache(hits=3, misses=1)
+    snapshot = metrics.snapshot()
+
+    # then the snapshot reports it
+    assert snapshot.completed == 4
+    assert snapshot.queue_depth == {"main": 0}
+    assert snapshot.cache_hit_rate == approx(0.75)
+    assert snapshot.eta_s == approx(0)
+    assert snapshot.rss_bytes > 0
+
+
+def test_metrics_track_worker_pool(scenario_params):
+    # given metrics for a sweep
+    metrics = SweepMetrics(total=4)
+
+    # when the sweep runs on a pool of workers
+    totals = run_sweep([scenario_params] * 4, chunk_size=1, workers=2, metrics=metrics)
+
+    # then the queue of the pool is reported, and drained
+    assert totals["mortgage"].tolist() == approx([468141] * 4, abs=1)
+    assert metrics.snapshot().queue_depth == {"pool": 0}
+
+
+def test_sinks(tmp_path, caplog):
+    # given a reporter publishing to a file, an HTTP endpoint, and the log
+    metrics = SweepMetrics(total=2)
+    metrics.submitted("main", 2)
+    metrics.completed("main", 1)
+    http_sink = PrometheusHTTPSink(port=0)
+    sinks = [PrometheusFileSink(tmp_path / "sweep.prom"), http_sink, LogSink()]
+
+    # when a snapshot is published
+    with caplog.at_level(logging.INFO):
+        reporter = MetricsReporter(metrics, sinks, interval_s=60)
+        reporter.publish()
+        url = f"http://127.0.0.1:{http_sink.port}/metrics"
+        body = urllib.request.urlopen(url).read().decode()
+        http_sink.close()
+
+    # then every sink received it
+    assert "pension_sweep_scenarios_completed_total 1" in body
+    assert 'pension_sweep_queue_depth{worker="main"} 1' in body
+    assert body == (tmp_path / "sweep.prom").read_text()
+    assert (tmp_path / "sweep.prom").stat().st_mode & 0o777 == 0o644
+    assert "1/2 scenarios" in caplog.text
+
+
+def test_failed_write_keeps_file(tmp_path):
+    # given a metrics file
+    path = tmp_path / "sweep.prom"
+    write_text(path, "old")
+
+    # when a write to it fails
+    with pytest.raises(TypeError):
+        write_text(path, None)
+
+    # then the file is unchanged and no temporary file is left behind
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["sweep.prom"]
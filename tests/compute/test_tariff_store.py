@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.tariff_store import TariffStore, ingest_tariffs
+
+
+@pytest.fixture
+def quarterly_tariffs():
+    # Quarterly gas and electricity tariffs in two regions from 2022 to 2024, with no electricity in Wales in 2023.
+    dates = pd.date_range("2022-01-01", "2024-12-31", freq="QS")
+    rows = []
+    for region, scale in (("london", 1.0), ("wales", 0.9)):
+        for fuel, base in (("gas", 0.05), ("electricity", 0.2)):
+            for i, date in enumerate(dates):
+                if region == "wales" and fuel == "electricity" and date.year == 2023:
+                    continue
+                rows.append(
+                    (
+                        region,
+                        fuel,
+                        date.date().isoformat(),
+                        scale * base * (1 + i / 100),
+                    )
+                )
+    return pd.DataFrame(rows, columns=["region", "fuel", "date", "tariff"])
+
+
+def test_ingest_csv(tmp_path, quarterly_tariffs):
+    # given a CSV file of quarterly tariffs
+    path = tmp_path / "tariffs.csv"
+    quarterly_tariffs.to_csv(path, index=False)
+
+    # when I ingest it a few rows at a time
+    store = ingest_tariffs(path, tmp_path / "store", chunk_rows=5)
+
+    # then the store holds the annual mean tariff per region and fuel, memory-mapped
+    expected = (
+        quarterly_tariffs.assign(year=pd.to_datetime(quarterly_tariffs["date"]).dt.year)
+        .groupby(["region", "fuel", "year"])["tariff"]
+        .mean()
+    )
+    assert store.regions == ["london", "wales"]
+    assert store.fuels == ["electricity", "gas"]
+    assert isinstance(store.tariffs, np.memmap)
+    assert store.series("london", "gas").to_numpy() == approx(
+        expected.loc["london", "gas"].to_numpy(), rel=1e-6
+    )
+    assert store.series("wales", "electricity").index.tolist() == [2022, 2024]
+
+    # and a reopened store gives the same curves
+    curve = TariffStore(tmp_path / "store").curve("london", "gas")
+    growth = expected.loc["london", "gas"].to_numpy()
+    assert curve.growth_factors(2022, np.arange(2022, 2025)) == approx(
+        growth / growth[0], rel=1e-6
+    )
+    # and a year with no tariffs is filled at a constant growth rate across the gap
+    gap = store.curve("wales", "electricity").growth_factors(2022, [2023, 2024])
+    assert gap[0] ** 2 == approx(gap[1])
+    assert gap[1] == approx(
+        expected.loc["wales", "electricity", 2024]
+        / expected.loc["wales", "electricity", 2022],
+        rel=1e-6,
+    )
+    with pytest.raises(KeyError):
+        store.series("scotland", "gas")
+
+
+def test_ingest_parquet(tmp_path, quarterly_tariffs):
+    pytest.importorskip("pyarrow")
+
+    # given the tariffs split across a CSV and a Parquet file
+    csv, parquet = tmp_path / "a.csv", tmp_path / "b.parquet"
+    quarterly_tariffs.iloc[:20].to_csv(csv, index=False)
+    quarterly_tariffs.iloc[20:].to_parquet(parquet, index=False)
+
+    # when I ingest both
+    store = ingest_tariffs([csv, parquet], tmp_path / "store", chunk_rows=7)
+
+    # then they are combined as if from one file
+    whole = tmp_path / "whole.csv"
+    quarterly_tariffs.to_csv(whole, index=False)
+    expected = ingest_tariffs(whole, tmp_path / "whole")
+    assert np.asarray(store.tariffs) == approx(
+        np.asarray(expected.tariffs), nan_ok=True
+    )
+
+
+def test_rewrite_is_atomic(tmp_path, quarterly_tariffs):
+    # given a store
+    path = tmp_path / "tariffs.csv"
+    quarterly_tariffs.to_csv(path, index=False)
+    old = ingest_tariffs(path, tmp_path / "store")
+    index = tmp_path / "store" / "index.json"
+
+    # when I ingest a single region into it again
+    quarterly_tariffs[quarterly_tariffs["region"] == "wales"].to_csv(path, index=False)
+    store = ingest_tariffs(path, tmp_path / "store")
+
+    # then a store opened before keeps the array it was opened with, and the new array replaces it
+    assert old.regions == ["london", "wales"]
+    assert old.tariffs.shape[0] == 2
+    assert store.regions == ["wales"]
+    assert store.tariffs.shape[0] == 1
+    names = sorted(p.name for p in (tmp_path / "store").iterdir())
+    assert names == ["index.json", json.loads(index.read_text())["tariffs"]]
+
+
+def test_open_retries_replaced_array(tmp_path, quarterly_tariffs, monkeypatch):
+    # given a store whose array is replaced by another ingest just as it is opened
+    path = tmp_path / "tariffs.csv"
+    quarterly_tariffs.to_csv(path, index=False)
+    ingest_tariffs(path, tmp_path / "store")
+    load = np.load
+    calls = []
+
+    def replaced_once(file, **kwargs):
+        calls.append(file)
+        if len(calls) == 1:
+            raise FileNotFoundError(file)
+        return load(file, **kwargs)
+
+    monkeypatch.setattr(np, "load", replaced_once)
+
+    # when I open it
+    store = TariffStore(tmp_path / "store")
+
+    # then the index is read again and the current array opened
+    assert len(calls) == 2
+    assert store.regions == ["london", "wales"]
@@ -0,0 +1,54 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.comparison import average_counterpart, compare
+from pension_calculator.compute.scenario_space import ScenarioSpace
+from pension_calculator.compute.threshold import query_threshold, query_top_k
+from pension_calculator.plot.scenario import average, passive
+
+
+def _space():
+    return ScenarioSpace.from_scenario(
+        passive,
+        {
+            "tariff": np.linspace(0.02, 0.3, 8),
+            "interest_rate_pcnt": np.array([0.02, 0.08]),
+            "cagr_pcnt": np.linspace(0.0, 0.06, 7),
+            "annual_heating_kwh_m2a": np.array([15.0, 60.0, 150.0]),
+        },
+    )
+
+
+def _exhaustive(space):
+    batch = space.take(np.arange(len(space)))
+    return compare(batch, average_counterpart(batch, average))["net_saving"].to_numpy()
+
+
+def test_query_threshold():
+    # given a space of passive houses, some of which use more energy than an average house
+    space = _space()
+    expected = _exhaustive(space)
+    threshold = np.median(expected)
+
+    # when I query the scenarios saving at least the median
+    result = query_threshold(space, threshold)
+
+    # then they are exactly those found exhaustively, with fewer evaluations
+    assert result.indices.tolist() == np.flatnonzero(expected >= threshold).tolist()
+    evaluated = ~np.isnan(result.net_saving)
+    assert result.net_saving[evaluated] == approx(expected[result.indices[evaluated]])
+    assert result.n_evaluations < len(space)
+
+
+def test_query_top_k():
+    # given a space of passive houses
+    space = _space()
+    expected = _exhaustive(space)
+
+    # when I query the 5 that save most
+    result = query_top_k(space, 5)
+
+    # then they are the 5 best found exhaustively, best first, with fewer evaluations
+    assert result.indices.tolist() == np.argsort(-expected)[:5].tolist()
+    assert result.net_saving == approx(np.sort(expected)[::-1][:5])
+    assert result.n_evaluations < len(space)
@@ -0,0 +1,34 @@
+from pytest import approx
+
+from pension_calculator.compute.comparison import net_saving
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.tornado import tornado
+from pension_calculator.plot.scenario import average, passive
+
+
+def test_tornado():
+    # given bounds on the tariff, which affects both houses, and the heating demand of the passive house
+    bounds = {"tariff": (0.05, 0.2), "annual_heating_kwh_m2a": (10.0, 25.0)}
+
+    # when I compute the tornado
+    df = tornado(bounds)
+
+    # then inputs are ranked by swing, and each bound matches a direct evaluation
+    passive_batch, average_batch = (
+        ScenarioBatch.from_scenarios([p]) for p in (passive, average)
+    )
+    expected_base = net_saving(passive_batch, average_batch)[0]
+    expected_high_tariff = net_saving(
+        passive_batch.replace(tariff=0.2), average_batch.replace(tariff=0.2)
+    )[0]
+    expected_low_kwh = net_saving(
+        passive_batch.replace(annual_heating_kwh_m2a=10.0), average_batch
+    )[0]
+
+    assert df.index.tolist() == ["tariff", "annual_heating_kwh_m2a"]
+    assert df.attrs["base"] == approx(expected_base)
+    assert df.loc["tariff", "net_saving_high"] == approx(expected_high_tariff)
+    assert df.loc["annual_heating_kwh_m2a", "net_saving_low"] == approx(
+        expected_low_kwh
+    )
+    assert df["swing"].iloc[0] > df["swing"].iloc[1] > 0
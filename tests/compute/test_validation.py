@@ -0,0 +1,57 @@
+import numpy as np
+from pytest import approx
+
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.compute.sweep import run_sweep
+from pension_calculator.compute.validation import Infeasible, validate_batch
+from pension_calculator.plot.scenario import passive
+
+
+def test_validate_batch(scenario_params):
+    # given a feasible scenario, people retiring (1974) and dying (1954) before the mortgage is paid,
+    # and a free mortgage
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 4)
+    batch = batch.replace(
+        yob=[1997, 1974, 1954, 1997], interest_rate_pcnt=[0.0425] * 3 + [0]
+    )
+
+    # when I validate them
+    result = validate_batch(batch)
+
+    # then each infeasible scenario is flagged with its reasons
+    assert result.valid.tolist() == [True, False, False, False]
+    assert result.describe(1) == ["MORTGAGE_AFTER_RETIREMENT"]
+    assert set(result.describe(2)) == {
+        "MORTGAGE_AFTER_DEATH",
+        "MORTGAGE_AFTER_RETIREMENT",
+        "PENSION_ENDS_AFTER_RETIREMENT",
+    }
+    assert result.reasons[3] == Infeasible.NON_POSITIVE_RATE
+    assert result.counts()["MORTGAGE_AFTER_RETIREMENT"] == 2
+
+
+def test_sweep_skips_infeasible_scenarios(scenario_params):
+    # given a sweep including a person who retires before the mortgage is paid
+    infeasible = ScenarioBatch.from_scenarios([scenario_params]).replace(yob=1974)
+    scenarios = [passive] + infeasible.to_scenarios() + [scenario_params]
+
+    # when I run it
+    totals = run_sweep(scenarios)
+
+    # then the infeasible scenario has no totals, and the others are unaffected
+    assert np.isnan(totals.iloc[1]).all()
+    assert totals["mortgage"].iloc[2] == approx(468141, abs=1)
+
+
+def test_validate_mortgage_years(scenario_params):
+    # given mortgages taken out before the purchase, and so late that they are not paid before retirement
+    batch = ScenarioBatch.from_scenarios([scenario_params] * 3)
+    batch = batch.replace(mortgage_purchase_year=[2022, 2020, 2045])
+
+    # when I validate them
+    result = validate_batch(batch)
+
+    # then the mortgage's own years are checked, not the purchase year's
+    assert result.valid.tolist() == [True, False, False]
+    assert result.describe(1) == ["MORTGAGE_BEFORE_PURCHASE"]
+    assert result.describe(2) == ["MORTGAGE_AFTER_RETIREMENT"]
@@ -28,9 +28,8 @@ def mortgage():
     )
 
 
-@pytest.fixture(scope="module")
-def payment_schedule():
-    params = ScenarioParams(
+def make_scenario_params() -> ScenarioParams:
+    return ScenarioParams(
         Person(1997),
         House(
             purchase_year=2022,
@@ -49,4 +48,13 @@ def payment_schedule():
         Pension(target=None, growth_rate_pcnt=0.01, start_year=1997, end_year=2030),
         Energy(tariff=0.1, cagr_pcnt=0.05),
     )
-    return compute_payment_schedule(params)
+
+
+@pytest.fixture
+def scenario_params():
+    return make_scenario_params()
+
+
+@pytest.fixture(scope="module")
+def payment_schedule():
+    return compute_payment_schedule(make_scenario_params())
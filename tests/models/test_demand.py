@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.models.demand import (
+    HOURS_PER_YEAR,
+    TimeOfUseTariff,
+    Weather,
+    degree_hours,
+)
+
+
+def test_degree_hours():
+    assert degree_hours([20.0, 15.5, 5.5]) == approx([0.0, 0.0, 10.0])
+
+
+def test_weather_from_degree_days():
+    # given a year of daily degree days
+    degree_days = np.linspace(0, 10, 365)
+
+    # when I create hourly weather from them
+    weather = Weather.from_degree_days(degree_days)
+
+    # then each hour of a day has the day's degree days
+    assert weather.n_years == 1
+    assert degree_hours(weather.temperatures).sum() == approx(24 * degree_days.sum())
+
+
+def test_weather_from_csv(tmp_path):
+    # given two years of hourly temperatures in a CSV file
+    path = tmp_path / "weather.csv"
+    path.write_text("temperature\n" + "\n".join(["5.0"] * (2 * HOURS_PER_YEAR)) + "\n")
+
+    # when I load them
+    weather = Weather.from_csv(path)
+
+    # then there is a row per year
+    assert weather.temperatures.shape == (2, HOURS_PER_YEAR)
+
+
+def test_time_of_use_from_daily():
+    # given a tariff at half price from midnight to 7am
+    tariff = TimeOfUseTariff.from_daily([0.5] * 7 + [1.0] * 17)
+
+    # then it repeats every day
+    assert tariff.multipliers.shape == (HOURS_PER_YEAR,)
+    assert tariff.multipliers[24 + 3] == 0.5
+    assert tariff.multipliers[24 + 12] == 1.0
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        Weather(np.zeros(100))
+    with pytest.raises(ValueError):
+        TimeOfUseTariff.from_daily([1.0] * 12)
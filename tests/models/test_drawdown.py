@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.models.drawdown import NEVER, drawdown
+
+
+def _year_by_year(initial_value, growth_rate_pcnt, withdrawals):
+    value, values, depleted = initial_value, [], NEVER
+    for year, withdrawal in enumerate(withdrawals):
+        if withdrawal > value and depleted == NEVER:
+            depleted = year
+        value = max(value - withdrawal, 0) * (1 + growth_rate_pcnt)
+        values.append(value if depleted == NEVER else 0)
+    return values, depleted
+
+
+def test_strategies():
+    # given pots of 100000 growing at 3%, drawn down by each strategy for 30 years from 2064
+    strategies = ["schedule", "fixed_real", "percentage", "annuity"]
+    schedule = np.full((4, 30), 4000.0)
+
+    # when I draw them down
+    result = drawdown(
+        strategies,
+        100000,
+        0.03,
+        30,
+        first_year=2064,
+        schedule=schedule,
+        amount=6000,
+        inflation_pcnt=0.02,
+        rate_pcnt=0.04,
+    )
+
+    # then the pots match a year by year drawdown
+    for i in range(3):
+        values, depleted = _year_by_year(100000, 0.03, result.withdrawals[i])
+        assert result.values[i] == approx(values)
+        assert result.depletion_year[i] == (
+            NEVER if depleted == NEVER else 2064 + depleted
+        )
+
+    assert result.withdrawals[0] == approx(schedule[0])
+    assert result.withdrawals[1, 1] == approx(6000 * 1.02)
+    assert result.withdrawals[2, 1] == approx(0.04 * 0.96 * 1.03 * 100000)
+    assert result.depletion_year.tolist()[1:] == [2064 + 18, NEVER, NEVER]
+    assert result.terminal_value[0] > 0
+    assert result.withdrawals[3] == approx(np.full(30, 4000))
+    assert result.terminal_value[3] == 0
+
+
+def test_heating_without_growth():
+    # given a pot that exactly covers the heating cost, drawn down without growth
+    heating = np.array([[100.0, 200.0, 300.0]])
+
+    # when I draw it down
+    result = drawdown("schedule", 600, 0.0, 3, schedule=heating)
+
+    # then its value falls by the cumulative heating cost
+    assert result.values[0] == approx([500, 300, 0])
+    assert result.depletion_year[0] == NEVER
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        drawdown("lottery", 100000, 0.03, 30)
@@ -1,5 +1,7 @@
 from pytest import approx
 
+from pension_calculator.models import Energy
+
 
 def test_annual_energy_cost(energy):
     assert energy.annual_energy_cost(house_kwh_m2a=100, house_area_m2=100) == 1000
@@ -46,3 +48,31 @@ def test_retirement_cost(energy):
 #     assert round(result_df["average", price][cagr]) == average
 #     assert round(result_df["passive", price][cagr]) == passive
 #     assert round(delta_df[price][cagr]) == difference
+
+
+def test_total_cost_gradient(energy):
+    # given a central difference of the retirement cost in the CAGR
+    h = 1e-6
+    costs = [
+        Energy(tariff=0.1, cagr_pcnt=0.05 + s * h).retirement_cost(
+            house_kwh_m2a=100,
+            house_area_m2=100,
+            first_year=2022,
+            year_of_retirement=2032,
+            year_of_death=2052,
+        )
+        for s in (1, -1)
+    ]
+
+    # when I compute the derivatives of the retirement cost
+    gradient = energy.total_cost_gradient(
+        house_kwh_m2a=100,
+        house_area_m2=100,
+        first_year=2022,
+        year_from=2032,
+        year_to=2052,
+    )
+
+    # then they agree, and the cost is linear in the tariff
+    assert gradient["cagr_pcnt"] == approx((costs[0] - costs[1]) / (2 * h), rel=1e-6)
+    assert gradient["tariff"] == approx(58183 / 0.1, abs=10)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.models.heating_system import (
+    FUELS,
+    GAS_BOILER,
+    HEAT_PUMP,
+    HeatingSystem,
+    fuel_use,
+)
+
+
+def test_annual_fuel_kwh():
+    # given a house needing 15 kWh/m2a over 100 m2
+    # when I compute the fuel used by a boiler and a heat pump
+    # then it is the heating demand divided by their efficiency
+    assert GAS_BOILER.annual_fuel_kwh(15, 100) == approx(1500 / 0.9)
+    assert HEAT_PUMP.annual_fuel_kwh(15, 100) == approx(500)
+
+
+def test_fuel_use():
+    # given a boiler and a heat pump in houses with mechanical ventilation
+    fuel_index = np.array([FUELS.index("gas"), FUELS.index("electricity")])
+
+    # when I compute the use of each fuel
+    use = fuel_use(fuel_index, np.array([0.9, 3.0]), 15.0, 100.0, 2.0)
+
+    # then the ventilation adds to the electricity of both
+    assert use[0] == approx([1500 / 0.9, 200])
+    assert use[1] == approx([0, 700])
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        HeatingSystem(name="stove", fuel="wood", efficiency=0.7)
+    with pytest.raises(ValueError):
+        HeatingSystem(name="broken", fuel="gas", efficiency=0)
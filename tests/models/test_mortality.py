@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator.models.mortality import LifeTable
+
+
+@pytest.fixture
+def life_table_csv(tmp_path):
+    path = tmp_path / "life_table.csv"
+    path.write_text("age,qx\n60,0.1\n61,0.2\n62,0.5\n63,0.5\n")
+    return path
+
+
+def test_from_csv(life_table_csv):
+    # given a life table in a CSV file
+    # when I load it
+    table = LifeTable.from_csv(life_table_csv)
+
+    # then it has a probability of death at each age
+    assert table.ages.tolist() == [60, 61, 62, 63]
+    assert table.qx == approx([0.1, 0.2, 0.5, 0.5])
+
+
+def test_survival(life_table_csv):
+    # given a life table
+    table = LifeTable.from_csv(life_table_csv)
+
+    # when I compute the probability of surviving from 60 and from 61
+    survival = table.survival(np.array([60, 61]), ages=np.arange(60, 66))
+
+    # then it is the product of the probabilities of not dying, and zero beyond the table
+    assert survival[0] == approx([1.0, 0.9, 0.72, 0.36, 0.0, 0.0])
+    assert survival[1] == approx([1.0, 1.0, 0.8, 0.4, 0.0, 0.0])
+
+
+def test_life_expectancy(life_table_csv):
+    # given a life table
+    table = LifeTable.from_csv(life_table_csv)
+
+    # when I compute the expected age of death from 60
+    actual = table.life_expectancy(60)
+
+    # then each year started counts in full
+    assert actual == approx([60 + 0.9 + 0.72 + 0.36])
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        LifeTable(ages=np.array([60, 62]), qx=np.array([0.1, 0.2]))
+    with pytest.raises(ValueError):
+        LifeTable(ages=np.array([60, 61]), qx=np.array([0.1, 1.2]))
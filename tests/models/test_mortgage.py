@@ -1,3 +1,5 @@
+from dataclasses import replace
+
 from pension_calculator.models.mortgage import Mortgage
 from pytest import approx
 
@@ -23,3 +25,24 @@ def test_final_year(mortgage):
     # when I get the final payment year
     # then it's correct
     assert mortgage.final_year == 2041
+
+
+def test_total_payments_gradient(mortgage):
+    # given central differences of the total payments in the deposit and interest rate
+    h = 1e-6
+
+    def total(**changes):
+        return replace(mortgage, **changes).annual_payments()["total"].sum()
+
+    d_deposit = (total(deposit_pcnt=0.1 + h) - total(deposit_pcnt=0.1 - h)) / (2 * h)
+    d_rate = (
+        total(interest_rate_pcnt=0.0425 + h) - total(interest_rate_pcnt=0.0425 - h)
+    ) / (2 * h)
+
+    # when I compute the derivatives analytically
+    gradient = mortgage.total_payments_gradient()
+
+    # then they agree
+    assert gradient["deposit_pcnt"] == approx(d_deposit, rel=1e-5)
+    assert gradient["interest_rate_pcnt"] == approx(d_rate, rel=1e-5)
+    assert gradient["purchase_price"] == approx(total() / 350000)
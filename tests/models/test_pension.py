@@ -1,3 +1,5 @@
+from dataclasses import replace
+
 import numpy_financial as npf
 from pytest import approx
 
@@ -15,3 +17,25 @@ def test_annual_payments(pension):
     payments = pension.annual_payments()
     assert len(payments) == 10
     assert payments["value"].iloc[-1] == approx(10000)
+
+
+def test_total_payments_gradient(pension):
+    # given a central difference of the total payments in the growth rate
+    h = 1e-6
+    totals = [
+        replace(pension, growth_rate_pcnt=0.1 + s * h)
+        .annual_payments()["payment"]
+        .sum()
+        for s in (1, -1)
+    ]
+
+    # when I compute the derivatives analytically
+    gradient = pension.total_payments_gradient()
+
+    # then they agree, and the total is linear in the target
+    assert gradient["growth_rate_pcnt"] == approx(
+        (totals[0] - totals[1]) / (2 * h), rel=1e-5
+    )
+    assert gradient["target"] * 10000 == approx(
+        pension.annual_payments()["payment"].sum()
+    )
@@ -1,3 +1,6 @@
+from dataclasses import FrozenInstanceError
+
+import pytest
 import toml
 
 from pension_calculator import ROOT
@@ -13,3 +16,10 @@ def test_init():
     p = Person(yob=yob)
     assert p.yor == yob + PENSION_AGE
     assert p.yod == yob + LIFE_EXPECTANCY
+
+
+def test_frozen():
+    p = Person(yob=1965)
+    with pytest.raises(FrozenInstanceError):
+        p.yob = 1970
+    assert not hasattr(p, "__dict__")
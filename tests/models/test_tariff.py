@@ -0,0 +1,81 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from pension_calculator import CONFIG
+from pension_calculator.models import TariffCurve
+
+
+def test_constant_curve_matches_cagr(energy):
+    # given an energy model, and the same model with a constant curve at its CAGR
+    curved = replace(energy, curve=TariffCurve.constant(energy.cagr_pcnt))
+
+    # when I compute their payments
+    kwargs = dict(house_kwh_m2a=100, house_area_m2=100, first_year=2022, last_year=2052)
+
+    # then they are the same
+    assert curved.annual_payments(**kwargs).to_numpy() == approx(
+        energy.annual_payments(**kwargs).to_numpy()
+    )
+
+
+def test_segments():
+    # given a tariff that grows 10% a year from 2025, then 2% a year from 2027
+    curve = TariffCurve.from_segments([(2025, 0.1), (2027, 0.02)])
+
+    # when I compute its growth from 2023
+    factors = curve.growth_factors(2023, np.arange(2023, 2030))
+
+    # then the first rate applies before the curve, and the last after it
+    expected = np.cumprod([1, 1.1, 1.1, 1.1, 1.02, 1.02, 1.02])
+    assert factors == approx(expected)
+
+
+def test_from_csv(tmp_path):
+    # given a forecast of gas and electricity tariffs
+    path = tmp_path / "tariffs.csv"
+    path.write_text(
+        "year,fuel,tariff\n"
+        "2024,gas,0.10\n2022,gas,0.05\n2023,gas,0.08\n"
+        "2022,electricity,0.20\n2023,electricity,0.30\n"
+    )
+
+    # when I load the gas curve
+    curve = TariffCurve.from_csv(path, "gas")
+
+    # then it reproduces the forecast tariffs from 2022
+    factors = curve.growth_factors(2022, np.arange(2022, 2025))
+    assert 0.05 * factors == approx([0.05, 0.08, 0.10])
+
+
+def test_from_config():
+    # given no tariff curves in CONFIG file
+    # when I load the gas curve
+    curve = TariffCurve.from_config("gas")
+
+    # then it grows at the [CAGR] rate for gas
+    assert curve.growth_factors(2022, 2032) == approx(
+        (1 + CONFIG.get("CAGR")["gas"]) ** 10
+    )
+
+
+def test_hashable(energy):
+    # given energy models with equal curves built in different ways
+    curved = [
+        replace(energy, curve=TariffCurve.from_segments([(2025, 0.1), (2027, 0.02)])),
+        replace(energy, curve=TariffCurve(2025, np.array([0.1, 0.1, 0.02]))),
+    ]
+
+    # when I hash them
+    # then they are equal and hash alike, e.g. as cache keys
+    assert curved[0] == curved[1]
+    assert len({energy, *curved}) == 2
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        TariffCurve.from_segments([(2030, 0.1), (2025, 0.02)])
+    with pytest.raises(ValueError):
+        TariffCurve.from_tariffs([2022, 2024], [0.05, 0.06])
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import math
+
+import pytest
+from pytest import approx
+
+from pension_calculator.compute.scenario_batch import ScenarioBatch
+from pension_calculator.web.scoring_service import (
+    BadRequest,
+    MicroBatcher,
+    ScoringService,
+    parse_scenario,
+)
+
+
+def scenario_json(scenario_params, **changes):
+    # Fields that are NaN, e.g. the price of a mortgage of the house's cost, are omitted and derived.
+    batch = ScenarioBatch.from_scenarios([scenario_params]).replace(**changes)
+    return {
+        name: values[0].item()
+        for name, values in batch.columns().items()
+        if not math.isnan(values[0])
+    }
+
+
+async def post(port, path, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    response = await reader.read()
+    writer.close()
+    return int(status_line.split()[1]), json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def test_scoring_service_batches_requests(scenario_params):
+    # given a service, and requests for the quality-control scenario, an infeasible one, and a malformed one
+    async def run():
+        batcher = MicroBatcher(max_batch_size=8, max_wait_s=0.05)
+        async with ScoringService(batcher) as service:
+            requests = [
+                post(service.port, "/totals", scenario_json(scenario_params))
+                for _ in range(10)
+            ]
+            requests.append(
+                post(service.port, "/totals", scenario_json(scenario_params, yob=1974))
+            )
+            requests.append(post(service.port, "/schedule", {"yob": 1997}))
+            requests.append(
+                post(service.port, "/schedule", scenario_json(scenario_params))
+            )
+            return await asyncio.gather(*requests), batcher.batch_sizes
+
+    # when they are sent concurrently
+    responses, batch_sizes = asyncio.run(run())
+
+    # then the well-formed ones are scored in a few batches, and each gets its own response
+    assert sum(batch_sizes) == 12
+    assert max(batch_sizes) == 8
+    status, totals = responses[0]
+    assert status == 200
+    assert totals["mortgage"] == approx(468141, abs=1)
+    assert totals["heating"] == approx(412470, abs=1)
+    assert responses[10] == (422, {"infeasible": ["MORTGAGE_AFTER_RETIREMENT"]})
+    assert responses[11][0] == 400
+    status, schedule = responses[12]
+    assert schedule["year"][0] == 2022
+    assert schedule["year"][-1] == 1997 + 87
+    assert sum(schedule["mortgage"]) == approx(468141, abs=1)
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"yob": 40000},
+        {"purchase_year": -5},
+        {"tariff": math.inf},
+        {"length_years": 2**40},
+    ],
+)
+def test_parse_scenario_rejects_out_of_range_values(scenario_params, changes):
+    # given a scenario with a year far outside any lifetime, or a value that does not fit
+    payload = {**scenario_json(scenario_params), **changes}
+
+    # then it is rejected as a bad request
+    with pytest.raises(BadRequest):
+        parse_scenario(payload)
+
+
+def test_scoring_service_rejects_overflowing_json(scenario_params):
+    # given a request whose CAGR overflows to infinity when parsed
+    body = json.dumps(scenario_json(scenario_params)).replace(
+        '"cagr_pcnt": 0.05', '"cagr_pcnt": 1e400'
+    )
+
+    async def run():
+        async with ScoringService(MicroBatcher()) as service:
+            return await service._respond("POST", "/totals", body.encode())
+
+    # then it is a bad request, not a server error
+    status, response = asyncio.run(run())
+    assert status == 400
+    assert response == {"error": "cagr_pcnt must be finite"}